@@ -24,6 +24,11 @@ from flask import session
 # serve production ready server
 from waitress import serve
 
+import compression
+import prefork
+import prerender
+import request_metrics
+
 
 def _get_session_id():
     session_key = "session_id"
@@ -51,6 +56,27 @@ DASH_PROD = os.getenv("DASH_PROD")
 print(f"{DASH_PROD=}")
 
 
+def _cache_stats() -> dict:
+    """
+    Figure cache statistics and the initial map payload of the home page,
+    once it is loaded.
+    """
+    home = sys.modules.get("pages.home")
+    if home is None:
+        return {}
+    return {
+        "figure_cache": home.figure_cache.stats(),
+        "initial_map": home.map_fig_stats,
+    }
+
+
+def _before_fork():
+    """Load all data in the parent, for the forked workers to share."""
+    home = sys.modules.get("pages.home")
+    if home is not None:
+        home.data.prepare_fork()
+
+
 def create_app():
     """
     Create the Flask app.
@@ -67,6 +93,10 @@ def create_app():
     log = logging.getLogger(__name__)
     log.info("Creating app")
 
+    # pandas objects derived from the loaded data (columns, slices) copy
+    # before they are modified, instead of raising on its read-only arrays
+    pd.set_option("mode.copy_on_write", True)
+
     FONT_AWESOME = "https://use.fontawesome.com/releases/v5.10.2/css/all.css"
 
     # create the Dash app
@@ -113,6 +143,20 @@ def create_app():
         ]
     )
 
+    # callback request counts and latency, with the figure cache statistics;
+    # in production only if asked for, the endpoint is not authenticated
+    if DASH_PROD != "True" or os.getenv("CALLBACK_METRICS") == "True":
+        request_metrics.install(server, extra=_cache_stats)
+    # brotli/gzip for JSON responses, runs before the metrics record sizes
+    compression.install(server)
+
+    # answer the dropdown callbacks from pre-rendered files, if there are
+    prerender_dir = os.getenv("PRERENDER_DIR")
+    if prerender_dir and prerender.install(
+        server, prerender_dir, sys.modules["pages.home"].data.content_id()
+    ):
+        log.info(f"Serving pre-rendered callbacks from {prerender_dir}")
+
     # return the Dash app
     return application
 
@@ -121,8 +165,28 @@ if __name__ == "__main__":
     application = create_app()
 
     if DASH_PROD == "True":
-        print("dss is running with production server")
-        serve(application.server, host="0.0.0.0", port=10000)
+        # the loaded data is read-only, so request threads can share it
+        threads = int(os.getenv("WAITRESS_THREADS") or 4)
+        # worker processes forked after loading the data, 1 = no forking
+        workers = int(os.getenv("WEB_WORKERS") or 1)
+        if workers > 1:
+            print(f"dss is running with {workers} production workers")
+            prefork.serve(
+                application.server,
+                host="0.0.0.0",
+                port=10000,
+                workers=workers,
+                threads=threads,
+                before_fork=_before_fork,
+            )
+        else:
+            print("dss is running with production server")
+            serve(
+                application.server,
+                host="0.0.0.0",
+                port=10000,
+                threads=threads,
+            )
     else:
         print("app is running with development server")
         application.run(host="0.0.0.0", debug=True, port=10000)
@@ -0,0 +1,293 @@
+"""
+Single-file data bundle for the web app.
+
+A bundle is an uncompressed zip archive holding every final `DataLoader` attribute:
+
+    manifest.json           format version and the kind of each attribute
+    <name>.arrow            tables (Arrow IPC), geometries stored as WKB
+    <name>/<key>.arrow      dictionaries of tables, e.g. `df_cabcm`
+    <name>/<var>.npy        xarray variables and plain arrays
+
+Members are stored without compression and aligned to 64 bytes, so they can be
+memory-mapped straight out of the archive: opening a bundle reads the manifest and
+maps each member, without parsing or copying the large arrays.
+"""
+
+import datetime
+import io
+import json
+import struct
+import zipfile
+from collections.abc import Mapping
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import shapely
+import xarray as xr
+
+# bumped whenever the format or the set of bundled attributes changes, so a
+# stale bundle is rejected instead of being used with data missing
+BUNDLE_VERSION = 2
+
+# byte alignment of member data within the archive
+_ALIGNMENT = 64
+# zip extra field id used for alignment padding (same as Android's zipalign)
+_PADDING_EXTRA_ID = 0xD935
+# fixed size of a zip local file header
+_LOCAL_HEADER_SIZE = 30
+
+
+def write_bundle(attributes: dict, path: str):
+    """
+    Write data attributes to a bundle file.
+
+    Args:
+        attributes (dict): Attribute name to value. Supported values are DataFrames,
+            GeoDataFrames, Series, mappings of DataFrames, xarray Datasets, numpy arrays
+            and JSON-serializable values.
+        path (str): Output file path.
+    """
+    manifest = {
+        "version": BUNDLE_VERSION,
+        "created": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+        "attributes": {},
+    }
+
+    with zipfile.ZipFile(path, "w", compression=zipfile.ZIP_STORED) as zf:
+        for name, value in attributes.items():
+            manifest["attributes"][name] = _write_attribute(zf, name, value)
+        zf.writestr("manifest.json", json.dumps(manifest, indent=1))
+
+
+def read_bundle(path: str) -> tuple[dict, dict]:
+    """
+    Open a bundle, memory-mapping its members.
+
+    Args:
+        path (str): Bundle file path.
+
+    Returns:
+        tuple: Attribute name to value, and the bundle manifest.
+
+    Raises:
+        ValueError: If the bundle was written by a different format version.
+    """
+    with zipfile.ZipFile(path) as zf:
+        manifest = json.loads(zf.read("manifest.json"))
+        if manifest.get("version") != BUNDLE_VERSION:
+            raise ValueError(
+                f"{path} is bundle version {manifest.get('version')}, "
+                f"expected {BUNDLE_VERSION}; re-run the bake command"
+            )
+
+        reader = _BundleReader(path, zf)
+        attributes = {
+            name: reader.read_attribute(name, entry)
+            for name, entry in manifest["attributes"].items()
+        }
+
+    return attributes, manifest
+
+
+def _write_attribute(zf: zipfile.ZipFile, name: str, value) -> dict:
+    """Write one attribute and return its manifest entry."""
+    if isinstance(value, xr.Dataset):
+        variables = {}
+        for var_name, var in value.variables.items():
+            member = f"{name}/{var_name}.npy"
+            _write_member(zf, member, _npy_bytes(var.values))
+            variables[var_name] = {"member": member, "dims": list(var.dims)}
+        return {
+            "kind": "dataset",
+            "variables": variables,
+            "coords": list(value.coords),
+        }
+
+    if isinstance(value, pd.DataFrame) and _is_geodataframe(value):
+        geometry_name = value.geometry.name
+        table = value.to_wkb()  # geometry column to WKB bytes
+        entry = _write_frame(zf, f"{name}.arrow", pd.DataFrame(table))
+        return {"kind": "geoframe", "geometry": geometry_name, **entry}
+
+    if isinstance(value, pd.DataFrame):
+        return {"kind": "frame", **_write_frame(zf, f"{name}.arrow", value)}
+
+    if isinstance(value, pd.Series):
+        entry = _write_frame(zf, f"{name}.arrow", value.to_frame("values"))
+        return {"kind": "series", "name": value.name, **entry}
+
+    if isinstance(value, Mapping) and all(
+        isinstance(v, pd.DataFrame) for v in value.values()
+    ):
+        frames = {
+            key: _write_frame(zf, f"{name}/{key}.arrow", df)
+            for key, df in value.items()
+        }
+        return {"kind": "frames", "frames": frames}
+
+    if isinstance(value, np.ndarray):
+        member = f"{name}.npy"
+        _write_member(zf, member, _npy_bytes(value))
+        return {"kind": "array", "member": member}
+
+    try:
+        return {"kind": "json", "value": json.loads(json.dumps(value))}
+    except TypeError:
+        raise TypeError(
+            f"cannot bundle attribute {name!r} of type {type(value).__name__}"
+        ) from None
+
+
+class _BundleReader:
+    """Memory-maps members of an open bundle."""
+
+    def __init__(self, path: str, zf: zipfile.ZipFile):
+        self.path = path
+        self.zf = zf
+        self.mmap = pa.memory_map(path)
+
+    def read_attribute(self, name: str, entry: dict):
+        kind = entry["kind"]
+
+        if kind == "dataset":
+            variables = {
+                var_name: (var["dims"], self.read_array(var["member"]))
+                for var_name, var in entry["variables"].items()
+            }
+            coords = {c: variables.pop(c) for c in entry["coords"]}
+            return xr.Dataset(variables, coords=coords)
+
+        if kind == "geoframe":
+            df = self.read_frame(entry)
+            geometry = entry["geometry"]
+            df[geometry] = shapely.from_wkb(df[geometry].to_numpy())
+            return df
+
+        if kind == "frame":
+            return self.read_frame(entry)
+
+        if kind == "series":
+            series = self.read_frame(entry)["values"]
+            series.name = entry["name"]
+            return series
+
+        if kind == "frames":
+            return {
+                key: self.read_frame(frame)
+                for key, frame in entry["frames"].items()
+            }
+
+        if kind == "array":
+            return self.read_array(entry["member"])
+
+        if kind == "json":
+            return entry["value"]
+
+        raise ValueError(f"unknown bundle attribute kind {kind!r} ({name})")
+
+    def read_frame(self, entry: dict) -> pd.DataFrame:
+        """Arrow IPC member to DataFrame."""
+        offset, size = self._member_span(entry["member"])
+        buffer = self.mmap.read_at(size, offset)  # zero-copy
+        df = pa.ipc.open_file(buffer).read_all().to_pandas()
+        if "columns" in entry:
+            df.columns = entry["columns"]
+        return df
+
+    def read_array(self, member: str) -> np.ndarray:
+        """NPY member to a read-only memory-mapped array."""
+        offset, _ = self._member_span(member)
+        with open(self.path, "rb") as f:
+            f.seek(offset)
+            version = np.lib.format.read_magic(f)
+            if version == (1, 0):
+                shape, fortran_order, dtype = (
+                    np.lib.format.read_array_header_1_0(f)
+                )
+            else:
+                shape, fortran_order, dtype = (
+                    np.lib.format.read_array_header_2_0(f)
+                )
+            data_offset = f.tell()
+
+        if np.prod(shape) == 0 or shape == ():
+            # nothing to map (or a 0-d array); read it directly
+            return np.load(io.BytesIO(self.zf.read(member)))
+
+        return np.memmap(
+            self.path,
+            dtype=dtype,
+            mode="r",
+            offset=data_offset,
+            shape=shape,
+            order="F" if fortran_order else "C",
+        )
+
+    def _member_span(self, member: str) -> tuple[int, int]:
+        """Byte offset and size of a stored member's data within the file."""
+        info = self.zf.getinfo(member)
+        with open(self.path, "rb") as f:
+            f.seek(info.header_offset)
+            header = f.read(_LOCAL_HEADER_SIZE)
+        name_length, extra_length = struct.unpack("<HH", header[26:30])
+        offset = (
+            info.header_offset
+            + _LOCAL_HEADER_SIZE
+            + name_length
+            + extra_length
+        )
+        return offset, info.file_size
+
+
+def _write_member(zf: zipfile.ZipFile, member: str, data: bytes):
+    """Store a member uncompressed, padded so its data starts aligned."""
+    info = zipfile.ZipInfo(member, date_time=(1980, 1, 1, 0, 0, 0))
+    info.compress_type = zipfile.ZIP_STORED
+
+    data_start = zf.fp.tell() + _LOCAL_HEADER_SIZE + len(member.encode()) + 4
+    padding = -data_start % _ALIGNMENT
+    info.extra = struct.pack("<HH", _PADDING_EXTRA_ID, padding) + (
+        b"\0" * padding
+    )
+    zf.writestr(info, data)
+
+
+def _write_frame(zf: zipfile.ZipFile, member: str, df: pd.DataFrame) -> dict:
+    """
+    Store a DataFrame as an Arrow IPC member and return its manifest entry.
+    Arrow field names are strings, so non-string column labels (e.g. the
+    integer feature ids of the routed flows) are kept in the manifest.
+    """
+    entry = {"member": member}
+    if not all(isinstance(c, str) for c in df.columns):
+        entry["columns"] = [
+            c.item() if isinstance(c, np.generic) else c for c in df.columns
+        ]
+        df = df.set_axis([str(c) for c in df.columns], axis=1)
+    _write_member(zf, member, _arrow_bytes(df))
+    return entry
+
+
+def _arrow_bytes(df: pd.DataFrame) -> bytes:
+    """DataFrame to Arrow IPC file bytes, index included."""
+    table = pa.Table.from_pandas(df, preserve_index=True)
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_file(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
+
+
+def _npy_bytes(values: np.ndarray) -> bytes:
+    """Array to NPY bytes. Object arrays (strings) are stored as unicode."""
+    values = np.asarray(values)
+    if values.dtype == object:
+        values = values.astype(str)
+    buffer = io.BytesIO()
+    np.save(buffer, values, allow_pickle=False)
+    return buffer.getvalue()
+
+
+def _is_geodataframe(df: pd.DataFrame) -> bool:
+    """Check for a GeoDataFrame without importing geopandas."""
+    return type(df).__name__ == "GeoDataFrame" and hasattr(df, "to_wkb")
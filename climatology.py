@@ -0,0 +1,140 @@
+"""
+Month-of-year climatology of monthly series.
+
+`month_of_year_stats()` computes the statistics of every calendar month once,
+per location and basin-wide; `Climatology` wraps them together with the
+monthly values, so "% of average" or the anomaly of any month is an array
+lookup instead of a filter and aggregation over all years.
+"""
+
+import pandas as pd
+
+# location label of the basin-wide series
+BASIN = "basin"
+
+# statistic name -> quantile, for the percentiles
+PERCENTILES = {"p10": 0.1, "p25": 0.25, "p75": 0.75, "p90": 0.9}
+
+STATISTICS = ["mean", "median", "min", "max", *PERCENTILES]
+
+
+def monthly_frame(values: pd.DataFrame) -> pd.DataFrame:
+    """
+    Monthly values in the layout `month_of_year_stats()` expects: month-start
+    index, string location columns and a basin-wide mean column.
+
+    Args:
+        values (DataFrame): Monthly values, one column per location.
+
+    Returns:
+        DataFrame: float64 values, the last column being `BASIN`.
+    """
+    frame = values.astype("float64")
+    frame.index = pd.DatetimeIndex(frame.index).to_period("M").to_timestamp()
+    frame.columns = frame.columns.astype(str)
+    if BASIN not in frame.columns:
+        frame[BASIN] = frame.mean(axis=1)
+    return frame
+
+
+def month_of_year_stats(frame: pd.DataFrame) -> pd.DataFrame:
+    """
+    Statistics of every calendar month over all years.
+
+    Args:
+        frame (DataFrame): Output of `monthly_frame()`.
+
+    Returns:
+        DataFrame: indexed by (stat, month) for every stat of `STATISTICS`
+        and month 1-12, with the columns of `frame`. NaNs are skipped.
+    """
+    grouped = frame.groupby(frame.index.month)
+    stats = {
+        "mean": grouped.mean(),
+        "median": grouped.median(),
+        "min": grouped.min(),
+        "max": grouped.max(),
+    }
+    for name, q in PERCENTILES.items():
+        stats[name] = grouped.quantile(q)
+
+    # every month present, so positions can be computed from the month number
+    months = pd.RangeIndex(1, 13)
+    return pd.concat(
+        {name: stats[name].reindex(months) for name in STATISTICS},
+        names=["stat", "month"],
+    )
+
+
+class Climatology:
+    """Month-of-year statistics of one monthly series, with O(1) lookups.
+
+    Attributes:
+    ----------
+        locations : pandas.Index
+            Location labels (strings), `BASIN` included.
+        values : numpy.ndarray
+            (month, location) values.
+        stats : numpy.ndarray
+            (stat, calendar month, location) statistics, stats in
+            `STATISTICS` order and months 1-12.
+    """
+
+    def __init__(self, frame: pd.DataFrame, stats: pd.DataFrame):
+        """
+        Parameters:
+        ----------
+        frame : pandas.DataFrame
+            Monthly values, output of `monthly_frame()`.
+        stats : pandas.DataFrame
+            Their `month_of_year_stats()`.
+        """
+        self.locations = frame.columns
+        self.values = frame.to_numpy()
+        self.stats = (
+            stats[frame.columns]
+            .to_numpy()
+            .reshape(len(STATISTICS), 12, len(frame.columns))
+        )
+        self._months = {
+            month: i for i, month in enumerate(frame.index.strftime("%Y-%m"))
+        }
+        self._locations = {loc: i for i, loc in enumerate(self.locations)}
+        self._stats = {name: i for i, name in enumerate(STATISTICS)}
+
+    def value(self, date, location=BASIN) -> float:
+        """Value of the month of `date` at `location`."""
+        row = self._months[pd.Timestamp(date).strftime("%Y-%m")]
+        return self.values[row, self._locations[str(location)]]
+
+    def stat(self, name: str, month: int, location=BASIN) -> float:
+        """Statistic `name` of calendar month `month` (1-12) at `location`."""
+        return self.stats[
+            self._stats[name], month - 1, self._locations[str(location)]
+        ]
+
+    def percent_of_average(self, date, location=BASIN) -> float:
+        """Value of the month of `date` in percent of that month's mean."""
+        date = pd.Timestamp(date)
+        return (
+            self.value(date, location)
+            / self.stat("mean", date.month, location)
+            * 100
+        )
+
+    def anomaly(self, date, stat: str = "mean") -> pd.Series:
+        """
+        Departure of every location from the statistic of its calendar month,
+        e.g. to color the map by anomaly.
+
+        Args:
+            date: Any date within the month.
+            stat (str, optional): Reference statistic. Defaults to "mean".
+
+        Returns:
+            Series: anomaly by location.
+        """
+        date = pd.Timestamp(date)
+        row = self._months[date.strftime("%Y-%m")]
+        reference = self.stats[self._stats[stat], date.month - 1]
+        return pd.Series(self.values[row] - reference, index=self.locations)
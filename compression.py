@@ -0,0 +1,61 @@
+"""
+Brotli/gzip compression of the JSON responses of the Flask server (layout,
+dependencies and callback responses), for clients that accept it.
+"""
+
+import gzip
+
+import flask
+
+try:
+    import brotli
+except ImportError:  # gzip only
+    brotli = None
+
+# responses smaller than this are sent as they are
+MIN_BYTES = 1024
+
+_MIMETYPES = ("application/json",)
+
+
+def install(server: flask.Flask, min_bytes: int = MIN_BYTES):
+    """
+    Compress the JSON responses of `server`: brotli if the client accepts it
+    (and the module is installed), else gzip. Responses that are already
+    encoded (e.g. pre-rendered gzip files) are left alone.
+
+    The uncompressed size is kept in `flask.g.uncompressed_bytes`, for the
+    request metrics.
+
+    Args:
+        server (flask.Flask): Server of the Dash app.
+        min_bytes (int, optional): Smallest response to compress.
+    """
+
+    @server.after_request
+    def compress_response(response):
+        if (
+            response.direct_passthrough
+            or response.status_code != 200
+            or response.mimetype not in _MIMETYPES
+            or "Content-Encoding" in response.headers
+        ):
+            return response
+
+        data = response.get_data()
+        flask.g.uncompressed_bytes = len(data)
+        if len(data) < min_bytes:
+            return response
+
+        accepted = flask.request.headers.get("Accept-Encoding", "")
+        if brotli is not None and "br" in accepted:
+            response.set_data(brotli.compress(data, quality=5))
+            response.headers["Content-Encoding"] = "br"
+        elif "gzip" in accepted:
+            response.set_data(gzip.compress(data, compresslevel=6))
+            response.headers["Content-Encoding"] = "gzip"
+        else:
+            return response
+
+        response.vary.add("Accept-Encoding")
+        return response
@@ -1,17 +1,229 @@
+from __future__ import annotations
+
 import pandas as pd
 import numpy as np
 import xarray as xr
 import boto3
+from botocore.config import Config
 import io
-import geopandas as gpd
+import json
 import shapely.geometry
 import os
+import argparse
+import contextlib
+import hashlib
+import threading
+import logging
+from collections.abc import Mapping
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
+from typing import TYPE_CHECKING
+
+import bundle
+import climatology
+import well_pyramid
+from figures import map_geometry
+from s3_cache import S3DiskCache
+
+if TYPE_CHECKING:
+    # imported where used, so loading from a bundle never imports geopandas
+    import geopandas as gpd
+
+log = logging.getLogger(__name__)
+
+
+def s3_config(max_workers: int = None) -> Config:
+    """
+    botocore config for the shared S3 client. The connection pool is sized so that
+    concurrent fetches during `DataLoader` startup each get their own connection.
+
+    Args:
+        max_workers (int, optional): Number of objects fetched concurrently.
+
+    Returns:
+        Config: botocore client config.
+    """
+    return Config(max_pool_connections=max(max_workers or 0, 10))
+
+
+def freeze(value):
+    """
+    Make the arrays behind a data attribute read-only, in place: DataFrames,
+    Series, xarray Datasets, numpy arrays, and dicts or lists of them.
+    Writing to the value raises ValueError, so every thread of every request
+    sees the data as it was loaded. With pandas copy-on-write, which the app
+    enables (`application.create_app()`), derived pandas objects copy before
+    they are modified; without it, writing through them raises as well.
+
+    Args:
+        value: A loaded data attribute.
+
+    Returns:
+        The same value.
+    """
+    if isinstance(value, pd.DataFrame):
+        for _, column in value.items():
+            _freeze_array(_column_values(column))
+    elif isinstance(value, pd.Series):
+        _freeze_array(_column_values(value))
+    elif isinstance(value, xr.Dataset):
+        # variables still backed by their file (e.g. an opened netCDF) are
+        # read into memory first, they would otherwise stay writeable
+        value.load()
+        for var in value.variables.values():
+            # indexes are immutable already
+            if isinstance(var.data, np.ndarray):
+                _freeze_array(var.data)
+    elif isinstance(value, np.ndarray):
+        _freeze_array(value)
+    elif isinstance(value, dict):
+        for item in value.values():
+            freeze(item)
+    elif isinstance(value, list):
+        for item in value:
+            freeze(item)
+    return value
+
+
+def _column_values(series: pd.Series):
+    """
+    A view of the values of a Series, e.g. of a DataFrame column: the codes
+    of a categorical, the numpy values otherwise (a copy for extension types,
+    which is not a view of anything and left alone by `_freeze_array()`).
+    """
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        series = series.cat.codes
+    return series.to_numpy()
+
+
+def _freeze_array(values):
+    """
+    Clear the writeable flag of a numpy array, and of the arrays it is a view
+    of: a column view of a DataFrame block freezes the block, so every view
+    taken later is read-only too. Object arrays (strings, geometries) are left
+    alone: the flag would not protect their items, and shapely needs them
+    writeable.
+    """
+    if not isinstance(values, np.ndarray) or values.dtype == object:
+        return
+    while isinstance(values, np.ndarray):
+        values.flags.writeable = False
+        values = values.base
+
+
+class Dataset:
+    """One node of the `DataLoader` dataset graph.
+
+    Attributes:
+    ----------
+        outputs : list[str]
+            Attributes set by the loader.
+        method : str
+            Name of the `DataLoader` method that loads them. A loader with a
+            single output returns its value; one with several outputs sets them.
+        requires : list[str]
+            Attributes the loader reads, loaded before it runs.
+        kwargs : dict
+            Keyword arguments passed to the loader.
+    """
+
+    def __init__(self, outputs: list, method: str, requires=(), **kwargs):
+        self.outputs = list(outputs)
+        self.method = method
+        self.requires = list(requires)
+        self.kwargs = kwargs
+
+    def __repr__(self):
+        return f"Dataset({self.outputs}, {self.method!r})"
+
+
+class _DatasetAttribute:
+    """
+    Data descriptor for a `DataLoader` dataset attribute: the first read loads
+    the dataset, later reads return the stored value.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+
+    def __get__(self, obj, objtype=None):
+        if obj is None:
+            return self
+        if self.name not in obj._ready:
+            obj.load(self.name)
+        try:
+            return obj.__dict__[self.name]
+        except KeyError:
+            raise AttributeError(self.name) from None
+
+    def __set__(self, obj, value):
+        if self.name in obj._ready:
+            # replacing loaded data, anything derived from it is stale
+            obj.data_version += 1
+        obj.__dict__[self.name] = value
+        dataset = obj._datasets_by_output[self.name]
+        # a loader setting its own outputs marks them ready only once it returns,
+        # so other threads never see a half processed dataset
+        if obj._producers.get(dataset) != threading.get_ident():
+            freeze(value)
+            obj._ready.add(self.name)
+
+
+class LazyFrames(Mapping):
+    """
+    Read-only mapping of variable name to DataFrame that reads each variable
+    on first access. Used for the CABCM and TerraClimate collections, of which
+    the app only uses a few variables.
+    """
+
+    def __init__(self, keys: list, read):
+        """
+        Parameters:
+        ----------
+        keys : list
+            Variable names.
+        read : callable
+            Reads the DataFrame of one variable.
+        """
+        self._keys = list(keys)
+        self._read = read
+        self._frames = {}
+        self._locks = {key: threading.Lock() for key in self._keys}
+
+    def __getitem__(self, key) -> pd.DataFrame:
+        if key not in self._frames:
+            with self._locks[key]:
+                if key not in self._frames:
+                    self._frames[key] = freeze(self._read(key))
+        return self._frames[key]
+
+    def __contains__(self, key) -> bool:
+        return key in self._locks  # without reading the variable
+
+    def __iter__(self):
+        return iter(self._keys)
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def loaded(self) -> list:
+        """Names of the variables read so far."""
+        return [key for key in self._keys if key in self._frames]
+
+    def preload(self, map_func=map):
+        """Read every variable not read yet, using `map_func` to fan out."""
+        list(map_func(self.__getitem__, self._keys))
 
 
 class DataLoader:
     """A class for managing and loading data resources for the TNC web application.
 
+    Every data attribute belongs to a dataset of `DATASETS` and is loaded on
+    first access (together with the datasets it requires), or all at once by
+    `preload()`. Loading is thread-safe: each dataset is loaded only once, and
+    threads reading it meanwhile wait for it. Loaded values are read-only (see
+    `freeze()`), so callbacks on any number of threads can share them.
+
     Data Attributes:
     ----------
         gdf_outline : geopandas.GeoDataFrame
@@ -38,18 +250,165 @@ class DataLoader:
             Routed monthly flows in af from CFE (groundwater cal.)
         cfe_routed_flow_cfs : pd.DataFrame
             Routed monthly flows in cfs from CFE (groundwater cal.)
+        map_cube : numpy.ndarray
+            float32 (variable, month, catchment) values of the map variables,
+            catchments in `gdf` row order.
+        map_cube_variables : list
+            Variable names along the first axis of `map_cube`.
+        map_cube_months : dict
+            "YYYY-MM" to position along the month axis of `map_cube`.
+        catchment_geojson : dict
+            GeoJSON FeatureCollection of the `gdf` polygons, feature ids are
+            the row index as strings.
+        flowline_coords : pd.DataFrame
+            lat/lon/divide_id of every `gdf_lines` vertex, ready to draw as
+            one line trace: NaN (None) rows separate the lines.
+        catchment_outlines : dict
+            divide_id to the {"lat": [...], "lon": [...]} outline of the
+            catchment, every ring of every part, None between rings.
+        water_year_summary : pd.DataFrame
+            Basin-wide precipitation, ET, baseflow and groundwater statistics
+            of each water year (see `build_water_year_summary()`).
+        climatology_values : dict
+            Source name to its monthly values per location (string columns,
+            `climatology.BASIN` being the basin-wide mean).
+        climatology_stats : dict
+            Source name to the month-of-year statistics of those values, see
+            `climatology(source)`.
+        well_aggregates : dict
+            Daily, monthly and water-year statistics of the hourly
+            `well_data`, "<level>.<stat>" to a DataFrame of one column per
+            station, see `well_pyramid()`.
     """
 
+    # hydrofabric layers used by the app, and the columns read from each
+    HYDROFABRIC_COLUMNS = {
+        "divides": ["divide_id", "areasqkm"],
+        "wells": ["station_id_dendra", "name", "divide_id"],
+        "flowpaths": ["divide_id"],
+    }
+
+    # bucket prefixes (subdirectories of a local data directory) that the
+    # datasets are read from, see `content_id()`
+    SOURCE_PREFIXES = [
+        "hydrofabric/",
+        "location_data/",
+        "water_balance/tnc/",
+        "water_balance/v2/cabcm/",
+        "water_balance/v2/terraclim/",
+        "webapp_resources/",
+    ]
+
+    # variables the map can be colored by; streamflow comes from the routed
+    # flows, the others from the NGen dataset
+    MAP_CUBE_VARIABLES = [
+        "Streamflow Vol. (af)",
+        "NET_VOL_ACRE_FT",
+        "ACTUAL_ET_INCH",
+        "POTENTIAL_ET_INCH",
+        "RAIN_RATE_INCH",
+    ]
+
+    # every data attribute, the loader that sets it and what that loader reads
+    DATASETS = [
+        Dataset(["gdf_outline"], "get_outline"),
+        Dataset(["gdf"], "get_hydrofabric", layer="divides"),
+        Dataset(["gdf_wells"], "get_hydrofabric", layer="wells"),
+        Dataset(["gdf_lines"], "get_hydrofabric", layer="flowpaths"),
+        Dataset(["df_nf"], "natural_flows"),
+        Dataset(["df_cabcm"], "get_s3_cabcm"),
+        Dataset(["terraclim"], "get_s3_terraclim"),
+        Dataset(["tnc_domain_q"], "read_tnc_domain_q"),
+        Dataset(["cfe_q"], "cfe_basin_q"),
+        Dataset(["well_data"], "get_s3_well_level"),
+        Dataset(["cfe_routed_flow_af"], "load_cfe_routed_flow_vol"),
+        Dataset(["cfe_routed_flow_cfs"], "load_cfe_routed_flow_rate"),
+        Dataset(
+            [
+                "ds_ngen",
+                "ngen_basinwide_gw_storage",
+                "ngen_basinwide_input_m3",
+                "ngen_basinwide_et_loss_m3",
+                "et_wy_quartile",
+            ],
+            "load_ngen",
+            requires=["gdf"],
+        ),
+        Dataset(
+            ["terraclim_ann_precip", "terraclim_mean_annual_precip"],
+            "precip_stats",
+            requires=["terraclim"],
+        ),
+        Dataset(
+            ["jalama_tributaries_monthly_cfs"],
+            "jalama_stats",
+            requires=["cfe_routed_flow_cfs"],
+        ),
+        Dataset(
+            ["water_year_summary"],
+            "build_water_year_summary",
+            requires=[
+                "terraclim_ann_precip",
+                "ngen_basinwide_et_loss_m3",
+                "jalama_tributaries_monthly_cfs",
+            ],
+        ),
+        Dataset(
+            ["climatology_values", "climatology_stats"],
+            "build_climatology",
+            requires=[
+                "tnc_domain_q",
+                "cfe_q",
+                "cfe_routed_flow_af",
+                "cfe_routed_flow_cfs",
+                "ds_ngen",
+            ],
+        ),
+        Dataset(
+            ["well_aggregates"],
+            "build_well_aggregates",
+            requires=["well_data"],
+        ),
+        Dataset(
+            ["map_cube", "map_cube_variables", "map_cube_months"],
+            "build_map_cube",
+            requires=["gdf", "ds_ngen", "cfe_routed_flow_af"],
+        ),
+        Dataset(
+            ["catchment_geojson"],
+            "build_catchment_geojson",
+            requires=["gdf"],
+        ),
+        Dataset(
+            ["flowline_coords"],
+            "build_flowline_coords",
+            requires=["gdf_lines"],
+        ),
+        Dataset(
+            ["catchment_outlines"],
+            "build_catchment_outlines",
+            requires=["gdf"],
+        ),
+    ]
+
     def __init__(
         self,
         bucket_name: str = None,
         s3_resource: bool = None,
         ngen_output_dir: str = None,
         local_data_dir: str = None,
+        max_workers: int = None,
+        cache_dir: str = None,
+        cache_max_bytes: int = 512 * 1024**2,
+        lazy: bool = False,
+        preload_background: bool = False,
     ):
         """Load all datasets necessary to run the webapp.
 
-        Typical runtime should be 3-5 seconds, depending on network speed.
+        Typical runtime should be 3-5 seconds, depending on network speed. With
+        `max_workers` set, all objects are fetched concurrently and startup is
+        bounded by the slowest single object rather than the sum of all of them.
+        With `lazy`, nothing is loaded here; each dataset loads on first access.
 
         Parameters:
         ----------
@@ -61,50 +420,332 @@ class DataLoader:
             Local directory path for loading static datasets. Defaults to "./data/".
         ngen_output_dir : str
             Path to NGen simulation outputs. Defaults to None.
+        max_workers : int
+            Maximum number of objects fetched at once. Defaults to None, which
+            loads every dataset sequentially.
+        cache_dir : str
+            Directory for a persistent cache of S3 objects, revalidated by ETag
+            on each startup. Defaults to None (no cache).
+        cache_max_bytes : int
+            Size cap of the S3 object cache. Defaults to 512 MB.
+        lazy : bool
+            Load datasets on first access instead of all at once. Defaults to False.
+        preload_background : bool
+            With `lazy`, load the remaining datasets in a background thread.
+            Defaults to False.
         """
         self.bucket_name = bucket_name
         # self.data_dir = data_dir
         self.ngen_output_dir = ngen_output_dir
         self.local_data_dir = local_data_dir
+        self.bundle_path = None
+        self.bundle_created = None
+        self._content_id = None
         if local_data_dir is not None:
             self.use_local = True
         else:
             self.use_local = False
 
+        self.max_workers = max_workers
+
         if s3_resource is None:
             self.s3_resource = boto3.resource(
                 "s3",
                 aws_access_key_id=os.getenv("aws_access_key_id"),
                 aws_secret_access_key=os.getenv("aws_secret_access_key"),
+                config=s3_config(max_workers),
             )
         else:
             self.s3_resource = s3_resource
 
+        # boto3 clients are thread-safe, so one client (and its connection pool)
+        # is shared by every reader
         self.s3_client = self.s3_resource.meta.client
 
-        # Load all webapp datasets during initialization
-        self.gdf_outline = self.get_outline()
-        self.gdf = self.get_hydrofabric(layer="divides")
-        self.gdf_wells = self.get_hydrofabric(layer="wells")
-        self.gdf_lines = self.get_hydrofabric(layer="flowpaths")
-
-        self.df_nf = self.natural_flows()
-        self.df_cabcm = self.get_s3_cabcm()
-        self.terraclim = self.get_s3_terraclim()
-        self.tnc_domain_q = self.read_tnc_domain_q()
-        self.cfe_q = self.cfe_basin_q()
-        self.well_data = self.get_s3_well_level()
-        self.cfe_routed_flow_af = self.load_cfe_routed_flow_vol()
-        self.cfe_routed_flow_cfs = self.load_cfe_routed_flow_rate()
+        if cache_dir is not None:
+            self.s3_cache = S3DiskCache(cache_dir, max_bytes=cache_max_bytes)
+        else:
+            self.s3_cache = None
 
-        self.ds_ngen = self.ngen_dashboard_data(
-            key="webapp_resources/ngen_validation_20250922_monthly.nc"
-        )
+        # reprojected hydrofabric layers, filled by the first get_hydrofabric()
+        self._hydrofabric = {}
+        self._hydrofabric_lock = threading.Lock()
 
-        # data processing and aggregation
-        self.precip_stats()
-        self.ngen_vol_stats()
-        self.ngen_stats()
+        # limit the number of in-flight requests when loading concurrently
+        if max_workers:
+            self._fetch_slots = threading.BoundedSemaphore(max_workers)
+            self._io_pool = ThreadPoolExecutor(max_workers=max_workers)
+        else:
+            self._fetch_slots = contextlib.nullcontext()
+            self._io_pool = None
+        self._io_pool_lock = threading.Lock()
+        self._init_datasets()
+
+        if not lazy:
+            # Load all webapp datasets during initialization
+            self.preload()
+        elif preload_background:
+            self.preload(background=True)
+
+    @classmethod
+    def from_bundle(cls, path: str) -> DataLoader:
+        """
+        Open a data bundle written by `to_bundle()`.
+
+        All processing has already been applied, so this only memory-maps the
+        bundle: no S3 requests, no geopandas import and no pandas aggregation.
+        GeoDataFrame attributes come back as DataFrames with a shapely
+        `geometry` column.
+
+        Args:
+            path (str): Bundle file path.
+
+        Returns:
+            DataLoader: Loader with every data attribute set.
+
+        Raises:
+            ValueError: If the bundle is of another format version or lacks
+                a data attribute (baked by an older version of this module).
+        """
+        self = cls.__new__(cls)
+        self.bucket_name = None
+        self.ngen_output_dir = None
+        self.local_data_dir = None
+        self.use_local = False
+        self.max_workers = None
+        self.s3_resource = None
+        self.s3_client = None
+        self.s3_cache = None
+        self.bundle_path = path
+        self._content_id = None
+        self._fetch_slots = contextlib.nullcontext()
+        self._io_pool = None
+        self._io_pool_lock = threading.Lock()
+        self._hydrofabric_lock = threading.Lock()
+        self._init_datasets()
+
+        attributes, manifest = bundle.read_bundle(path)
+        missing = [
+            name
+            for dataset in self.DATASETS
+            for name in dataset.outputs
+            if name not in attributes
+        ]
+        if missing:
+            # loading them would need S3 or the processing a bundle skips
+            raise ValueError(
+                f"{path} has no {', '.join(missing)}; re-run the bake command"
+            )
+        # identifies the baked data, e.g. for caches shared across restarts
+        self.bundle_created = manifest["created"]
+        for name, value in attributes.items():
+            setattr(self, name, value)
+
+        self._hydrofabric = {
+            "divides": self.gdf,
+            "wells": self.gdf_wells,
+            "flowpaths": self.gdf_lines,
+        }
+        return self
+
+    def to_bundle(self, path: str):
+        """
+        Load every dataset and write all data attributes to a single bundle
+        file, to be opened with `DataLoader.from_bundle()`.
+
+        Args:
+            path (str): Output file path.
+        """
+        self.preload()
+        attributes = {
+            name: getattr(self, name)
+            for dataset in self.DATASETS
+            for name in dataset.outputs
+        }
+        bundle.write_bundle(attributes, path)
+
+    def content_id(self) -> str:
+        """
+        Identifier of the source data, e.g. to namespace caches shared by
+        processes and kept across restarts (`data_version` only counts
+        changes within one process): the creation time of a bundle, else a
+        digest of the ETags of every object under `SOURCE_PREFIXES` (of the
+        sizes and modification times of local files). Listing the objects
+        takes one request per prefix, and is done once per loader.
+
+        Returns:
+            str: Identifier, the same for the same data.
+        """
+        if self._content_id is not None:
+            return self._content_id
+        if self.bundle_path is not None:
+            self._content_id = f"bundle-{self.bundle_created}"
+            return self._content_id
+
+        versions = []
+        for prefix in self.SOURCE_PREFIXES:
+            if self.use_local:
+                for path in sorted(
+                    Path(self.local_data_dir, prefix).rglob("*")
+                ):
+                    if path.is_file():
+                        stat = path.stat()
+                        versions.append(
+                            f"{path}:{stat.st_size}:{stat.st_mtime_ns}"
+                        )
+            else:
+                bucket = self.s3_resource.Bucket(self.bucket_name)
+                for obj in bucket.objects.filter(Prefix=prefix):
+                    versions.append(f"{obj.key}:{obj.e_tag}")
+
+        digest = hashlib.sha256("\n".join(versions).encode()).hexdigest()
+        source = self.local_data_dir if self.use_local else self.bucket_name
+        self._content_id = f"{source}-{digest[:16]}"
+        return self._content_id
+
+    def _init_datasets(self):
+        """Per-instance state of the dataset graph."""
+        # attributes whose loader has finished
+        self._ready = set()
+        # reentrant, so a loader can read the outputs it has already set
+        self._dataset_locks = {
+            dataset: threading.RLock() for dataset in self.DATASETS
+        }
+        # dataset -> id of the thread running its loader
+        self._producers = {}
+        # bumped whenever a loaded attribute is replaced, for caches of
+        # anything derived from the data (e.g. figures)
+        self.data_version = 0
+        # source -> (data version, climatology.Climatology)
+        self._climatologies = {}
+
+    def load(self, name: str):
+        """
+        Load a data attribute, and the attributes its loader requires, unless
+        it is already loaded.
+
+        Args:
+            name (str): Data attribute name.
+        """
+        if name in self._ready:
+            return
+        dataset = self._datasets_by_output[name]
+
+        with self._dataset_locks[dataset]:
+            if (
+                name in self._ready
+                or self._producers.get(dataset) == threading.get_ident()
+            ):
+                # loaded by another thread meanwhile, or read by its own loader
+                return
+
+            for required in dataset.requires:
+                self.load(required)
+
+            self._producers[dataset] = threading.get_ident()
+            try:
+                value = getattr(self, dataset.method)(**dataset.kwargs)
+            finally:
+                del self._producers[dataset]
+
+            if len(dataset.outputs) == 1 and value is not None:
+                self.__dict__[dataset.outputs[0]] = value
+            for output in dataset.outputs:
+                freeze(self.__dict__.get(output))
+            self._ready.update(dataset.outputs)
+
+    def preload(self, background: bool = False) -> threading.Thread | None:
+        """
+        Load every dataset that is not loaded yet, including every variable of
+        the CABCM and TerraClimate collections.
+
+        Sequential unless `max_workers` is set, in which case every dataset
+        loads concurrently and each one waits only for the datasets it requires.
+
+        Args:
+            background (bool, optional): Load in a daemon thread and return at
+                once. Attributes read meanwhile load on demand as usual.
+
+        Returns:
+            threading.Thread: The background thread, or None.
+        """
+        if background:
+            thread = threading.Thread(
+                target=self._preload_logged,
+                name="DataLoader-preload",
+                daemon=True,
+            )
+            thread.start()
+            self._preload_thread = thread
+            return thread
+
+        names = [dataset.outputs[0] for dataset in self.DATASETS]
+        try:
+            if self.max_workers:
+                with ThreadPoolExecutor(max_workers=len(names)) as pool:
+                    list(pool.map(self._preload_dataset, names))
+            else:
+                for name in names:
+                    self._preload_dataset(name)
+        finally:
+            # nothing left to fan out, release the worker threads
+            with self._io_pool_lock:
+                io_pool, self._io_pool = self._io_pool, None
+            if io_pool is not None:
+                io_pool.shutdown()
+
+    def prepare_fork(self):
+        """
+        Load every dataset and wait for the loader's threads to finish, so
+        processes forked afterwards share the complete, read-only data.
+        """
+        self.preload()
+        thread = getattr(self, "_preload_thread", None)
+        if thread is not None:
+            thread.join()
+
+    def _preload_dataset(self, name: str):
+        """Load one dataset, reading every variable of a `LazyFrames`."""
+        value = getattr(self, name)
+        if isinstance(value, LazyFrames):
+            value.preload(self._map)
+
+    def _preload_logged(self):
+        """Background preload; a failed dataset is retried on first access."""
+        try:
+            self.preload()
+        except Exception:
+            log.exception("background preload failed")
+
+    def _map(self, func, items) -> list:
+        """
+        Apply `func` to each item, in parallel when concurrent loading is enabled.
+        """
+        with self._io_pool_lock:
+            io_pool = self._io_pool
+            if io_pool is not None:
+                futures = [io_pool.submit(func, item) for item in items]
+
+        if io_pool is None:
+            return [func(item) for item in items]
+        return [future.result() for future in futures]
+
+    def _get_object_bytes(self, key: str, etag: str = None) -> bytes:
+        """
+        Download a single object from the bucket, or read it from the local
+        S3 cache when the cached copy is still current.
+
+        Args:
+            key (str): Object key.
+            etag (str, optional): ETag of the object, if already known.
+        """
+        with self._fetch_slots:
+            if self.s3_cache is not None:
+                return self.s3_cache.get(
+                    self.s3_client, self.bucket_name, key, etag=etag
+                )
+            obj = self.s3_client.get_object(Bucket=self.bucket_name, Key=key)
+            return obj["Body"].read()
 
     def pd_read_s3_parquet(self, key, **args):
         """S3 or local"""
@@ -113,41 +754,63 @@ class DataLoader:
                 os.path.join(self.local_data_dir, key), **args
             )
         else:
-            obj = self.s3_client.get_object(Bucket=self.bucket_name, Key=key)
-            return pd.read_parquet(io.BytesIO(obj["Body"].read()), **args)
+            data = self._get_object_bytes(key)
+            return pd.read_parquet(io.BytesIO(data), **args)
 
     def pd_read_s3_csv(self, key, **args):
         """S3 or local"""
         if self.use_local:
             return pd.read_csv(os.path.join(self.local_data_dir, key), **args)
         else:
-            obj = self.s3_client.get_object(Bucket=self.bucket_name, Key=key)
-            return pd.read_csv(io.BytesIO(obj["Body"].read()), **args)
+            data = self._get_object_bytes(key)
+            return pd.read_csv(io.BytesIO(data), **args)
 
     def gpd_read_s3_gpk(self, layer, key, driver="GPKG"):
         """S3 or local"""
+        import geopandas as gpd
+
         if self.use_local:
             return gpd.read_file(
                 os.path.join(self.local_data_dir, key), layer=layer
             )
         else:
-            response = self.s3_client.get_object(
-                Bucket=self.bucket_name, Key=key
-            )
-            data = response["Body"].read()
+            data = self._get_object_bytes(key)
             with io.BytesIO(data) as src:
                 gdf = gpd.read_file(src, layer=layer)
             return gdf
 
+    def gpd_read_s3_gpk_layers(
+        self, layers: dict[str, list], key, driver="GPKG"
+    ) -> dict[str, gpd.GeoDataFrame]:
+        """S3 or local. Downloads the GeoPackage once and reads every layer from
+        the same buffer, keeping only the requested columns (None reads all).
+        """
+        import geopandas as gpd
+
+        if self.use_local:
+            src = os.path.join(self.local_data_dir, key)
+            return {
+                layer: gpd.read_file(src, layer=layer, columns=columns)
+                for layer, columns in layers.items()
+            }
+        else:
+            data = self._get_object_bytes(key)
+            gdfs = {}
+            for layer, columns in layers.items():
+                with io.BytesIO(data) as src:
+                    gdfs[layer] = gpd.read_file(
+                        src, layer=layer, columns=columns
+                    )
+            return gdfs
+
     def gpd_read_s3_geojson(self, key):
         """S3 or local"""
+        import geopandas as gpd
+
         if self.use_local:
             return gpd.read_file(os.path.join(self.local_data_dir, key))
         else:
-            response = self.s3_client.get_object(
-                Bucket=self.bucket_name, Key=key
-            )
-            data = response["Body"].read()
+            data = self._get_object_bytes(key)
             with io.BytesIO(data) as src:
                 gdf = gpd.read_file(src)
             return gdf
@@ -161,7 +824,7 @@ class DataLoader:
         )
         return df
 
-    def get_s3_cabcm(self) -> dict[pd.DataFrame]:
+    def get_s3_cabcm(self) -> LazyFrames:
         """
         Load California Basin Characterization Model summarization from S3.
         This is the historic water balance (BCM component).
@@ -172,7 +835,7 @@ class DataLoader:
         AET - mm/month
 
         Returns:
-            dict: Dictionary of pd.DataFrame for each variable.
+            LazyFrames: pd.DataFrame for each variable, read on first access.
         """
         model_vars = [
             "aet",
@@ -185,18 +848,17 @@ class DataLoader:
             "tmn",
             "tmx",
         ]
-        all_vars = {}
 
-        for var in model_vars:
+        def read(var):
             df = self.pd_read_s3_parquet(
-                key=f"water_balance/v2/cabcm/{var}.parquet",
+                f"water_balance/v2/cabcm/{var}.parquet"
             )
             df.index = pd.to_datetime(df["date"])
-            all_vars[var] = df
+            return df
 
-        return all_vars
+        return LazyFrames(model_vars, read)
 
-    def get_s3_terraclim(self) -> pd.DataFrame:
+    def get_s3_terraclim(self) -> LazyFrames:
         """
         Load Terraclim. This is the historic water balance (Terraclim component).
 
@@ -205,7 +867,7 @@ class DataLoader:
         UNITS:
 
         Returns:
-            pd.DataFrame
+            LazyFrames: pd.DataFrame for each variable, read on first access.
         """
         model_vars = [
             "aet",
@@ -224,31 +886,62 @@ class DataLoader:
             "ws",
         ]
 
-        all_vars = {}
-
-        for var in model_vars:
+        def read(var):
             df = self.pd_read_s3_parquet(
-                key=f"water_balance/v2/terraclim/{var}.parquet",
+                f"water_balance/v2/terraclim/{var}.parquet"
             )
             df.index = pd.to_datetime(df["date"])
             df.drop(columns={"date"}, inplace=True)
-            all_vars[var] = df
+            return df
 
-        return all_vars
+        return LazyFrames(model_vars, read)
 
     def get_hydrofabric(self, layer: str) -> gpd.GeoDataFrame:
         """
         read hydrofabric from s3 bucket
 
+        The first call reads every layer the app uses from a single download of
+        the GeoPackage; the reprojected layers are cached for later calls.
+
         Args:
             layer (str): Layer name in the geopackage.
 
         Returns:
             GeoDataFrame: Geopandas dataframe of the specified layer.
         """
-        gdf = self.gpd_read_s3_gpk(
-            key="hydrofabric/jldp_ngen_nhdhr_wells.gpkg", layer=layer
-        )
+        with self._hydrofabric_lock:
+            if layer not in self._hydrofabric:
+                layers = dict(self.HYDROFABRIC_COLUMNS)
+                layers.setdefault(layer, None)  # unlisted layers read in full
+                layers = {
+                    name: columns
+                    for name, columns in layers.items()
+                    if name not in self._hydrofabric
+                }
+                gdfs = self.gpd_read_s3_gpk_layers(
+                    key="hydrofabric/jldp_ngen_nhdhr_wells.gpkg", layers=layers
+                )
+                for name, gdf in gdfs.items():
+                    self._hydrofabric[name] = self.format_hydrofabric(
+                        gdf, name
+                    )
+
+        return self._hydrofabric[layer]
+
+    @staticmethod
+    def format_hydrofabric(
+        gdf: gpd.GeoDataFrame, layer: str
+    ) -> gpd.GeoDataFrame:
+        """
+        Reproject a hydrofabric layer and add the columns the app joins on.
+
+        Args:
+            gdf (GeoDataFrame): Layer as read from the geopackage.
+            layer (str): Layer name in the geopackage.
+
+        Returns:
+            GeoDataFrame: Layer in EPSG:4326.
+        """
         gdf = gdf.to_crs("EPSG:4326")
 
         if layer == "divides":
@@ -358,10 +1051,7 @@ class DataLoader:
             file_path = os.path.join(self.local_data_dir, key)
             ds = xr.open_dataset(file_path, engine="netcdf4")
         else:
-            response = self.s3_client.get_object(
-                Bucket=self.bucket_name, Key=key
-            )
-            file_stream = io.BytesIO(response["Body"].read())
+            file_stream = io.BytesIO(self._get_object_bytes(key))
             ds = xr.open_dataset(file_stream, engine="h5netcdf")
 
         ds = ds.sel(Time=slice("1982-10-01", None))
@@ -401,7 +1091,8 @@ class DataLoader:
             key = obj.key
             # print(key)
             if key.endswith(".parquet"):
-                obj_body = obj.get()["Body"].read()
+                # ETag from the listing lets cached objects skip the request
+                obj_body = self._get_object_bytes(key, etag=obj.e_tag)
                 parquet_buffer = io.BytesIO(obj_body)
                 df = pd.read_parquet(parquet_buffer)
                 stn_id = df["stn_id_dendra"].iloc[0]
@@ -556,6 +1247,17 @@ class DataLoader:
             "wy_precip_inch"
         ].mean()
 
+    def load_ngen(self):
+        """
+        Load the NGen simulation and derive the dashboard variables and the
+        basin-wide aggregates.
+        """
+        self.ds_ngen = self.ngen_dashboard_data(
+            key="webapp_resources/ngen_validation_20250922_monthly.nc"
+        )
+        self.ngen_vol_stats()
+        self.ngen_stats()
+
     def ngen_stats(self):
         """
         process and aggregate ngen simulation for visualizations
@@ -608,14 +1310,265 @@ class DataLoader:
             ],
         )
 
-        # ----- Jalama Cr Tributary Stats -----------
+    def jalama_stats(self) -> pd.DataFrame:
+        """
+        Monthly routed flows of the Jalama Cr tributaries, in CFS.
+        """
         # get flows for Jalama Ck tributaries -----------
-        self.jalama_tributaries_monthly_cfs = self.cfe_routed_flow_cfs[
-            [42, 58, 36]
-        ].copy()
-        self.jalama_tributaries_monthly_cfs["water_year"] = (
-            self.jalama_tributaries_monthly_cfs.index.map(self.water_year)
+        df = self.cfe_routed_flow_cfs[[42, 58, 36]].copy()
+        df["water_year"] = df.index.map(self.water_year)
+        return df
+
+    def build_water_year_summary(self) -> pd.DataFrame:
+        """
+        Basin-wide statistics of every water year, computed in one grouped
+        pass per source, so views of a year (e.g. the summary text) are a
+        row lookup.
+
+        Returns:
+            DataFrame: indexed by water year, with columns
+                wy_precip_inch: TerraClimate precipitation (inch).
+                precip_quartile: precipitation class, e.g. "a near average".
+                precip_ratio: precipitation over the mean annual precipitation.
+                et_vol_af: NGen actual ET volume (acre-feet).
+                et_quartile: ET class, e.g. "near average".
+                baseflow_min_cfs, baseflow_max_cfs: range of the monthly
+                    Jalama Cr tributary flows in June-August (cfs).
+                gw_rise_ft: highest running sum of the mean groundwater
+                    change since Oct 1 (feet).
+                gw_change_ft: running sum at the end of the water year minus
+                    the first month (feet).
+        """
+        precip = self.terraclim_ann_precip
+
+        et_vol_af = (
+            self.ngen_basinwide_et_loss_m3.groupby("water_year")[
+                "ACTUAL_ET_VOL_M3"
+            ].sum()
+            * 0.000810714  # UNIT: m^3 to acre-feet
+        )
+
+        # tributary flows of the dry season (June-August)
+        flows = self.jalama_tributaries_monthly_cfs
+        dry_season = flows.loc[flows.index.month.isin(range(6, 9))]
+        tributaries = dry_season.drop(columns="water_year").groupby(
+            dry_season["water_year"]
+        )
+
+        # running sum of the basin-wide mean groundwater change within each
+        # water year (missing months add nothing)
+        gw_change = (
+            self.ds_ngen["NET_GW_CHANGE_FEET"]
+            .mean(dim="catchment")
+            .to_pandas()
+            .fillna(0)
         )
+        gw_years = self.ds_ngen["wy"].values
+        gw_running = gw_change.groupby(gw_years).cumsum().groupby(gw_years)
+
+        return pd.DataFrame(
+            {
+                "wy_precip_inch": precip["wy_precip_inch"],
+                "precip_quartile": precip["Quartile"],
+                "precip_ratio": precip["wy_precip_inch"]
+                / self.terraclim_mean_annual_precip,
+                "et_vol_af": et_vol_af,
+                "et_quartile": self.et_wy_quartile,
+                "baseflow_min_cfs": tributaries.min().min(axis=1),
+                "baseflow_max_cfs": tributaries.max().max(axis=1),
+                "gw_rise_ft": gw_running.max(),
+                "gw_change_ft": gw_running.last() - gw_running.first(),
+            }
+        ).rename_axis("water_year")
+
+    def build_climatology(self):
+        """
+        Month-of-year statistics of the basin flows, the routed flows and
+        the NGen map variables, per location and basin-wide, computed once
+        for `climatology()` lookups.
+        """
+        sources = {
+            "tnc_domain_q": self.tnc_domain_q[["monthly_vol_af"]].set_axis(
+                [climatology.BASIN], axis=1
+            ),
+            "cfe_q": self.cfe_q[["flow"]].set_axis(
+                [climatology.BASIN], axis=1
+            ),
+            "cfe_routed_flow_af": self.cfe_routed_flow_af,
+            "cfe_routed_flow_cfs": self.cfe_routed_flow_cfs,
+        }
+        for var in self.MAP_CUBE_VARIABLES:
+            if var in self.ds_ngen:
+                sources[var] = (
+                    self.ds_ngen[var]
+                    .transpose("Time", "catchment")
+                    .to_pandas()
+                )
+
+        self.climatology_values = {
+            name: climatology.monthly_frame(values)
+            for name, values in sources.items()
+        }
+        self.climatology_stats = {
+            name: climatology.month_of_year_stats(frame)
+            for name, frame in self.climatology_values.items()
+        }
+
+    def climatology(self, source: str) -> climatology.Climatology:
+        """
+        Month-of-year climatology of a source, for O(1) statistic, "% of
+        average" and anomaly lookups.
+
+        Args:
+            source (str): "tnc_domain_q", "cfe_q", "cfe_routed_flow_af",
+                "cfe_routed_flow_cfs" or an NGen variable of
+                `MAP_CUBE_VARIABLES`.
+
+        Returns:
+            climatology.Climatology: Locations are the source's catchments
+            (or feature ids) as strings, and `climatology.BASIN`.
+        """
+        version, clim = self._climatologies.get(source, (None, None))
+        if version != self.data_version:
+            clim = climatology.Climatology(
+                self.climatology_values[source],
+                self.climatology_stats[source],
+            )
+            self._climatologies[source] = (self.data_version, clim)
+        return clim
+
+    def build_well_aggregates(self):
+        """
+        Aggregate the hourly well levels of every station to daily, monthly
+        and water-year buckets, for `well_pyramid()`.
+        """
+        self.well_aggregates = well_pyramid.build(self.well_data)
+
+    def well_pyramid(self) -> well_pyramid.WellPyramid:
+        """
+        Well levels at the resolution a time window needs: the aggregates of
+        `well_aggregates`, and the hourly `well_data` only for windows short
+        enough to show every value.
+        """
+        return well_pyramid.WellPyramid(
+            self.well_aggregates, hourly=lambda: self.well_data
+        )
+
+    def build_map_cube(self):
+        """
+        Gather the map variables into one dense float32 array of shape
+        (variable, month, catchment), so coloring the map for a variable and
+        month is an array slice instead of a pandas selection and merge.
+
+        Catchments follow the row order of `gdf`. Months are the union of the
+        NGen and routed flow months; missing values are NaN.
+        """
+        ngen_months = pd.DatetimeIndex(self.ds_ngen["Time"].values).strftime(
+            "%Y-%m"
+        )
+        flow_months = self.cfe_routed_flow_af.index.strftime("%Y-%m")
+        months = sorted(set(ngen_months) | set(flow_months))
+        month_pos = {month: i for i, month in enumerate(months)}
+
+        cube = np.full(
+            (len(self.MAP_CUBE_VARIABLES), len(months), len(self.gdf)),
+            np.nan,
+            dtype=np.float32,
+        )
+
+        # position of each gdf row in the source data, -1 where missing
+        ngen_cats = pd.Index(self.ds_ngen["catchment"].values).get_indexer(
+            self.gdf["divide_id"]
+        )
+        flow_cats = self.cfe_routed_flow_af.columns.get_indexer(
+            self.gdf["feature_id"]
+        )
+
+        for i, var in enumerate(self.MAP_CUBE_VARIABLES):
+            if var == "Streamflow Vol. (af)":
+                values = self.cfe_routed_flow_af.to_numpy(dtype=np.float32)
+                rows, cats = [month_pos[m] for m in flow_months], flow_cats
+            else:
+                values = (
+                    self.ds_ngen[var]
+                    .transpose("Time", "catchment")
+                    .values.astype(np.float32)
+                )
+                rows, cats = [month_pos[m] for m in ngen_months], ngen_cats
+
+            found = cats >= 0
+            block = np.full((len(rows), len(cats)), np.nan, dtype=np.float32)
+            block[:, found] = values[:, cats[found]]
+            cube[i, rows] = block
+
+        self.map_cube = cube
+        self.map_cube_variables = list(self.MAP_CUBE_VARIABLES)
+        self.map_cube_months = month_pos
+
+    def build_catchment_geojson(self) -> dict:
+        """
+        Serialize the catchment polygons to GeoJSON once, for every map figure
+        to reference instead of converting the geometries on each render.
+
+        Returns:
+            dict: FeatureCollection, feature ids are the `gdf` row index as
+            strings (the choropleth `locations`).
+        """
+        geometries = shapely.to_geojson(np.asarray(self.gdf["geometry"]))
+        return {
+            "type": "FeatureCollection",
+            "features": [
+                {
+                    "type": "Feature",
+                    "id": str(idx),
+                    "properties": {},
+                    "geometry": json.loads(geometry),
+                }
+                for idx, geometry in zip(self.gdf.index, geometries)
+            ],
+        }
+
+    def build_flowline_coords(self) -> pd.DataFrame:
+        """
+        Coordinates of every flowline for the map's line trace, built once
+        per loaded `gdf_lines` instead of on each map render.
+
+        Returns:
+            DataFrame: lat, lon and divide_id columns, with a separator row
+            (NaN, NaN, None) after each line.
+        """
+        lon, lat, index = map_geometry.line_coordinates(
+            self.gdf_lines["geometry"]
+        )
+        divide_ids = self.gdf_lines["divide_id"].to_numpy()[index]
+        divide_ids[np.isnan(lat)] = None
+        return pd.DataFrame({"lat": lat, "lon": lon, "divide_id": divide_ids})
+
+    def build_catchment_outlines(self) -> dict:
+        """
+        Outline coordinates of each catchment, ready to send as a map line
+        trace, so highlighting a catchment is a dict lookup.
+
+        Returns:
+            dict: divide_id to {"lat": list, "lon": list}, covering every
+            exterior and interior ring of every polygon part.
+        """
+        lon, lat, index = map_geometry.outline_coordinates(
+            self.gdf["geometry"]
+        )
+        # coordinates are grouped by geometry, in gdf row order
+        starts = np.searchsorted(index, np.arange(len(self.gdf)))
+        ends = np.searchsorted(index, np.arange(len(self.gdf)), side="right")
+
+        return {
+            divide_id: {
+                "lat": map_geometry.with_gaps(lat[start:end]),
+                "lon": map_geometry.with_gaps(lon[start:end]),
+            }
+            for divide_id, start, end in zip(
+                self.gdf["divide_id"], starts, ends
+            )
+        }
 
     # def get_historic(self):
     #     """
@@ -719,3 +1672,41 @@ class DataLoader:
         self.ngen_basinwide_et_loss_m3["water_year"] = (
             self.ngen_basinwide_et_loss_m3.index.map(self.water_year)
         )
+
+
+# expose every dataset output as a lazily loaded attribute
+DataLoader._datasets_by_output = {}
+for _dataset in DataLoader.DATASETS:
+    for _name in _dataset.outputs:
+        DataLoader._datasets_by_output[_name] = _dataset
+        setattr(DataLoader, _name, _DatasetAttribute(_name))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Bake all webapp data into a single bundle file."
+    )
+    parser.add_argument("out", help="output bundle path")
+    parser.add_argument(
+        "--bucket",
+        default=os.environ.get("BUCKET_NAME") or "tnc-dangermond",
+        help="S3 bucket to load from",
+    )
+    parser.add_argument(
+        "--local-data-dir", help="load from a local directory instead of S3"
+    )
+    parser.add_argument(
+        "--max-workers",
+        type=int,
+        default=16,
+        help="objects fetched concurrently",
+    )
+    args = parser.parse_args()
+
+    data = DataLoader(
+        bucket_name=args.bucket,
+        local_data_dir=args.local_data_dir,
+        max_workers=args.max_workers,
+    )
+    data.to_bundle(args.out)
+    print(f"wrote {args.out} ({os.path.getsize(args.out) / 1e6:.1f} MB)")
@@ -0,0 +1,155 @@
+"""
+Downsampling of long time series to about as many points as a chart has
+pixels, for the line traces of the figure builders.
+
+`lttb()` (largest triangle three buckets) keeps the visual shape of the line;
+`minmax()` keeps the minimum and maximum of every bucket, so no spike is lost.
+Both return positions into the input, and gaps (NaN) of the input are kept
+as gaps, so a line is never drawn across missing data.
+"""
+
+import numpy as np
+import pandas as pd
+
+# points sent for a chart a few hundred to a thousand pixels wide
+MAX_POINTS = 2000
+
+
+def lttb(x, y, n: int) -> np.ndarray:
+    """
+    Positions of `n` points chosen by largest triangle three buckets: the
+    first and last point, and in each of n - 2 buckets the point forming the
+    largest triangle with the previous choice and the mean of the next bucket.
+    NaN values are skipped.
+
+    Args:
+        x (array-like): Increasing x values (numbers or datetimes).
+        y (array-like): y values.
+        n (int): Number of points to keep.
+
+    Returns:
+        numpy.ndarray: Sorted positions into `x` and `y`.
+    """
+    y = np.asarray(y, dtype=float)
+    valid = np.flatnonzero(~np.isnan(y))
+    if n >= len(valid) or n < 3:
+        return _with_gaps(valid, y)
+
+    xs = _as_float(x)[valid]
+    ys = y[valid]
+    size = len(xs)
+
+    # n - 2 buckets between the first and the last point
+    edges = np.linspace(1, size - 1, n - 1).astype(np.int64)
+    selected = np.empty(n, dtype=np.int64)
+    selected[0], selected[-1] = 0, size - 1
+
+    a = 0
+    for i in range(n - 2):
+        start, end = edges[i], edges[i + 1]
+        if i + 2 < len(edges):
+            next_x = xs[end : edges[i + 2]].mean()
+            next_y = ys[end : edges[i + 2]].mean()
+        else:
+            next_x, next_y = xs[-1], ys[-1]
+        area = np.abs(
+            (xs[a] - next_x) * (ys[start:end] - ys[a])
+            - (xs[a] - xs[start:end]) * (next_y - ys[a])
+        )
+        a = start + int(area.argmax())
+        selected[i + 1] = a
+
+    return _with_gaps(valid[selected], y)
+
+
+def minmax(y, n: int) -> np.ndarray:
+    """
+    Positions of the minimum and maximum of each of n / 2 equal buckets,
+    plus the first and last point. NaN values are skipped.
+
+    Args:
+        y (array-like): y values.
+        n (int): Number of points to keep (about).
+
+    Returns:
+        numpy.ndarray: Sorted positions into `y`.
+    """
+    y = np.asarray(y, dtype=float)
+    size = len(y)
+    buckets = max(n // 2, 1)
+    if size <= n:
+        return _with_gaps(np.flatnonzero(~np.isnan(y)), y)
+
+    edges = np.linspace(0, size, buckets + 1).astype(np.int64)
+    bucket = np.repeat(np.arange(buckets), np.diff(edges))
+
+    positions = [np.flatnonzero(~np.isnan(y[[0, -1]])) * (size - 1)]
+    for reduce in (np.fmin, np.fmax):
+        extreme = reduce.reduceat(y, edges[:-1])
+        hits = np.flatnonzero(y == extreme[bucket])
+        # first hit per bucket (all-NaN buckets have none)
+        _, first = np.unique(bucket[hits], return_index=True)
+        positions.append(hits[first])
+
+    return _with_gaps(np.unique(np.concatenate(positions)), y)
+
+
+def series(
+    values: pd.Series, n: int = MAX_POINTS, method: str = "minmax"
+) -> pd.Series:
+    """
+    Downsample a series with a sorted index to about `n` points.
+
+    Args:
+        values (pd.Series): Series to downsample.
+        n (int, optional): Points to keep. Defaults to MAX_POINTS.
+        method (str, optional): "minmax" or "lttb". Defaults to "minmax".
+
+    Returns:
+        pd.Series: The selected points, or `values` if it is short enough.
+    """
+    if len(values) <= n:
+        return values
+    if method == "lttb":
+        positions = lttb(values.index, values.to_numpy(), n)
+    else:
+        positions = minmax(values.to_numpy(), n)
+    return values.iloc[positions]
+
+
+def window(
+    values: pd.Series, start, end, n: int = MAX_POINTS, method="minmax"
+) -> pd.Series:
+    """
+    The points of a series with a sorted index between `start` and `end`, at
+    full resolution if there are at most `n`, else downsampled to `n`. Used
+    to refine a downsampled chart for a zoomed window.
+    """
+    index = values.index
+    first = index.searchsorted(start, side="left")
+    last = index.searchsorted(end, side="right")
+    # one point beyond each side, so the line reaches the window edges
+    first, last = max(first - 1, 0), min(last + 1, len(values))
+    return series(values.iloc[first:last], n, method)
+
+
+def _as_float(x) -> np.ndarray:
+    """x values as floats, datetimes as nanoseconds."""
+    x = np.asarray(x)
+    if x.dtype.kind == "M":
+        return x.astype("datetime64[ns]").astype(np.int64).astype(float)
+    return x.astype(float)
+
+
+def _with_gaps(positions: np.ndarray, y: np.ndarray) -> np.ndarray:
+    """
+    Add the position of the first NaN between two selected points that have
+    missing values between them, so the line breaks there.
+    """
+    if len(positions) < 2:
+        return positions
+    missing = np.cumsum(np.isnan(y))
+    before, after = positions[:-1], positions[1:]
+    has_gap = missing[after - 1] - missing[before] > 0
+    gaps = np.searchsorted(missing, missing[before[has_gap]] + 1)
+    return np.union1d(positions, gaps)
@@ -0,0 +1,169 @@
+import threading
+from collections import OrderedDict
+
+from plotly.basedatatypes import BaseFigure
+from plotly.io.json import to_json_plotly
+
+
+class FigureCache:
+    """Bounded, least recently used cache of built figures.
+
+    Entries are keyed by the builder inputs and tagged with the version of the
+    data they were built from (`DataLoader.data_version`). Seeing a newer data
+    version drops every entry, so figures of replaced data are never served.
+
+    Figures are stored as plain dicts (`Figure.to_plotly_json()`), which Dash
+    returns as-is without validating or copying the figure again. Entry sizes
+    are the length of their JSON encoding.
+
+    With a `shared` cache (`shared_cache.SharedCache`), it is the second tier:
+    a value missing in memory is looked up there before it is built, and every
+    built value is written there, so worker processes build each figure once.
+
+    Attributes:
+    ----------
+        max_bytes : int
+            Size cap of all entries, in bytes.
+        max_entries : int
+            Maximum number of entries.
+        hits : int
+            Number of lookups served from the cache.
+        misses : int
+            Number of lookups that built the figure.
+        shared_hits : int
+            Number of lookups served from the shared cache.
+    """
+
+    def __init__(
+        self,
+        max_bytes: int = 64 * 1024**2,
+        max_entries: int = 1024,
+        shared=None,
+        namespace: str = "",
+        encode=None,
+    ):
+        """
+        Parameters:
+        ----------
+        max_bytes : int
+            Evict least recently used entries beyond this total size. Defaults
+            to 64 MB; 0 disables the cache.
+        max_entries : int
+            Evict least recently used entries beyond this count. Defaults to 1024.
+        shared : shared_cache.SharedCache
+            Cache shared with other processes. Defaults to None.
+        namespace : str
+            Prefix of the shared cache keys, identifying the loaded data (the
+            data version only counts changes within one process).
+        encode : callable
+            Applied to each built value before it is stored, e.g.
+            `payload.encode` for compact figure data. Defaults to None.
+        """
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self.shared = shared
+        self.namespace = namespace
+        self.encode = encode
+        self.hits = 0
+        self.misses = 0
+        self.shared_hits = 0
+
+        self._entries = OrderedDict()  # key -> (value, size)
+        self._bytes = 0
+        self._version = None
+        self._lock = threading.Lock()
+
+    def get_or_build(self, key, build, version=None):
+        """
+        Return the cached value for `key`, or build, store and return it.
+
+        Args:
+            key (hashable): Builder inputs identifying the figure.
+            build (callable): Builds the value when it is not cached: a figure,
+                or a tuple holding figures and other JSON-serializable values.
+            version (optional): Version of the data the figure is built from.
+
+        Returns:
+            The value, with figures as plain dicts.
+        """
+        with self._lock:
+            if version != self._version:
+                self._clear()
+                self._version = version
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[0]
+
+        # build outside the lock, so other figures are served meanwhile
+        shared_key = f"{self.namespace}|{version}|{key!r}"
+        value, size = None, None
+        if self.shared is not None:
+            value, size = self.shared.get_sized(shared_key)
+
+        if value is not None:
+            with self._lock:
+                self.shared_hits += 1
+        else:
+            with self._lock:
+                self.misses += 1
+            value = _plain(build())
+            if self.encode is not None:
+                value = self.encode(value)
+            if self.shared is not None:
+                # the shared cache encodes the value anyway
+                size = self.shared.set(shared_key, value)
+
+        if self.max_bytes == 0:
+            return value
+        if size is None:
+            size = len(to_json_plotly(value))
+
+        with self._lock:
+            if version == self._version and size <= self.max_bytes:
+                self._store(key, value, size)
+        return value
+
+    def clear(self):
+        """Drop every entry."""
+        with self._lock:
+            self._clear()
+
+    def stats(self) -> dict:
+        """Hit/miss counters and current size."""
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "shared_hits": self.shared_hits,
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+            }
+
+    def _store(self, key, value, size: int):
+        previous = self._entries.pop(key, None)
+        if previous is not None:
+            self._bytes -= previous[1]
+        self._entries[key] = (value, size)
+        self._bytes += size
+
+        while self._entries and (
+            self._bytes > self.max_bytes
+            or len(self._entries) > self.max_entries
+        ):
+            _, (_, evicted_size) = self._entries.popitem(last=False)
+            self._bytes -= evicted_size
+
+    def _clear(self):
+        self._entries.clear()
+        self._bytes = 0
+
+
+def _plain(value):
+    """Figures (also inside a tuple) to plain dicts."""
+    if isinstance(value, BaseFigure):
+        return value.to_plotly_json()
+    if isinstance(value, tuple):
+        return tuple(_plain(v) for v in value)
+    return value
@@ -0,0 +1,125 @@
+"""
+Plain-dict construction of the line figures, equivalent to `px.line` followed
+by `add_trace` and `update_layout`, without plotly.express DataFrame
+introspection or graph object validation. The default template is converted
+once and shared by every figure.
+
+Outside production (`DASH_PROD` not "True") every figure is still validated
+through `go.Figure`, so an invalid property fails during development.
+"""
+
+import functools
+import os
+
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+import plotly.io as pio
+from _plotly_utils.utils import to_typed_array_spec
+
+from figures import downsample
+
+VALIDATE = os.getenv("DASH_PROD") != "True"
+
+# style px.line gives the first line of a figure
+_PX_LINE = {"color": "#636efa", "dash": "solid"}
+
+
+@functools.lru_cache(maxsize=None)
+def template() -> dict:
+    """The default plotly template as a dict, converted once."""
+    return pio.templates[pio.templates.default].to_plotly_json()
+
+
+def array(values):
+    """Values as plotly.js sends them: typed array spec, dates as is."""
+    return to_typed_array_spec(np.asarray(values))
+
+
+def px_line_trace(
+    series: pd.Series, name: str = None, max_points: int = None
+) -> dict:
+    """
+    Trace of `px.line(series)` (or of a one-column DataFrame), hover labels
+    included.
+
+    Args:
+        series (pd.Series): Values, indexed by the x values.
+        name (str, optional): Trace name. Defaults to the series name.
+        max_points (int, optional): Downsample longer series to about this
+            many points, see `downsample.series()`. Defaults to all points.
+    """
+    if max_points is not None:
+        series = downsample.series(series, max_points)
+    variable = str(series.name)
+    x_label = series.index.name or "index"
+    # px renames its value column when a column is already called "value"
+    value_label = "_value" if variable == "value" else "value"
+    return {
+        "hovertemplate": (
+            f"variable={variable}<br>{x_label}=%{{x}}<br>"
+            f"{value_label}=%{{y}}<extra></extra>"
+        ),
+        "legendgroup": variable,
+        "line": dict(_PX_LINE),
+        "marker": {"symbol": "circle"},
+        "mode": "lines",
+        "name": variable if name is None else name,
+        "orientation": "v",
+        "showlegend": True,
+        "x": array(series.index),
+        "xaxis": "x",
+        "y": array(series.to_numpy()),
+        "yaxis": "y",
+        "type": "scatter",
+    }
+
+
+def line_trace(x, y, name: str, max_points: int = None) -> dict:
+    """
+    Trace of `go.Scatter(x=x, y=y, mode="lines", name=name)`, downsampled to
+    about `max_points` like `px_line_trace()`.
+    """
+    if max_points is not None and len(y) > max_points:
+        positions = downsample.minmax(y, max_points)
+        x, y = np.asarray(x)[positions], np.asarray(y)[positions]
+    return {
+        "mode": "lines",
+        "name": name,
+        "x": array(x),
+        "y": array(y),
+        "type": "scatter",
+    }
+
+
+def px_layout(title: str, yaxis_title: str, **updates) -> dict:
+    """
+    Layout of a `px.line` figure after `update_layout(title=..., title_x=0.5,
+    xaxis_title="", yaxis_title=...)`, with further `updates` applied
+    (nested dicts are merged).
+    """
+    layout = {
+        "template": template(),
+        "xaxis": {"anchor": "y", "domain": [0.0, 1.0], "title": {"text": ""}},
+        "yaxis": {
+            "anchor": "x",
+            "domain": [0.0, 1.0],
+            "title": {"text": yaxis_title},
+        },
+        "legend": {"title": {"text": "variable"}, "tracegroupgap": 0},
+        "title": {"text": title, "x": 0.5},
+    }
+    for key, value in updates.items():
+        if isinstance(value, dict) and isinstance(layout.get(key), dict):
+            layout[key] = {**layout[key], **value}
+        else:
+            layout[key] = value
+    return layout
+
+
+def figure(data: list, layout: dict) -> dict:
+    """Figure dict of traces and a layout, validated outside production."""
+    fig = {"data": data, "layout": layout}
+    if VALIDATE:
+        go.Figure(fig)
+    return fig
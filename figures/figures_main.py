@@ -1,5 +1,7 @@
 import plotly.express as px
 import plotly.graph_objs as go
+from dash import Patch, html
+import dash_bootstrap_components as dbc
 from plotly.subplots import make_subplots
 
 import pandas as pd
@@ -8,118 +10,138 @@ import shapely.geometry
 import numpy as np
 import json
 import data_loader
+from plotly.io.json import to_json_plotly
+from figures import downsample, figure_dicts, map_geometry, payload
+
+# water years offered by the year dropdown
+WATER_YEARS = range(1983, 2024)
+
+# points of a time series line at most, longer series are downsampled
+MAX_POINTS = downsample.MAX_POINTS
+
+
+# Translate between dropdown names, `DataLoader.map_cube` variables, Legend
+# names and color scales
+MAP_VARIABLES = {
+    "Streamflow": [
+        "Streamflow Vol. (af)",
+        "Streamflow <br>(acre-feet)",
+        px.colors.sequential.Viridis_r,
+    ],
+    "Groundwater Storage": [
+        "NET_VOL_ACRE_FT",
+        "Groundwater Storage Change <br>(acre-feet)",
+        px.colors.sequential.Viridis,
+    ],
+    "Actual ET": [
+        "ACTUAL_ET_INCH",
+        "Actual <br>Evapotranspiration <br>(inches)",
+        px.colors.sequential.Viridis,
+    ],
+    "Potential ET": [
+        "POTENTIAL_ET_INCH",
+        "Potential <br>Evapotranspiration <br>(inches)",
+        px.colors.sequential.Viridis,
+    ],
+    "Precipitation": [
+        "RAIN_RATE_INCH",
+        "Precipitation <br>(inches)",
+        px.colors.sequential.Viridis,
+    ],
+}
+
+
+def map_values(data, display_var, time):
+    """
+    Values of a map variable for one month, one per catchment in `data.gdf`
+    row order. This is a slice of `data.map_cube`, without any pandas
+    selection or merge.
+
+    Parameters:
+    ----------
+    data : DataLoader
+        Loaded webapp data.
+    display_var : str
+        Map variable, a key of `MAP_VARIABLES`.
+    time : str
+        The timestamp (formatted as "YYYY-MM-DD"); only the month is used.
+
+    Returns:
+    -------
+    numpy.ndarray
+        float32 values, NaN for a month without data.
+    """
+    var = data.map_cube_variables.index(MAP_VARIABLES[display_var][0])
+    month = data.map_cube_months.get(time[:7])
+    if month is None:
+        return np.full(data.map_cube.shape[2], np.nan, dtype=np.float32)
+    return data.map_cube[var, month]
 
 
-def mapbox_lines(
-    gdf,
-    gdf_outline,
-    display_var,
-    ds,
-    gdf_wells,
-    gdf_lines,
-    time,
-    cfe_routed_flow_af,
-):
+def mapbox_lines(data, display_var, time):
     """
     Generates a primary map visualization using Mapbox, displaying flow paths, catchments,
     and other spatial data within the Dangermond Preserve.
 
     Parameters:
     ----------
-    gdf : geopandas.GeoDataFrame
-        Geospatial dataset representing catchment polygons.
-    gdf_outline : geopandas.GeoDataFrame
-        Geospatial dataset outlining the preserve boundary.
+    data : DataLoader
+        Loaded webapp data: catchment polygons (`gdf`), the preserve boundary
+        (`gdf_outline`), wells, flowlines and the map variable cube.
     display_var : str
         The variable name to be used for color mapping in the choropleth layer.
-    ds : xarray.Dataset
-        Dataset containing time-series data to be used for coloring catchment polygons.
-    gdf_wells : geopandas.GeoDataFrame
-        Dataset containing well locations and associated data.
-    gdf_lines : geopandas.GeoDataFrame
-        Geospatial dataset representing streamflow paths.
     time : str
         The timestamp (formatted as "YYYY-MM-DD") to filter time-dependent data.
-    cfe_routed_flow_af : pandas.DataFrame
-        DataFrame containing routed streamflow volume data in acre-feet.
 
     Returns:
     -------
     fig : plotly.graph_objects.Figure
         A Mapbox-based visualization of catchments, flowlines, and well locations.
     """
-    # get nexgen output to color polygons by
-    year_month = time[:7]
-    print(year_month)
-
-    # Translate between button names, xr.Dataset names, and Legend names
-    # item 0 = dataset name, item 1 = legend name
-    access_dict = {
-        "Streamflow": [
-            "Streamflow Vol. (af)",
-            "Streamflow <br>(acre-feet)",
-        ],
-        "Groundwater Storage": [
-            "NET_VOL_ACRE_FT",
-            "Groundwater Storage Change <br>(acre-feet)",
-        ],
-        "Actual ET": [
-            "ACTUAL_ET_INCH",
-            "Actual <br>Evapotranspiration <br>(inches)",
-        ],
-        "Potential ET": [
-            "POTENTIAL_ET_INCH",
-            "Potential <br>Evapotranspiration <br>(inches)",
-        ],
-        "Precipitation": [
-            "RAIN_RATE_INCH",
-            "Precipitation <br>(inches)",
-        ],
-    }
-
-    ds_var = access_dict[display_var][0]
-
-    if ds_var == "Streamflow Vol. (af)":
-        # if flows, use routed data, not xr.dataset
-        colors = cfe_routed_flow_af.loc[year_month]
-        colors = colors.melt(
-            var_name="feature_id", value_name="Streamflow Vol. (af)"
+    gdf = data.gdf
+    gdf_outline = data.gdf_outline
+    gdf_wells = data.gdf_wells
+
+    ds_var, legend, color_scale = MAP_VARIABLES[display_var]
+
+    # catchment values come straight from the cube, in gdf row order, so they
+    # line up with the polygons without a merge
+    fig = go.Figure(
+        go.Choroplethmap(
+            geojson=data.catchment_geojson,
+            locations=gdf.index.astype(str),
+            z=map_values(data, display_var, time),
+            coloraxis="coloraxis",
+            customdata=gdf[["divide_id"]].to_numpy(),
+            hovertemplate=(
+                "divide_id=%{customdata[0]}<br>"
+                + legend
+                + "=%{z}<extra></extra>"
+            ),
         )
-        # display_var = "Streamflow Vol. (af)"  # set to actual col name in gdf
-        # display_var = access_dict[display_var][0]
-        gdf_color = pd.merge(gdf, colors, on="feature_id", how="outer")
-        color_scale = px.colors.sequential.Viridis_r
-
-    else:
-        # if any other output vars, just select from xr.dataset
-        colors = ds[ds_var].sel(Time=year_month).to_dataframe()
-        colors = colors[[ds_var]]
-        gdf_color = pd.merge(gdf, colors, on="catchment", how="outer")
-        color_scale = px.colors.sequential.Viridis
-    fig = px.choropleth_map(
-        gdf_color,
-        geojson=gdf_color.geometry,
-        locations=gdf.index,
-        # opacity=1,
-        color=access_dict[display_var][0],
-        hover_data=["divide_id"],
-        center={
-            "lat": 34.51,
-            "lon": -120.47,
-        },  # not sure why this is not automatic
-        # mapbox_style="open-street-map",
-        zoom=10.3,
-        custom_data=["divide_id"],  # Add your fields
-        labels={ds_var: access_dict[display_var][1]},
-        color_continuous_scale=color_scale,
+    )
+    fig.update_layout(
+        coloraxis=dict(
+            colorscale=color_scale,
+            colorbar=dict(title=dict(text=legend)),
+        ),
+        map=dict(
+            center={
+                "lat": 34.51,
+                "lon": -120.47,
+            },  # not sure why this is not automatic
+            zoom=10.3,
+        ),
     )
 
     # add catchment outline (single outline currently)
-    catchment_lats = list(gdf["geometry"][0].exterior.xy[1])
-    catchment_lons = list(gdf["geometry"][0].exterior.xy[0])
+    outline = data.catchment_outlines[gdf["divide_id"].iloc[0]]
+    catchment_lats = outline["lat"]
+    catchment_lons = outline["lon"]
 
-    # add flowline
-    lats, lons, names = mapbox_line_gdf_fmt(gdf_lines, id_col="divide_id")
+    # add flowline, coordinates are prepared once by the loader
+    lats = map_geometry.with_gaps(data.flowline_coords["lat"])
+    lons = map_geometry.with_gaps(data.flowline_coords["lon"])
 
     # any additional layers must be added AFTER this layer
     # this is a placeholder for the active polygon highlight
@@ -162,9 +184,12 @@ def mapbox_lines(
             # hoverinfo="text",
         )
     )
-    # add dandgermond outline
-    outline_lats = list(gdf_outline["geometry"][0].exterior.xy[1])
-    outline_lons = list(gdf_outline["geometry"][0].exterior.xy[0])
+    # add dandgermond outline, all rings and parts
+    outline_lons, outline_lats, _ = map_geometry.outline_coordinates(
+        gdf_outline["geometry"]
+    )
+    outline_lats = map_geometry.with_gaps(outline_lats)
+    outline_lons = map_geometry.with_gaps(outline_lons)
     fig.add_trace(
         go.Scattermap(
             lat=outline_lats, lon=outline_lons, mode="lines", hoverinfo="skip"
@@ -199,31 +224,41 @@ def mapbox_lines(
     return fig
 
 
-def mapbox_line_gdf_fmt(gdf, id_col="ID"):
-    """ """
-    lats = []
-    lons = []
-    names = []
-
-    for feature, name in zip(gdf.geometry, gdf[id_col]):
-        if isinstance(feature, shapely.geometry.linestring.LineString):
-            linestrings = [feature]
-        elif isinstance(
-            feature, shapely.geometry.multilinestring.MultiLineString
-        ):
-            linestrings = feature.geoms
-        else:
-            continue
-        for linestring in linestrings:
-            x, y = linestring.xy
-            lats = np.append(lats, y)
-            lons = np.append(lons, x)
-            names = np.append(names, [name] * len(y))
-            lats = np.append(lats, None)
-            lons = np.append(lons, None)
-            names = np.append(names, None)
-
-    return lats, lons, names
+def mapbox_lines_patch(data, display_var, time):
+    """
+    Recolor a map made by `mapbox_lines()` for another variable or month.
+
+    Only the catchment values, the colorbar title, the color scale and the hover
+    label change, so the polygons, flowlines, wells and outline already in the
+    browser are left alone.
+
+    Parameters:
+    ----------
+    data : DataLoader
+        Loaded webapp data.
+    display_var : str
+        The variable name to be used for color mapping in the choropleth layer.
+    time : str
+        The timestamp (formatted as "YYYY-MM-DD") to filter time-dependent data.
+
+    Returns:
+    -------
+    dash.Patch
+        Partial update of the map figure.
+    """
+    ds_var, legend, color_scale = MAP_VARIABLES[display_var]
+
+    patched_figure = Patch()
+    patched_figure["data"][0]["z"] = map_values(data, display_var, time)
+    patched_figure["data"][0]["hovertemplate"] = (
+        "divide_id=%{customdata[0]}<br>" + legend + "=%{z}<extra></extra>"
+    )
+    patched_figure["layout"]["coloraxis"]["colorbar"]["title"]["text"] = legend
+    # a Patch skips figure validation, so give the scale as [value, color] pairs
+    patched_figure["layout"]["coloraxis"]["colorscale"] = (
+        px.colors.make_colorscale(color_scale)
+    )
+    return patched_figure
 
 
 # def precip_bar_fig(data):
@@ -366,190 +401,122 @@ def plot_q_out(data, cat_id):
     feature_id = int(cat_id.split("-")[1])  # get int value only
     cfe_flow_series = data.cfe_routed_flow_af[feature_id]
 
-    fig = px.line(cfe_flow_series, title="Streamflow Comparison")
-
-    # fig.add_trace(
-    #     go.Scatter(
-    #         x=df_ng.index,
-    #         y=df_ng.iloc[:, 0],
-    #         mode="lines",
-    #         name="CFE Streamflow",
-    #     )
-    # )
-
-    fig.update_layout(
-        autosize=True,
-        title={"text": f"Catchment - {cat_id}: Streamflow"},
-        title_x=0.5,
-        yaxis_title="Monthly Volume (acre-feet)",
-        uirevision="Don't change",
-        plot_bgcolor="white",
-        xaxis_title="",
-        showlegend=False,
-        # legend=dict(
-        #     orientation="h",  # Make legend horizontal
-        #     yanchor="top",
-        #     y=-0.2,  # Move below the plot (adjust if needed)
-        #     xanchor="center",
-        #     x=0.5,  # Center the legend
-        # ),
+    return figure_dicts.figure(
+        [figure_dicts.px_line_trace(cfe_flow_series, max_points=MAX_POINTS)],
+        figure_dicts.px_layout(
+            f"Catchment - {cat_id}: Streamflow",
+            "Monthly Volume (acre-feet)",
+            autosize=True,
+            uirevision="Don't change",
+            plot_bgcolor="white",
+            showlegend=False,
+        ),
     )
 
-    return fig
 
+# legend below the plot
+_LEGEND_BELOW = dict(
+    orientation="h",  # Make legend horizontal
+    yanchor="top",
+    y=-0.2,  # Move below the plot (adjust if needed)
+    xanchor="center",
+    x=0.5,  # Center the legend
+)
 
-def plot_actual_et(data, cat_id):
-    """Plot Actual Evapotranspiration (AET) for a selected catchment."""
-    df_aet = data.df_cabcm["aet"]
-    df_sub = df_aet[df_aet["divide_id"] == cat_id]
 
-    fig = px.line(df_sub[["value"]])
-    fig.update_traces(name="CABCM", showlegend=True)
+def _plot_et(data, cat_id, cabcm_var, ngen_var, label):
+    """CABCM and CFE evapotranspiration of a catchment, in mm/month."""
+    df_et = data.df_cabcm[cabcm_var]
+    df_sub = df_et[df_et["divide_id"] == cat_id]
 
-    df_ng = (
-        pd.DataFrame(
-            data.ds_ngen["ACTUAL_ET"].sel({"catchment": cat_id}).to_pandas()
-        )
+    ngen_series = (
+        data.ds_ngen[ngen_var].sel({"catchment": cat_id}).to_pandas()
         * 1000  # UNIT: m/month to mm/month
     )
 
-    fig.add_trace(
-        go.Scatter(
-            x=df_ng.index,
-            y=df_ng.iloc[:, 0],
-            mode="lines",
-            name="CFE AET",
-        )
-    )
-
-    fig.update_layout(
-        yaxis_title="millimeters",
-        autosize=True,
-        title={"text": f"Catchment - {cat_id}: AET"},
-        title_x=0.5,
-        uirevision="Don't change",
-        plot_bgcolor="white",
-        xaxis_title="",
-        legend=dict(
-            orientation="h",  # Make legend horizontal
-            yanchor="top",
-            y=-0.2,  # Move below the plot (adjust if needed)
-            xanchor="center",
-            x=0.5,  # Center the legend
+    return figure_dicts.figure(
+        [
+            figure_dicts.px_line_trace(
+                df_sub["value"],
+                name=f"CABCM{label['cabcm']}",
+                max_points=MAX_POINTS,
+            ),
+            figure_dicts.line_trace(
+                ngen_series.index,
+                ngen_series.to_numpy(),
+                f"CFE {label['cfe']}",
+                max_points=MAX_POINTS,
+            ),
+        ],
+        figure_dicts.px_layout(
+            f"Catchment - {cat_id}: {label['cfe']}",
+            "millimeters",
+            margin={"t": 60},
+            autosize=True,
+            uirevision="Don't change",
+            plot_bgcolor="white",
+            legend=_LEGEND_BELOW,
         ),
     )
 
-    return fig
-
 
-def plot_potential_et(data, cat_id):
-    """Plot Potential Evapotranspiration (PET) for a selected catchment."""
-    df_aet = data.df_cabcm["pet"]
-    df_sub = df_aet[df_aet["divide_id"] == cat_id]
-
-    fig = px.line(df_sub[["value"]])
-    fig.update_traces(name="CABCM PET", showlegend=True)
-
-    df_ng = (
-        pd.DataFrame(
-            data.ds_ngen["POTENTIAL_ET"].sel({"catchment": cat_id}).to_pandas()
-        )
-        * 1000  # UNIT: m/month to mm/month
+def plot_actual_et(data, cat_id):
+    """Plot Actual Evapotranspiration (AET) for a selected catchment."""
+    return _plot_et(
+        data, cat_id, "aet", "ACTUAL_ET", {"cabcm": "", "cfe": "AET"}
     )
 
-    fig.add_trace(
-        go.Scatter(
-            x=df_ng.index,
-            y=df_ng.iloc[:, 0],
-            mode="lines",
-            name="CFE PET",
-        )
-    )
 
-    fig.update_layout(
-        yaxis_title="millimeters",
-        autosize=True,
-        title={"text": f"Catchment - {cat_id}: PET"},
-        title_x=0.5,
-        uirevision="Don't change",
-        plot_bgcolor="white",
-        xaxis_title="",
-        legend=dict(
-            orientation="h",  # Make legend horizontal
-            yanchor="top",
-            y=-0.2,  # Move below the plot (adjust if needed)
-            xanchor="center",
-            x=0.5,  # Center the legend
-        ),
+def plot_potential_et(data, cat_id):
+    """Plot Potential Evapotranspiration (PET) for a selected catchment."""
+    return _plot_et(
+        data, cat_id, "pet", "POTENTIAL_ET", {"cabcm": " PET", "cfe": "PET"}
     )
 
-    return fig
-
 
 def plot_precip(data, cat_id):
-    """ """
+    """Plot monthly AORC precipitation for a selected catchment."""
     ppt_aorc_series = (
         data.ds_ngen["RAIN_RATE_INCHES"].sel({"catchment": cat_id}).to_pandas()
     )
-    fig = px.line(ppt_aorc_series)
-    # fig.update_traces(name="Precip", showlegend=True)
-    fig.update_layout(
-        autosize=True,
-        title={"text": f"Catchment - {cat_id}: Precipitation"},
-        title_x=0.5,
-        yaxis_title="Precipitation (inches)",
-        uirevision="Don't change",
-        plot_bgcolor="white",
-        xaxis_title="",
-        showlegend=False,
-        color_continuous_scale=px.colors.sequential.Viridis_r,
-        # legend=dict(
-        #     orientation="h",  # Make legend horizontal
-        #     yanchor="top",
-        #     y=-0.2,  # Move below the plot (adjust if needed)
-        #     xanchor="center",
-        #     x=0.5,  # Center the legend
-        # ),
+    return figure_dicts.figure(
+        [figure_dicts.px_line_trace(ppt_aorc_series, max_points=MAX_POINTS)],
+        figure_dicts.px_layout(
+            f"Catchment - {cat_id}: Precipitation",
+            "Precipitation (inches)",
+            margin={"t": 60},
+            autosize=True,
+            uirevision="Don't change",
+            plot_bgcolor="white",
+            showlegend=False,
+        ),
     )
-    return fig
 
 
 def plot_default(data):
     """Plot default basin streamflow (monthly volume) when no catchment is selected."""
-    fig = px.line(data.cfe_q["flow"])
-    fig.data[0].name = "CFE Q"  # manually set name
-
-    fig.add_trace(
-        go.Scatter(
-            x=data.tnc_domain_q.index,
-            y=data.tnc_domain_q["monthly_vol_af"],
-            mode="lines",
-            name="Natural Flows",
-        )
-    )
-
-    fig.update_layout(
-        autosize=True,
-        title={"text": f"Basin Streamflow Volume"},
-        title_x=0.5,
-        yaxis_title="Monthly Volume (acre-feet)",
-        uirevision="Don't change",
-        plot_bgcolor="white",
-        xaxis_title="",
-        legend_title_text="",
-        # paper_bgcolor="#f4f4f4",
-        legend=dict(
-            orientation="h",  # Make legend horizontal
-            yanchor="top",
-            y=-0.2,  # Move below the plot (adjust if needed)
-            xanchor="center",
-            x=0.5,  # Center the legend
+    return figure_dicts.figure(
+        [
+            figure_dicts.px_line_trace(
+                data.cfe_q["flow"], name="CFE Q", max_points=MAX_POINTS
+            ),
+            figure_dicts.line_trace(
+                data.tnc_domain_q.index,
+                data.tnc_domain_q["monthly_vol_af"].to_numpy(),
+                "Natural Flows",
+                max_points=MAX_POINTS,
+            ),
+        ],
+        figure_dicts.px_layout(
+            "Basin Streamflow Volume",
+            "Monthly Volume (acre-feet)",
+            margin={"t": 60},
+            autosize=True,
+            uirevision="Don't change",
+            plot_bgcolor="white",
+            legend={"title": {"text": ""}, **_LEGEND_BELOW},
         ),
     )
-    # fig.update_xaxes(gridcolor="#f4f4f4")
-    # fig.update_yaxes(gridcolor="#f4f4f4")
-
-    return fig
 
 
 def plot_storage(data, cat_id):
@@ -560,27 +527,85 @@ def plot_storage(data, cat_id):
     gw_vol_series = (
         data.ds_ngen["NET_VOL_ACRE_FT"].sel({"catchment": cat_id}).to_pandas()
     )
-    fig = px.line(gw_vol_series)
-    # fig.update_traces(name="Precip", showlegend=True)
-    fig.update_layout(
-        autosize=True,
-        title={"text": f"Catchment - {cat_id}: Change in Storage Volume"},
-        title_x=0.5,
-        yaxis_title="(acre-feet)",
-        uirevision="Don't change",
-        plot_bgcolor="white",
-        xaxis_title="",
-        showlegend=False,
-        # color_continuous_scale=px.colors.sequential.deep,  # Set color ramp to Plasma
-        # legend=dict(
-        #     orientation="h",  # Make legend horizontal
-        #     yanchor="top",
-        #     y=-0.2,  # Move below the plot (adjust if needed)
-        #     xanchor="center",
-        #     x=0.5,  # Center the legend
-        # ),
+    return figure_dicts.figure(
+        [figure_dicts.px_line_trace(gw_vol_series, max_points=MAX_POINTS)],
+        figure_dicts.px_layout(
+            f"Catchment - {cat_id}: Change in Storage Volume",
+            "(acre-feet)",
+            margin={"t": 60},
+            autosize=True,
+            uirevision="Don't change",
+            plot_bgcolor="white",
+            showlegend=False,
+        ),
     )
-    return fig
+
+
+# water balance figure of each dropdown variable, for a clicked catchment
+WATER_BALANCE_PLOTS = {
+    "Streamflow": plot_q_out,
+    "Actual ET": plot_actual_et,
+    "Precipitation": plot_precip,
+    "Groundwater Storage": plot_storage,
+    "Potential ET": plot_potential_et,
+}
+
+
+def water_balance_figures(data, cat_id=None) -> dict:
+    """
+    The water balance figures of every dropdown variable for a catchment, as
+    one payload for the browser to switch variables without asking the server.
+    Without a catchment, holds the default figure under "*".
+
+    The figures are stored as plotly JSON, with every x and y array and the
+    layout template replaced by a position in the shared `arrays` and
+    `templates` lists, so a time axis or the template used by several
+    figures is sent once. Arrays are encoded by `payload.encode_array()`.
+
+    Returns:
+        dict: cat_id, arrays, templates and figures (variable to figure).
+    """
+    if cat_id is None:
+        figures = {"*": plot_default(data)}
+    else:
+        figures = {
+            var: build(data, cat_id)
+            for var, build in WATER_BALANCE_PLOTS.items()
+        }
+
+    arrays, templates = [], []
+    positions = {}  # (table, JSON of the value) -> position
+
+    def ref(value, table):
+        key = (id(table), to_json_plotly(value))
+        if key not in positions:
+            positions[key] = len(table)
+            table.append(value)
+        return positions[key]
+
+    specs = {}
+    for var, fig in figures.items():
+        if not isinstance(fig, dict):
+            fig = fig.to_plotly_json()
+        traces = []
+        for trace in fig["data"]:
+            trace = dict(trace)
+            for axis in ("x", "y"):
+                if axis in trace:
+                    trace[axis] = ref(
+                        payload.encode_array(trace[axis]), arrays
+                    )
+            traces.append(trace)
+        layout = dict(fig["layout"])
+        layout["template"] = ref(layout.get("template", {}), templates)
+        specs[var] = {"data": traces, "layout": layout}
+
+    return {
+        "cat_id": cat_id,
+        "arrays": arrays,
+        "templates": templates,
+        "figures": specs,
+    }
 
 
 def annual_mean(data):
@@ -692,3 +717,95 @@ def annual_mean(data):
         plot_bgcolor="white",
     )
     return fig
+
+
+def comparison_table(data, selected_date):
+    """
+    Table comparing the basin flow volume of the selected month with the
+    average of that month across all years.
+    """
+    selected_date = pd.to_datetime(selected_date)
+
+    # month-of-year statistics are precomputed by the loader
+    climatology = data.climatology("tnc_domain_q")
+    selected_month_value = climatology.value(selected_date)
+    average_value = climatology.stat("mean", selected_date.month)
+    percent_of_average = climatology.percent_of_average(selected_date)
+
+    # Format the data for display
+    formatted_selected_value = f"{selected_month_value:,.0f}"
+    formatted_average_value = f"{average_value:,.0f}"
+    formatted_percent_of_average = f"{percent_of_average:.0f}%"
+
+    # Construct the dbc.Table with a vertical layout
+    table = dbc.Table(
+        # Table header
+        [
+            # Table body with data in vertical layout
+            html.Tbody(
+                [
+                    html.Tr(
+                        [
+                            html.Td("Month"),
+                            html.Td(selected_date.strftime("%B %Y")),
+                        ]
+                    ),  # Month Year
+                    html.Tr(
+                        [
+                            html.Td("Monthly Volume (af)"),
+                            html.Td(formatted_selected_value),
+                        ]
+                    ),  # Selected month value
+                    html.Tr(
+                        [
+                            html.Td("Avg Volume (af)"),
+                            html.Td(formatted_average_value),
+                        ]
+                    ),  # Average value for month
+                    html.Tr(
+                        [
+                            html.Td("% of Avg"),
+                            html.Td(formatted_percent_of_average),
+                        ]
+                    ),  # % of average
+                ]
+            )
+        ],
+        bordered=True,  # Add table borders
+        hover=True,  # Enable hover effect
+        striped=True,  # Stripe the rows
+        responsive=True,  # Make table responsive
+        size="sm",  # Small size for a more compact look
+        style={
+            # "border-radius": "5px",  # Rounded corners
+            "overflow": "hidden",  # Ensure borders and rounding apply smoothly
+        },
+    )
+
+    return table
+
+
+def summary_text(data, selected_year):
+    """
+    Summary paragraph of a water year, from `data.water_year_summary`.
+    """
+    stats = data.water_year_summary.loc[selected_year]
+
+    precip_sign = "greater" if stats["precip_ratio"] > 1 else "less"
+    eoy_diff_sign = "above" if stats["gw_change_ft"] > 0 else "below"
+
+    # Format text output
+    summary_text = (
+        f"Water Year {selected_year} was {stats['precip_quartile']} rain year, with a total of "
+        f"{stats['wy_precip_inch']:.1f} inches of precipitation in the preserve. "
+        f"This was {stats['precip_ratio']:.1f} times {precip_sign} than normal. "
+        f"Average baseflow in the main tributaries to Jalama Creek was between {stats['baseflow_min_cfs']:.0f} "
+        f"and {stats['baseflow_max_cfs']:.0f} cfs during the dry season (June-August). "
+        f"Evapotranspiration in WY {selected_year} was {stats['et_quartile']} "
+        f" with a volume of {stats['et_vol_af']:,.0f} acre-feet. "
+        f"Starting from Oct 1 {selected_year - 1}, the mean groundwater elevation in the basin increased "
+        f"{stats['gw_rise_ft']:.1f} feet during the rainy season, "
+        f"and ended the water year {abs(stats['gw_change_ft']):.1f} feet {eoy_diff_sign} the starting elevation."
+    )
+
+    return summary_text
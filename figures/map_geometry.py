@@ -0,0 +1,71 @@
+"""
+Vectorized conversion of shapely geometries to the coordinate arrays drawn by
+plotly `Scattermap` line traces, where a gap (None) between two points breaks
+the line.
+"""
+
+import numpy as np
+import shapely
+
+# shapely type ids of LineString and LinearRing
+_LINE_TYPES = [1, 2]
+
+
+def line_coordinates(geometries) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Coordinates of every linestring in `geometries`, each line followed by a
+    NaN separator, built in one pass over all vertices. Multi-part geometries
+    contribute each part; anything that is not a line is skipped.
+
+    Args:
+        geometries (array-like): shapely geometries.
+
+    Returns:
+        tuple: lon and lat float arrays, and for each position the index of
+        the geometry it belongs to.
+    """
+    # a copy: shapely.get_parts() needs a writeable array, and with pandas
+    # copy-on-write the array of a GeoSeries column is a read-only view
+    geometries = np.asarray(geometries, dtype=object).copy()
+    parts, geometry_index = shapely.get_parts(geometries, return_index=True)
+    is_line = np.isin(shapely.get_type_id(parts), _LINE_TYPES)
+    parts, geometry_index = parts[is_line], geometry_index[is_line]
+
+    coords, part_index = shapely.get_coordinates(parts, return_index=True)
+
+    # every vertex shifts by the number of separators in front of it, and each
+    # part's separator goes right after its last vertex
+    size = len(coords) + len(parts)
+    positions = np.arange(len(coords)) + part_index
+    separators = (
+        np.cumsum(np.bincount(part_index, minlength=len(parts)) + 1) - 1
+    )
+
+    lon = np.full(size, np.nan)
+    lat = np.full(size, np.nan)
+    lon[positions] = coords[:, 0]
+    lat[positions] = coords[:, 1]
+
+    index = np.empty(size, dtype=np.int64)
+    index[positions] = geometry_index[part_index]
+    index[separators] = geometry_index
+
+    return lon, lat, index
+
+
+def outline_coordinates(
+    geometries,
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Like `line_coordinates()`, with polygons drawn as their boundary: the
+    exterior and every interior ring of every part.
+    """
+    return line_coordinates(
+        shapely.boundary(np.asarray(geometries, dtype=object))
+    )
+
+
+def with_gaps(values) -> list:
+    """Float coordinates to a list for plotly, NaN separators as None."""
+    values = np.asarray(values, dtype=float)
+    return np.where(np.isnan(values), None, values).tolist()
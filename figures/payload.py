@@ -0,0 +1,148 @@
+"""
+Compact encoding of figure data for the browser.
+
+Numeric trace arrays are sent as plotly.js typed arrays (base64, float32 by
+default) instead of JSON number lists, and date axes as short strings, or as
+`x0`/`dx` when the dates are evenly spaced (e.g. daily model output).
+
+Settings (environment):
+    PAYLOAD_FLOAT_DTYPE: "f4" (default) or "f8", the float type sent.
+    PAYLOAD_DECIMALS: round floats to this many decimals first (unset = no
+        rounding); repeated values then compress better.
+"""
+
+import base64
+import os
+
+import numpy as np
+from _plotly_utils.utils import to_typed_array_spec
+
+FLOAT_DTYPE = os.getenv("PAYLOAD_FLOAT_DTYPE") or "f4"
+DECIMALS = os.getenv("PAYLOAD_DECIMALS")
+DECIMALS = int(DECIMALS) if DECIMALS else None
+
+# trace properties holding data arrays
+_ARRAY_PROPERTIES = ("x", "y", "z")
+
+# plotly.js typed array dtypes
+_TYPED_DTYPES = {"f4": np.float32, "f8": np.float64}
+
+
+def encode_array(values, float_dtype: str = None, decimals: int = None):
+    """
+    One trace array in its most compact form: floats as typed arrays of
+    `float_dtype`, dates as "YYYY-MM-DD" (or with the time of day where
+    needed), anything else unchanged.
+
+    Args:
+        values: ndarray, list or typed array spec.
+        float_dtype (str, optional): "f4" or "f8". Defaults to FLOAT_DTYPE.
+        decimals (int, optional): Round floats first. Defaults to DECIMALS.
+    """
+    float_dtype = float_dtype or FLOAT_DTYPE
+    decimals = DECIMALS if decimals is None else decimals
+
+    array = _decode(values)
+    if array is None:
+        return values
+
+    if array.dtype.kind == "M":
+        return _date_strings(array)
+
+    if array.dtype.kind == "f":
+        if decimals is not None:
+            array = np.round(array, decimals)
+        return to_typed_array_spec(
+            array.astype(_TYPED_DTYPES[float_dtype], copy=False)
+        )
+    return values
+
+
+def encode_figure(
+    fig: dict, float_dtype: str = None, decimals: int = None
+) -> dict:
+    """
+    Figure dict with the data arrays of every trace encoded compactly, see
+    `encode_array()`. Evenly spaced date axes become `x0` and `dx`.
+
+    Args:
+        fig (dict): Figure, e.g. from `Figure.to_plotly_json()`.
+        float_dtype (str, optional): "f4" or "f8". Defaults to FLOAT_DTYPE.
+        decimals (int, optional): Round floats first. Defaults to DECIMALS.
+
+    Returns:
+        dict: New figure; `fig` is not modified.
+    """
+    traces = []
+    for trace in fig.get("data", []):
+        trace = dict(trace)
+        for prop in _ARRAY_PROPERTIES:
+            if prop not in trace:
+                continue
+            array = _decode(trace[prop])
+            if prop == "x" and array is not None and array.dtype.kind == "M":
+                spacing = _even_spacing(array)
+                if spacing is not None:
+                    del trace["x"]
+                    trace["x0"] = _date_strings(array[:1])[0]
+                    trace["dx"] = spacing
+                    continue
+            trace[prop] = encode_array(trace[prop], float_dtype, decimals)
+        traces.append(trace)
+    return {**fig, "data": traces}
+
+
+def encode(value):
+    """
+    Encode the figures of a callback result: a figure dict, or figures
+    inside a tuple. Other values are returned as they are.
+    """
+    if isinstance(value, tuple):
+        return tuple(encode(v) for v in value)
+    if isinstance(value, dict) and "data" in value and "layout" in value:
+        return encode_figure(value)
+    return value
+
+
+def _decode(values):
+    """Array of a trace property, or None if it is not an array."""
+    if isinstance(values, dict):
+        if "bdata" not in values or "shape" in values:
+            return None
+        dtype = {"f4": "<f4", "f8": "<f8"}.get(values.get("dtype"))
+        if dtype is None:
+            return None
+        return np.frombuffer(base64.b64decode(values["bdata"]), dtype=dtype)
+    if isinstance(values, np.ndarray):
+        return values if values.ndim == 1 else None
+    if isinstance(values, (list, tuple)):
+        try:
+            array = np.asarray(values)
+        except ValueError:
+            return None
+        # lists with gaps (None) are object arrays and stay lists
+        return array if array.ndim == 1 and array.dtype.kind in "fiM" else None
+    return None
+
+
+def _date_strings(array: np.ndarray) -> list:
+    """Dates as strings, as short as their resolution allows."""
+    array = array.astype("datetime64[s]")
+    seconds = (array - array.astype("datetime64[D]")).astype(np.int64)
+    if not seconds.any():
+        unit = "D"
+    elif not (seconds % 60).any():
+        unit = "m"
+    else:
+        unit = "s"
+    return np.datetime_as_string(array, unit=unit).tolist()
+
+
+def _even_spacing(array: np.ndarray):
+    """Step in milliseconds of evenly spaced dates, or None."""
+    if len(array) < 3:
+        return None
+    steps = np.diff(array.astype("datetime64[ms]").astype(np.int64))
+    if steps[0] > 0 and (steps == steps[0]).all():
+        return int(steps[0])
+    return None
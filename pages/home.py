@@ -21,6 +21,7 @@ from dash import (
     no_update,
     dash_table,
     ctx,
+    clientside_callback,
 )
 
 from dash.exceptions import PreventUpdate
@@ -34,33 +35,107 @@ import xarray as xr
 import logging
 
 import plotly.graph_objects as go
+from plotly.io.json import to_json_plotly
 from plotly.subplots import make_subplots
 
+from figures import downsample
 from figures import figures_main
+from figures import payload
+from figures.figure_cache import FigureCache
+from shared_cache import SharedCache
 import data_loader
+import well_pyramid
 
 log = logging.getLogger(__name__)
 dash.register_page(__name__, path="/")
 
 
 BUCKET_NAME = os.environ.get('BUCKET_NAME') or 'tnc-dangermond'
+# number of S3 objects fetched concurrently at startup (0 = sequential)
+LOADER_WORKERS = int(os.environ.get("LOADER_WORKERS") or 16)
+# persistent S3 object cache, revalidated by ETag on each startup
+S3_CACHE_DIR = os.environ.get("S3_CACHE_DIR")
+S3_CACHE_MAX_MB = int(os.environ.get("S3_CACHE_MAX_MB") or 512)
+# prebaked data bundle (`python data_loader.py <out>`), skips all loading
+DATA_BUNDLE = os.environ.get("DATA_BUNDLE")
+# "background": load what the page needs, then the rest in a background thread
+# "eager": load everything before serving, "off": load each dataset on first use
+LOADER_PRELOAD = os.environ.get("LOADER_PRELOAD") or "background"
+# memory limit of the figure cache in front of the figure builders (0 = off)
+FIGURE_CACHE_MB = int(os.environ.get("FIGURE_CACHE_MB") or 64)
+# figure/result cache shared by all worker processes on the host (unset = off)
+SHARED_CACHE_PATH = os.environ.get("SHARED_CACHE_PATH")
+SHARED_CACHE_MAX_MB = int(os.environ.get("SHARED_CACHE_MAX_MB") or 256)
+SHARED_CACHE_TTL = float(os.environ.get("SHARED_CACHE_TTL") or 24 * 3600)
+
+
+if DATA_BUNDLE:
+    data = data_loader.DataLoader.from_bundle(DATA_BUNDLE)
+else:
+    # note, boto3 will ignore this if local aws credentials exist
+    s3 = boto3.resource(
+        "s3",
+        aws_access_key_id=os.getenv("aws_access_key_id"),
+        aws_secret_access_key=os.getenv("aws_secret_access_key"),
+        config=data_loader.s3_config(LOADER_WORKERS),
+    )
 
+    data = data_loader.DataLoader(
+        s3_resource=s3,
+        bucket_name=BUCKET_NAME,
+        max_workers=LOADER_WORKERS,
+        cache_dir=S3_CACHE_DIR,
+        cache_max_bytes=S3_CACHE_MAX_MB * 1024**2,
+        lazy=LOADER_PRELOAD != "eager",
+        preload_background=LOADER_PRELOAD == "background",
+    )
+# data = data_loader.DataLoader(local_data_dir="./data") # local mode
 
-# note, boto3 will ignore this if local aws credentials exist
-s3 = boto3.resource(
-    "s3",
-    aws_access_key_id=os.getenv("aws_access_key_id"),
-    aws_secret_access_key=os.getenv("aws_secret_access_key"),
+if SHARED_CACHE_PATH:
+    shared_cache = SharedCache(
+        SHARED_CACHE_PATH,
+        max_bytes=SHARED_CACHE_MAX_MB * 1024**2,
+        ttl=SHARED_CACHE_TTL,
+    )
+else:
+    shared_cache = None
+
+figure_cache = FigureCache(
+    max_bytes=FIGURE_CACHE_MB * 1024**2,
+    shared=shared_cache,
+    # entries are shared only by processes that loaded the same data; the
+    # id lists the bucket objects, so it is only needed with a shared cache
+    namespace=data.content_id() if shared_cache else "",
+    # float32 typed arrays and short dates, see figures/payload.py
+    encode=payload.encode,
 )
 
-data = data_loader.DataLoader(s3_resource=s3, bucket_name=BUCKET_NAME)
-# data = data_loader.DataLoader(local_data_dir="./data") # local mode
 
-# list of catchments in the ngen output data
-cats = data.ds_ngen["catchment"].to_pandas().to_list()
+def cached_output(build, *args):
+    """
+    `build(data, *args)` through the figure cache (and the shared cache, if
+    configured), keyed by the builder, its arguments and the data version.
+    """
+    return figure_cache.get_or_build(
+        (build.__name__, *args),
+        lambda: build(data, *args),
+        version=data.data_version,
+    )
+
 
 # figs that load with the layout
 fig = go.Figure()
+# base map for the default dropdown values; later changes are sent as a Patch
+map_fig = figures_main.mapbox_lines(
+    data=data, display_var="Streamflow", time="2008-01-01"
+)
+# size and JSON serialization time of that map, the only response with the
+# catchment polygons; reported with the callback metrics
+_start = time.perf_counter()
+map_fig_stats = {"bytes": len(to_json_plotly(map_fig))}
+map_fig_stats["serialize_ms"] = round(
+    (time.perf_counter() - _start) * 1000, 2
+)
 precip_bar_fig = figures_main.precip_bar_fig(data)
 summary_data_fig = figures_main.annual_mean(data)
 
@@ -79,6 +154,11 @@ layout = dbc.Container(
                             parent_className="loading_wrapper",
                             children=[
                                 dcc.Store(id="cat-click-store"),
+                                # water balance figures of the selected
+                                # catchment, for every variable
+                                dcc.Store(id="wb-figure-store"),
+                                # station of the well shown in the modal
+                                dcc.Store(id="well-click-store"),
                                 # shows selected reach
                                 html.Div(id="contents", hidden=True),
                                 dbc.Label("Model Formulation:"),
@@ -110,7 +190,7 @@ layout = dbc.Container(
                                     id="year-dropdown",
                                     options=[
                                         {"label": str(year), "value": year}
-                                        for year in range(1983, 2024)
+                                        for year in figures_main.WATER_YEARS
                                     ],
                                     value=2008,  # default value is the current year
                                     placeholder="Select a year",
@@ -281,6 +361,7 @@ layout = dbc.Container(
                                                 children=[
                                                     dcc.Graph(
                                                         id="choropleth-map",
+                                                        figure=map_fig,
                                                         style={
                                                             "height": "40vh"
                                                         },
@@ -416,46 +497,72 @@ layout = dbc.Container(
 
 
 # # Callbacks ----------------
-@callback(Output("contents", "children"), Input("choropleth-map", "clickData"))
-def update_contents(click_data):
+# UI-only updates of a map click run in the browser
+clientside_callback(
     """
-    get click data from primary map, add to layout.
+    function(click_data) {
+        // placeholder content of the hidden div
+        return {
+            namespace: "dash_html_components",
+            type: "Div",
+            props: {children: [1]},
+        };
+    }
+    """,
+    Output("contents", "children"),
+    Input("choropleth-map", "clickData"),
+)
+
+
+clientside_callback(
     """
-    if click_data:
-        layer = click_data["points"][0]["curveNumber"]
-        if layer == 0:
-            # print("clicked")
-            # print(click_data)
-            id = click_data["points"][0]["customdata"][0]
-            # dff = df[df["centroid_lat"] == fips]
-    else:
-        id = 1
-
-    return html.Div(
-        [
-            # dash_table.DataTable(
-            #     id="table",
-            #     columns=[{"name": i, "id": i} for i in dff.columns],
-            #     data=dff.to_dict(orient="records"),
-            # )
-            1
-        ]
-    )
+    function(click_data, n_clicks, is_open) {
+        // open when the well locations (layer 3) are clicked
+        if (click_data && click_data.points[0].curveNumber === 3 && !is_open) {
+            return true;
+        }
+        // close with the close button
+        if (n_clicks && is_open) {
+            return false;
+        }
+        return is_open;
+    }
+    """,
+    Output("modal", "is_open"),
+    Input("choropleth-map", "clickData"),
+    Input("close-modal", "n_clicks"),
+    State("modal", "is_open"),
+)
 
 
-@callback(
-    [
-        # Output("output-date", "children"),
-        Output("selected-date-store", "data"),
-    ],  # Store the selected date
+clientside_callback(
+    """
+    function(click_data) {
+        // customdata of the clicked catchment (layer 0)
+        if (click_data && click_data.points[0].curveNumber === 0) {
+            return click_data.points[0].customdata;
+        }
+        return null;
+    }
+    """,
+    Output("cat-click-store", "data"),
+    Input("choropleth-map", "clickData"),
+)
+
+
+# selected year and month to the "YYYY-MM-01" date of the store
+clientside_callback(
+    """
+    function(year, month) {
+        if (year && month) {
+            return [`${year}-${String(month).padStart(2, "0")}-01`];
+        }
+        return window.dash_clientside.no_update;
+    }
+    """,
+    [Output("selected-date-store", "data")],
     [Input("year-dropdown", "value"), Input("month-dropdown", "value")],
 )
-def date_from_year_month(year, month):
-    """ """
-    if year and month:
-        selected_date = datetime.date(year, month, 1).strftime("%Y-%m-%d")
-        return [selected_date]
-    return None
 
 
 # Callback to update map based on selected column
@@ -463,285 +570,326 @@ def date_from_year_month(year, month):
     Output("choropleth-map", "figure"),
     Input("variable-dropdown", "value"),
     Input("selected-date-store", "data"),
+    prevent_initial_call=True,
 )
 def mapbox_lines(display_var, time_click):
     """
-    Primary map with flowpaths within Dangermond Preserve.
+    Primary map with flowpaths within Dangermond Preserve. The full map is
+    sent with the layout, this only recolors the catchments.
     """
     print(display_var)
     print(time_click)
 
-    return figures_main.mapbox_lines(
-        gdf=data.gdf,
-        gdf_outline=data.gdf_outline,
+    if not display_var or not time_click:
+        return no_update
+
+    return figures_main.mapbox_lines_patch(
+        data=data,
         display_var=display_var,
-        ds=data.ds_ngen,
-        gdf_wells=data.gdf_wells,
-        gdf_lines=data.gdf_lines,
         time=time_click,
-        cfe_routed_flow_af=data.cfe_routed_flow_af,
     )
 
 
-# Callback to handle click event and show/hide modal
-@callback(
-    Output("modal", "is_open"),
-    [Input("choropleth-map", "clickData"), Input("close-modal", "n_clicks")],
-    [State("modal", "is_open")],
-)
-def toggle_modal(click_data, n_clicks, is_open):
-    # check if click_data or None
-    if click_data:
-        layer = click_data["points"][0]["curveNumber"]
-
-        # set True if well location points have been clicked
-        if (layer == 3) and not is_open:
-            return True
-
-    # If the close button is clicked, close the modal
-    if n_clicks and is_open:
-        return False
+# layers (trace numbers) of the map that respond to clicks
+CATCHMENT_LAYER = 0
+WELL_LAYER = 3
 
-    return is_open  # Keep modal state unchanged if no click event
 
-
-# Callback to update modal content based on click_data
 @callback(
+    Output("wb-figure-store", "data"),
+    Output("choropleth-map", "figure", allow_duplicate=True),
     Output("well-name-title", "children"),
+    Output("modal-figure", "figure"),
+    Output("modal-content", "children"),
+    Output("well-click-store", "data"),
     Input("choropleth-map", "clickData"),
+    prevent_initial_call="initial_duplicate",
 )
-def update_modal_content(click_data):
-    if click_data:
-        # print(f"{click_data=}")
-        layer = click_data["points"][0]["curveNumber"]
-        if layer == 3:
-            well_name = click_data["points"][0]["hovertext"]
-            stn_id = click_data["points"][0]["customdata"]
-            cat = data.gdf_wells[
-                data.gdf_wells["station_id_dendra"] == stn_id
-            ]["divide_id"].values[0]
-            return f"Groundwater Comparison: {well_name} & catchment '{cat}'"
-    return ""
-
-
-# Callback to update modal content based on clickData (optional if dynamic)
-@callback(
-    [Output("modal-figure", "figure"), Output("modal-content", "children")],
-    Input("choropleth-map", "clickData"),
-    prevent_initial_call=True,
-)
-def update_modal_figure(click_data):
-    """Update modal fig with comparison of CFE groundwater elevation and observed well level,
-    and display any warning messages in the modal."""
-    warnings = []  # List to collect warning messages
-
-    if click_data:
-        layer = click_data["points"][0]["curveNumber"]
-        if layer == 3:
-            print(f"well click: {click_data}")
-            stn_id = click_data["points"][0]["customdata"]
-            print(f"{stn_id=}")
-            cat = data.gdf_wells[
-                data.gdf_wells["station_id_dendra"] == stn_id
-            ]["divide_id"].values[0]
-            print(f"{cat=}")
-            default_index = data.ds_ngen.Time.values
-
-            # Precip forcing for catchment
-            try:
-                ppt_aorc = (
-                    data.ds_ngen["RAIN_RATE_INCHES"]
-                    .sel({"catchment": cat})
-                    .to_pandas()
-                )
-            except Exception as _:
-                warning = "Precipitation forcing not avilable for catchment."
-                warnings.append(warning)
-                print(warning)
-                ppt_aorc = pd.Series(dtype=float, index=default_index)
-
-            # Cumulative CFE elevation change for catchment
-            try:
-                cfe_elev_series = (
-                    data.ds_ngen["NET_GW_CHANGE_FEET"]
-                    .sel({"catchment": cat})
-                    .cumsum()
-                    .to_pandas()
-                )
-            except Exception as _:
-                warning = "Simulated water elevation change not available for catchment."
-                warnings.append(warning)
-                print(warning)
-                cfe_elev_series = pd.Series(dtype=float, index=default_index)
-
-            # Observation data for catchment
-            try:
-                well_obs_series = data.well_data[stn_id]
-                first = well_obs_series.first_valid_index()
-                well_obs_series -= well_obs_series[first]
-            except Exception as _:
-                warning = "Observed water level data not found for catchment."
-                warnings.append(warning)
-                print(warning)
-                well_obs_series = pd.Series(dtype=float, index=default_index)
-
-            if len(well_obs_series) < 1:
-                well_obs_series = [0]
-
-            fig = make_subplots(
-                rows=2,
-                cols=1,
-                shared_xaxes=True,
-                vertical_spacing=0.02,
-            )
-
-            fig.add_trace(
-                go.Scatter(
-                    x=cfe_elev_series.index,
-                    y=cfe_elev_series,
-                    mode="lines",
-                    name="CFE Simulated Groundwater Elevation Change",
-                ),
-                row=1,
-                col=1,
-            )
-            fig.add_trace(
-                go.Scatter(
-                    x=well_obs_series.index,
-                    y=well_obs_series,
-                    mode="lines",
-                    name="Observed Groundwater Level Change",
-                ),
-                row=1,
-                col=1,
-            )
-            fig.add_trace(
-                go.Scatter(
-                    x=ppt_aorc.index,
-                    y=ppt_aorc,
-                    mode="lines",
-                    name="Precipitation Forcing (inches)",
-                ),
-                row=2,
-                col=1,
-            )
+def map_click(click_data):
+    """
+    Every server-side update of a map click, in one request. The click is
+    decoded once and routed by layer: a catchment click sends the water
+    balance figures of the catchment and highlights it, a well click fills
+    the modal. Other clicks reset the water balance figure to the default.
+    """
+    point = click_data["points"][0] if click_data else {}
+    layer = point.get("curveNumber")
+
+    if layer == CATCHMENT_LAYER:
+        cat_id = point["customdata"][0]
+        return (
+            cached_output(figures_main.water_balance_figures, cat_id),
+            catchment_highlight(cat_id),
+            no_update,
+            no_update,
+            no_update,
+            no_update,
+        )
 
-            fig.update_layout(
-                legend=dict(
-                    orientation="h",
-                    yanchor="bottom",
-                    y=-0.2,
-                    xanchor="center",
-                    x=0.5,
-                ),
-                margin=dict(l=50, r=30, t=30, b=30),
-                yaxis=dict(title="Water Level Change (feet)"),
-                yaxis2=dict(title="Precipitation (inch)"),
-            )
+    wb_figures = cached_output(figures_main.water_balance_figures)
 
-            warnings_text = "\n".join(warnings) if warnings else ""
-            return fig, warnings_text
+    if layer == WELL_LAYER:
+        well_name = point["hovertext"]
+        stn_id = point["customdata"]
+        cat = data.gdf_wells[data.gdf_wells["station_id_dendra"] == stn_id][
+            "divide_id"
+        ].values[0]
+        title = f"Groundwater Comparison: {well_name} & catchment '{cat}'"
+        well_fig, warnings_text = cached_output(well_comparison_figure, stn_id)
+        return wb_figures, no_update, title, well_fig, warnings_text, stn_id
 
-    return go.Figure(), ""
+    return wb_figures, no_update, no_update, no_update, no_update, no_update
 
 
-@callback(
+# switching variables redraws the water balance figure from the store,
+# without a server request
+clientside_callback(
+    """
+    function(store, variable) {
+        if (!store) {
+            return window.dash_clientside.no_update;
+        }
+        const spec = store.figures[variable] || store.figures["*"];
+        if (!spec) {
+            return window.dash_clientside.no_update;
+        }
+        // x, y and the template are positions in the shared lists
+        const data = spec.data.map(function(trace) {
+            const t = Object.assign({}, trace);
+            if (typeof t.x === "number") t.x = store.arrays[t.x];
+            if (typeof t.y === "number") t.y = store.arrays[t.y];
+            return t;
+        });
+        const layout = Object.assign({}, spec.layout, {
+            template: store.templates[spec.layout.template],
+        });
+        return {data: data, layout: layout};
+    }
+    """,
     Output("wb_ts_fig", "figure"),
-    Input("choropleth-map", "clickData"),
+    Input("wb-figure-store", "data"),
     Input("variable-dropdown", "value"),
-    State("cat-click-store", "data"),
 )
-def water_balance_figure(click_data, model_var, stored_cat_click):
+
+
+def well_comparison_figure(data, stn_id):
     """
-    Define time series figure locations on map.
+    Comparison of CFE groundwater elevation and observed well level for a well,
+    and the warning messages for data that is not available.
     """
-    if click_data:
-        layer = click_data["points"][0]["curveNumber"]
-        if layer == 0:  # click must be on polygon layer
-            cat_id = click_data["points"][0]["customdata"][0]
-            # print(click_data)
+    warnings = []  # List to collect warning messages
 
-            if model_var == "Streamflow":
-                return figures_main.plot_q_out(data, cat_id)
+    cat = data.gdf_wells[data.gdf_wells["station_id_dendra"] == stn_id][
+        "divide_id"
+    ].values[0]
+    print(f"{cat=}")
+    default_index = data.ds_ngen.Time.values
+
+    # Precip forcing for catchment
+    try:
+        ppt_aorc = (
+            data.ds_ngen["RAIN_RATE_INCHES"]
+            .sel({"catchment": cat})
+            .to_pandas()
+        )
+    except Exception as _:
+        warning = "Precipitation forcing not avilable for catchment."
+        warnings.append(warning)
+        print(warning)
+        ppt_aorc = pd.Series(dtype=float, index=default_index)
+
+    # Cumulative CFE elevation change for catchment
+    try:
+        cfe_elev_series = (
+            data.ds_ngen["NET_GW_CHANGE_FEET"]
+            .sel({"catchment": cat})
+            .cumsum()
+            .to_pandas()
+        )
+    except Exception as _:
+        warning = (
+            "Simulated water elevation change not available for catchment."
+        )
+        warnings.append(warning)
+        print(warning)
+        cfe_elev_series = pd.Series(dtype=float, index=default_index)
+
+    # Observation data for catchment, from the coarsest aggregate that
+    # resolves the record; zooming in sends finer levels (well_zoom)
+    try:
+        well_obs_series = well_level_change(data, stn_id)
+    except Exception as _:
+        warning = "Observed water level data not found for catchment."
+        warnings.append(warning)
+        print(warning)
+        well_obs_series = pd.Series(dtype=float, index=default_index)
+
+    if len(well_obs_series) < 1:
+        well_obs_series = [0]
+
+    fig = make_subplots(
+        rows=2,
+        cols=1,
+        shared_xaxes=True,
+        vertical_spacing=0.02,
+    )
 
-            if model_var == "Actual ET":
-                print("returning et plot")
-                return figures_main.plot_actual_et(data, cat_id)
+    fig.add_trace(
+        go.Scatter(
+            x=cfe_elev_series.index,
+            y=cfe_elev_series,
+            mode="lines",
+            name="CFE Simulated Groundwater Elevation Change",
+        ),
+        row=1,
+        col=1,
+    )
+    fig.add_trace(
+        go.Scatter(
+            x=well_obs_series.index,
+            y=well_obs_series,
+            mode="lines",
+            name="Observed Groundwater Level Change",
+        ),
+        row=1,
+        col=1,
+    )
+    fig.add_trace(
+        go.Scatter(
+            x=ppt_aorc.index,
+            y=ppt_aorc,
+            mode="lines",
+            name="Precipitation Forcing (inches)",
+        ),
+        row=2,
+        col=1,
+    )
 
-            if model_var == "Precipitation":
-                return figures_main.plot_precip(data, cat_id)
+    fig.update_layout(
+        legend=dict(
+            orientation="h",
+            yanchor="bottom",
+            y=-0.2,
+            xanchor="center",
+            x=0.5,
+        ),
+        margin=dict(l=50, r=30, t=30, b=30),
+        yaxis=dict(title="Water Level Change (feet)"),
+        yaxis2=dict(title="Precipitation (inch)"),
+        # keeps the zoom when well_zoom replaces the observed line
+        uirevision=stn_id,
+    )
 
-            if model_var == "Groundwater Storage":
-                return figures_main.plot_storage(data, cat_id)
+    warnings_text = "\n".join(warnings) if warnings else ""
+    return fig, warnings_text
 
-            if model_var == "Potential ET":
-                return figures_main.plot_potential_et(data, cat_id)
 
-    return figures_main.plot_default(data)
+# pyramid buckets read per chart point at most: the finest level with up to
+# this many is downsampled to the chart, rather than a coarser level sent
+WELL_BUCKETS_PER_POINT = 4
+
+
+def well_level_change(data, stn_id, start=None, end=None):
+    """
+    Observed level change of a well since its first valid value, between
+    `start` and `end`: the finest level of `well_pyramid.WellPyramid` with at
+    most `WELL_BUCKETS_PER_POINT` buckets per chart point, reduced to the
+    minimum and maximum of each pixel bucket (`downsample.series()`) if
+    longer than the chart.
+    """
+    pyramid = data.well_pyramid()
+    _, levels = pyramid.levels(
+        stn_id,
+        start,
+        end,
+        max_points=downsample.MAX_POINTS * WELL_BUCKETS_PER_POINT,
+    )
+    levels = downsample.series(levels, downsample.MAX_POINTS)
+    return levels - pyramid.first_valid(stn_id)
+
+
+# trace of the observed well levels in the modal figure
+WELL_OBS_TRACE = 1
 
 
 @callback(
-    Output("choropleth-map", "figure", allow_duplicate=True),
-    Input("choropleth-map", "clickData"),
+    Output("modal-figure", "figure", allow_duplicate=True),
+    Input("modal-figure", "relayoutData"),
+    State("well-click-store", "data"),
     prevent_initial_call=True,
 )
-def higlight_line_segment_on_map(click_data):
+def well_zoom(relayout_data, stn_id):
     """
-    Highlight line segment to make user selection more obvious. This method use linestrings, rather
-    than polygons, to provide higlighting around the polygons.
+    Replace the aggregated observed well levels with those of the zoomed
+    window, at the finest level that fits the chart (hourly once the window
+    is short enough), and restore the overview when the zoom is reset.
     """
-    if click_data:
-        layer = click_data["points"][0]["curveNumber"]
-        # print(f"layer: {layer}")
-
-        if layer == 0:
-            id = click_data["points"][0]["customdata"][0]
-            patched_figure = Patch()
-
-            # print(id)
-            subset = data.gdf[data.gdf["divide_id"] == id]
-            # print(subset)
-
-            # if geometry is a LINESTRING
-            # catchment_lats = list(subset["geometry"][0].exterior.xy[1])
-            # catchment_lons = list(subset["geometry"][0].exterior.xy[0])
-
-            # if geometry is a POLYGON
-            catchment_lons = list(subset["geometry"].iloc[0].exterior.xy[0])
-            catchment_lats = list(subset["geometry"].iloc[0].exterior.xy[1])
-
-            fig_data = go.Scattermap(
-                lat=catchment_lats,
-                lon=catchment_lons,
-                mode="lines",
-                hoverinfo="skip",
-                line=dict(
-                    width=3,
-                    color="white",
-                ),
-                # hovertext=gdf_cat["divide_id"].tolist(),
+    if not relayout_data or stn_id is None:
+        raise PreventUpdate
+    # the axes are shared, zooming either subplot gives the same window
+    window = None
+    for axis in ("xaxis", "xaxis2"):
+        if f"{axis}.range[0]" in relayout_data:
+            window = (
+                relayout_data[f"{axis}.range[0]"],
+                relayout_data[f"{axis}.range[1]"],
             )
+        elif f"{axis}.range" in relayout_data:
+            window = tuple(relayout_data[f"{axis}.range"])
+        elif not relayout_data.get(f"{axis}.autorange"):
+            continue
+        break
+    else:
+        raise PreventUpdate
 
-            patched_figure["data"][1] = fig_data
-            return patched_figure
+    if (
+        data.well_pyramid().level_for(max_points=downsample.MAX_POINTS)
+        == well_pyramid.HOURLY
+    ):
+        # the whole record was sent in full
+        raise PreventUpdate
+
+    if window is None:
+        start = end = None
+    else:
+        start, end = (pd.Timestamp(t) for t in window)
+    try:
+        points = well_level_change(data, stn_id, start, end)
+    except Exception:
+        raise PreventUpdate
 
-    return no_update
+    patched_figure = Patch()
+    patched_figure["data"][WELL_OBS_TRACE]["x"] = payload.encode_array(
+        points.index.to_numpy()
+    )
+    patched_figure["data"][WELL_OBS_TRACE]["y"] = payload.encode_array(
+        points.to_numpy()
+    )
+    return patched_figure
 
 
-@callback(
-    Output("cat-click-store", "data"),
-    Input("choropleth-map", "clickData"),
-)
-def store_catchment_click(click_data):
-    """ """
-    if click_data:
-        layer = click_data["points"][0]["curveNumber"]
-        print(f"{layer=}")
-        if layer == 0:
-            print(click_data)
-            cat_id = click_data["points"][0]["customdata"]
-            print(cat_id)
-            return cat_id
+def catchment_highlight(cat_id):
+    """
+    Highlight the outline of the clicked catchment to make the selection more
+    obvious. This uses linestrings, rather than polygons, to draw around the
+    polygons.
+    """
+    patched_figure = Patch()
+
+    # every ring of every part, precomputed by the loader
+    outline = data.catchment_outlines[cat_id]
+
+    patched_figure["data"][1] = go.Scattermap(
+        lat=outline["lat"],
+        lon=outline["lon"],
+        mode="lines",
+        hoverinfo="skip",
+        line=dict(
+            width=3,
+            color="white",
+        ),
+    )
+    return patched_figure
 
 
 @callback(
@@ -749,82 +897,7 @@ def store_catchment_click(click_data):
     Input("selected-date-store", "data"),
 )
 def update_table(selected_date):
-    # Convert the selected date into a pandas datetime object
-    selected_date = pd.to_datetime(selected_date)
-
-    # Extract the selected month and year
-    selected_month = selected_date.month
-
-    # Filter the DataFrame to get data for the selected month across all years
-    # selected_month_df = df_q[df_q.index.month == selected_month]
-    selected_month_df = data.tnc_domain_q[
-        data.tnc_domain_q.index.month == selected_month
-    ]
-
-    # Get the volume for the selected month (for the specific year)
-    # selected_month_value = df_q.loc[selected_date, "Simulated Monthly Volume"]
-    selected_month_value = data.tnc_domain_q.loc[
-        selected_date, "monthly_vol_af"
-    ]
-
-    # Calculate the average volume for that month across all years
-    # average_value = selected_month_df["Simulated Monthly Volume"].mean()
-    average_value = selected_month_df["monthly_vol_af"].mean()
-
-    # Calculate the "% of average" for the selected month
-    percent_of_average = (selected_month_value / average_value) * 100
-
-    # Format the data for display
-    formatted_selected_value = f"{selected_month_value:,.0f}"
-    formatted_average_value = f"{average_value:,.0f}"
-    formatted_percent_of_average = f"{percent_of_average:.0f}%"
-
-    # Construct the dbc.Table with a vertical layout
-    table = dbc.Table(
-        # Table header
-        [
-            # Table body with data in vertical layout
-            html.Tbody(
-                [
-                    html.Tr(
-                        [
-                            html.Td("Month"),
-                            html.Td(selected_date.strftime("%B %Y")),
-                        ]
-                    ),  # Month Year
-                    html.Tr(
-                        [
-                            html.Td("Monthly Volume (af)"),
-                            html.Td(formatted_selected_value),
-                        ]
-                    ),  # Selected month value
-                    html.Tr(
-                        [
-                            html.Td("Avg Volume (af)"),
-                            html.Td(formatted_average_value),
-                        ]
-                    ),  # Average value for month
-                    html.Tr(
-                        [
-                            html.Td("% of Avg"),
-                            html.Td(formatted_percent_of_average),
-                        ]
-                    ),  # % of average
-                ]
-            )
-        ],
-        bordered=True,  # Add table borders
-        hover=True,  # Enable hover effect
-        striped=True,  # Stripe the rows
-        responsive=True,  # Make table responsive
-        size="sm",  # Small size for a more compact look
-        style={
-            # "border-radius": "5px",  # Rounded corners
-            "overflow": "hidden",  # Ensure borders and rounding apply smoothly
-        },
-    )
-
-    return table
+    return cached_output(figures_main.comparison_table, selected_date)
 
 
 @callback(
@@ -838,84 +911,4 @@ def update_summary_text(selected_year):
     if selected_year is None:
         raise PreventUpdate
 
-    # Convert selected year into water year format
-    water_year = f"Water Year {selected_year}"
-
-    # Get total precipitation for the selected water year (example dataset key)
-    if hasattr(data, "terraclim_ann_precip"):
-        total_precip = data.terraclim_ann_precip["wy_precip_inch"].loc[
-            selected_year
-        ]
-        precip_quartile = data.terraclim_ann_precip["Quartile"].loc[
-            selected_year
-        ]
-    else:
-        total_precip = None
-        precip_quartile = None
-
-    if hasattr(data, "terraclim_mean_annual_precip"):
-        mean_precip = data.terraclim_mean_annual_precip
-        precip_magnitude = total_precip / mean_precip
-
-        if precip_magnitude > 1:
-            precip_sign = "greater"
-        elif precip_magnitude <= 1:
-            precip_sign = "less"
-    else:
-        total_precip = "NaN"
-        precip_sign = None
-
-    # evapotranspiration
-    et_sign = data.et_wy_quartile.iloc[
-        data.et_wy_quartile.index == selected_year
-    ].values[0]
-
-    et_vol_af = (
-        data.ngen_basinwide_et_loss_m3[
-            data.ngen_basinwide_et_loss_m3["water_year"] == selected_year
-        ]["ACTUAL_ET_VOL_M3"].sum()
-    ) * 0.000810714  # UNIT: m^3 to acre-feet
-
-    # tributary flows
-    baseflow_months = data.jalama_tributaries_monthly_cfs.loc[
-        data.jalama_tributaries_monthly_cfs.index.month.isin(range(6, 9))
-    ]
-    baseflow_wy = baseflow_months.loc[
-        baseflow_months["water_year"] == selected_year
-    ]
-    baseflow_min_cfs = (
-        baseflow_wy.iloc[:, :3].min().min()
-    )  # subset out "water_year" before min()
-    baseflow_max_cfs = baseflow_wy.iloc[:, :3].max().max()  # " "
-
-    # groundwater change
-    gw_elevation_delta_wy = (
-        data.ds_ngen["NET_GW_CHANGE_FEET"]
-        .where(data.ds_ngen["wy"] == selected_year, drop=True)
-        .mean(dim="catchment")  # basinwide mean
-        .cumsum()  # running sum
-        .to_pandas()
-    )
-    eoy_diff = gw_elevation_delta_wy.iloc[-1] - gw_elevation_delta_wy.iloc[0]
-    max_level = gw_elevation_delta_wy.max()
-
-    if eoy_diff > 0:
-        eoy_diff_sign = "above"
-    else:
-        eoy_diff_sign = "below"
-
-    # Format text output
-    summary_text = (
-        f"Water Year {selected_year} was {precip_quartile} rain year, with a total of "
-        f"{total_precip:.1f} inches of precipitation in the preserve. "
-        f"This was {precip_magnitude:.1f} times {precip_sign} than normal. "
-        f"Average baseflow in the main tributaries to Jalama Creek was between {baseflow_min_cfs:.0f} "
-        f"and {baseflow_max_cfs:.0f} cfs during the dry season (June-August). "
-        f"Evapotranspiration in WY {selected_year} was {et_sign} "
-        f" with a volume of {et_vol_af:,.0f} acre-feet. "
-        f"Starting from Oct 1 {selected_year - 1}, the mean groundwater elevation in the basin increased "
-        f"{max_level:.1f} feet during the rainy season, "
-        f"and ended the water year {abs(eoy_diff):.1f} feet {eoy_diff_sign} the starting elevation."
-    )
-
-    return summary_text
+    return cached_output(figures_main.summary_text, selected_year)
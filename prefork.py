@@ -0,0 +1,304 @@
+"""
+Pre-forking production server.
+
+The parent process loads the data once, binds the listening socket and forks
+worker processes that each run waitress on that socket. The workers share the
+parent's memory (the loaded, read-only datasets) copy-on-write, and each one
+runs the callbacks on its own core:
+
+    DASH_PROD=True WEB_WORKERS=4 python application.py
+
+Every worker sends a heartbeat to the parent from its I/O loop while its
+requests make progress: while it has a free request thread, or finished a
+request since its last heartbeat. A worker that dies, or whose I/O loop or
+request threads are stuck for `timeout` seconds (every thread busy and no
+request finishing), is replaced. Signals to the parent:
+
+    TERM, INT   stop; workers finish the requests they are serving first
+    HUP         graceful restart: new workers start, the old ones finish
+                their requests and exit
+"""
+
+import gc
+import logging
+import os
+import select
+import signal
+import socket
+import threading
+import time
+
+import waitress
+from waitress import wasyncore
+
+log = logging.getLogger(__name__)
+
+# seconds between heartbeats of a worker
+HEARTBEAT_SECONDS = 1.0
+# a worker without a heartbeat for this long is killed and replaced
+TIMEOUT = 30.0
+# seconds a stopping worker may spend finishing its requests
+GRACE_SECONDS = 30.0
+
+
+def serve(
+    app,
+    host: str = "0.0.0.0",
+    port: int = 10000,
+    workers: int = 2,
+    threads: int = 4,
+    timeout: float = TIMEOUT,
+    before_fork=None,
+):
+    """
+    Serve a WSGI app from `workers` forked processes until stopped.
+
+    Args:
+        app: WSGI application, e.g. the Flask server of the Dash app.
+        host (str, optional): Listening address. Defaults to "0.0.0.0".
+        port (int, optional): Listening port. Defaults to 10000.
+        workers (int, optional): Worker processes. Defaults to 2.
+        threads (int, optional): Request threads per worker. Defaults to 4.
+        timeout (float, optional): Seconds without a heartbeat after which a
+            worker is replaced. Defaults to TIMEOUT. A worker serving only
+            requests that take longer than this on every thread is
+            replaced as well.
+        before_fork (callable, optional): Called once in the parent before
+            the first fork, e.g. to load every dataset and stop the loader's
+            threads; threads do not survive a fork.
+    """
+    sock = socket.create_server((host, port), backlog=1024)
+    sock.setblocking(False)
+    if before_fork is not None:
+        before_fork()
+    # objects of the parent are never collected in the workers, so the
+    # collector does not touch (and copy) their pages
+    gc.collect()
+    gc.freeze()
+    log.info(f"Serving on http://{host}:{port} with {workers} workers")
+    _Arbiter(app, sock, workers, threads, timeout).run()
+
+
+class _Worker:
+    """A forked worker, as seen by the parent."""
+
+    def __init__(self, pid: int, heartbeat_fd: int):
+        self.pid = pid
+        self.heartbeat_fd = heartbeat_fd
+        self.last_beat = time.monotonic()
+        # stopping for a restart, not replaced when it exits
+        self.retiring = False
+
+
+class _Arbiter:
+    """Parent process: forks, watches and replaces the workers."""
+
+    def __init__(self, app, sock, workers: int, threads: int, timeout: float):
+        self.app = app
+        self.sock = sock
+        self.size = workers
+        self.threads = threads
+        self.timeout = timeout
+        self.workers = {}  # pid -> _Worker
+        self.stopping = False
+        self.restarting = False
+
+    def run(self):
+        signal.signal(signal.SIGTERM, self._stop)
+        signal.signal(signal.SIGINT, self._stop)
+        signal.signal(signal.SIGHUP, self._restart)
+
+        while not self.stopping:
+            if self.restarting:
+                self.restarting = False
+                self._retire_all()
+            self._spawn_missing()
+            self._read_heartbeats(HEARTBEAT_SECONDS)
+            self._reap()
+            self._kill_stale()
+
+        self._shutdown()
+
+    def _stop(self, signum, frame):
+        self.stopping = True
+
+    def _restart(self, signum, frame):
+        self.restarting = True
+
+    def _spawn_missing(self):
+        active = sum(not w.retiring for w in self.workers.values())
+        for _ in range(self.size - active):
+            self._spawn()
+
+    def _spawn(self):
+        read_fd, write_fd = os.pipe()
+        pid = os.fork()
+        if pid == 0:
+            os.close(read_fd)
+            status = 1
+            try:
+                _run_worker(self.app, self.sock, self.threads, write_fd)
+                status = 0
+            except BaseException:
+                log.exception("worker failed")
+            finally:
+                # never return into the parent's loop
+                os._exit(status)
+
+        os.close(write_fd)
+        os.set_blocking(read_fd, False)
+        self.workers[pid] = _Worker(pid, read_fd)
+        log.info(f"Started worker {pid}")
+
+    def _retire_all(self):
+        """Start a new set of workers and stop the current ones."""
+        old = [w for w in self.workers.values() if not w.retiring]
+        for worker in old:
+            worker.retiring = True
+        self._spawn_missing()
+        for worker in old:
+            self._signal(worker, signal.SIGTERM)
+        log.info(f"Restarting {len(old)} workers")
+
+    def _read_heartbeats(self, timeout: float):
+        fds = {w.heartbeat_fd: w for w in self.workers.values()}
+        ready, _, _ = select.select(list(fds), [], [], timeout)
+        now = time.monotonic()
+        for fd in ready:
+            try:
+                beats = os.read(fd, 4096)
+            except BlockingIOError:
+                continue
+            if beats:
+                fds[fd].last_beat = now
+
+    def _reap(self):
+        """Collect exited workers; they are replaced by `_spawn_missing()`."""
+        while True:
+            try:
+                pid, status = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                return
+            if pid == 0:
+                return
+            worker = self.workers.pop(pid, None)
+            if worker is None:
+                continue
+            os.close(worker.heartbeat_fd)
+            if not worker.retiring and not self.stopping:
+                log.warning(
+                    f"Worker {pid} exited with status "
+                    f"{os.waitstatus_to_exitcode(status)}, replacing it"
+                )
+
+    def _kill_stale(self):
+        now = time.monotonic()
+        for worker in list(self.workers.values()):
+            if now - worker.last_beat > self.timeout:
+                log.warning(
+                    f"Worker {worker.pid} missed its heartbeats for "
+                    f"{self.timeout:.0f} s, killing it"
+                )
+                self._signal(worker, signal.SIGKILL)
+                # not killed twice while it is being reaped
+                worker.last_beat = now
+
+    def _shutdown(self):
+        """Stop every worker gracefully, kill those that take too long."""
+        log.info("Stopping workers")
+        for worker in self.workers.values():
+            self._signal(worker, signal.SIGTERM)
+        deadline = time.monotonic() + GRACE_SECONDS + 5
+        while self.workers and time.monotonic() < deadline:
+            self._reap()
+            time.sleep(0.1)
+        for worker in self.workers.values():
+            self._signal(worker, signal.SIGKILL)
+        self.sock.close()
+
+    @staticmethod
+    def _signal(worker: _Worker, signum: int):
+        try:
+            os.kill(worker.pid, signum)
+        except ProcessLookupError:
+            pass
+
+
+def _run_worker(app, sock, threads: int, heartbeat_fd: int):
+    """
+    Worker process: serve `app` on the shared socket until SIGTERM (or the
+    parent exits), then stop accepting and finish the requests in progress.
+    """
+    parent = os.getppid()
+    stopping = []
+    signal.signal(signal.SIGTERM, lambda signum, frame: stopping.append(1))
+    # Ctrl-C reaches the whole process group; the parent stops the workers
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    signal.signal(signal.SIGHUP, signal.SIG_IGN)
+
+    progress = _Progress(app)
+    server = waitress.create_server(progress, sockets=[sock], threads=threads)
+    last_beat = 0.0
+    beat_finished = 0
+    deadline = None
+    while True:
+        # one pass of waitress' I/O loop (server.run() loops forever)
+        wasyncore.loop(
+            timeout=HEARTBEAT_SECONDS,
+            map=server._map,
+            use_poll=server.adj.asyncore_use_poll,
+            count=1,
+        )
+
+        now = time.monotonic()
+        started, finished = progress.counts()
+        # every thread busy and none finished a request: stuck, or slow
+        stalled = started - finished >= threads and finished == beat_finished
+        if now - last_beat >= HEARTBEAT_SECONDS and not stalled:
+            try:
+                os.write(heartbeat_fd, b".")
+            except BrokenPipeError:  # the parent is gone
+                pass
+            last_beat = now
+            beat_finished = finished
+
+        if deadline is None and (stopping or os.getppid() != parent):
+            # stop accepting; the other workers keep the shared socket
+            wasyncore.dispatcher.close(server)
+            deadline = now + GRACE_SECONDS
+        if deadline is not None and (now > deadline or _idle(server)):
+            break
+
+    server.task_dispatcher.shutdown()
+
+
+def _idle(server) -> bool:
+    """No request of `server` is being served or has output left to send."""
+    return not any(
+        channel.requests or channel.total_outbufs_len
+        for channel in server.active_channels.values()
+    )
+
+
+class _Progress:
+    """WSGI app wrapper counting the requests started and finished."""
+
+    def __init__(self, app):
+        self.app = app
+        self._lock = threading.Lock()
+        self._started = 0
+        self._finished = 0
+
+    def __call__(self, environ, start_response):
+        with self._lock:
+            self._started += 1
+        try:
+            return self.app(environ, start_response)
+        finally:
+            with self._lock:
+                self._finished += 1
+
+    def counts(self) -> tuple[int, int]:
+        """Requests started and finished so far."""
+        with self._lock:
+            return self._started, self._finished
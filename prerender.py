@@ -0,0 +1,268 @@
+"""
+Static pre-render of the callbacks driven only by the year, month and variable
+dropdowns.
+
+    python prerender.py prerendered/ --bundle webapp_bundle.zip
+
+renders the response of every dropdown combination with a process pool and
+writes it gzip-compressed, one file per combination:
+
+    <out>/<callback output>/<input values>.json.gz
+
+With `PRERENDER_DIR` pointing at the output, `install()` answers those
+callback requests straight from the files: the bytes are streamed as they
+are (`Content-Encoding: gzip`), without running pandas or Plotly, and any
+request without a file falls through to the regular callback. The files are
+only served to an app that loaded the data they were rendered from, the
+`DataLoader.content_id()` written to `<out>/manifest.json`.
+"""
+
+import argparse
+import datetime
+import gzip
+import json
+import logging
+import os
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import flask
+from plotly.io.json import to_json_plotly
+
+import data_loader
+from figures import figures_main
+
+log = logging.getLogger(__name__)
+
+# first bytes of every gzip file
+GZIP_MAGIC = b"\x1f\x8b"
+
+
+def _map_inputs():
+    return [
+        (display_var, f"{year}-{month:02d}-01")
+        for display_var in figures_main.MAP_VARIABLES
+        for year in figures_main.WATER_YEARS
+        for month in range(1, 13)
+    ]
+
+
+def _date_inputs():
+    return [
+        (f"{year}-{month:02d}-01",)
+        for year in figures_main.WATER_YEARS
+        for month in range(1, 13)
+    ]
+
+
+def _year_inputs():
+    return [(year,) for year in figures_main.WATER_YEARS]
+
+
+# callback output -> (builder taking `data` and the callback inputs, inputs)
+CALLBACKS = {
+    "choropleth-map.figure": (figures_main.mapbox_lines_patch, _map_inputs),
+    "comparison-table-container.children": (
+        figures_main.comparison_table,
+        _date_inputs,
+    ),
+    "summary-text.children": (figures_main.summary_text, _year_inputs),
+}
+
+
+def file_name(values) -> str:
+    """File name of the response to the callback input values."""
+    return "__".join(str(v).replace(" ", "_") for v in values) + ".json.gz"
+
+
+def response_body(output: str, value) -> bytes:
+    """JSON body of a Dash callback response with a single output."""
+    component_id, prop = output.rsplit(".", 1)
+    return to_json_plotly(
+        {"multi": True, "response": {component_id: {prop: value}}}
+    ).encode()
+
+
+def install(server: flask.Flask, directory: str, content_id: str) -> bool:
+    """
+    Serve pre-rendered callback responses from `directory`, if they were
+    rendered from the data the app loaded.
+
+    Args:
+        server (flask.Flask): Server of the Dash app.
+        directory (str): Output of the pre-render command.
+        content_id (str): `DataLoader.content_id()` of the app data.
+
+    Returns:
+        bool: Whether the responses are served; False, with a warning, if
+            the manifest is missing or names other data.
+    """
+    directory = Path(directory).resolve()
+    try:
+        manifest = json.loads((directory / "manifest.json").read_text())
+    except (OSError, ValueError):
+        manifest = {}
+    if manifest.get("content_id") != content_id:
+        log.warning(
+            "not serving pre-rendered responses from %s: rendered from %s, "
+            "the app loaded %s",
+            directory,
+            manifest.get("content_id"),
+            content_id,
+        )
+        return False
+
+    @server.before_request
+    def serve_prerendered():
+        if not flask.request.path.endswith("/_dash-update-component"):
+            return None
+
+        body = flask.request.get_json(silent=True) or {}
+        output = body.get("output")
+        if output not in CALLBACKS:
+            return None
+
+        values = [i.get("value") for i in body.get("inputs", [])]
+        path = (directory / output / file_name(values)).resolve()
+        # the values come from the request: never read outside `directory`
+        if not path.is_relative_to(directory / output):
+            return None
+        try:
+            data = path.read_bytes()
+        except OSError:
+            return None
+        if data[:2] != GZIP_MAGIC:
+            return None
+
+        response = flask.Response(data, mimetype="application/json")
+        if "gzip" in flask.request.headers.get("Accept-Encoding", ""):
+            response.headers["Content-Encoding"] = "gzip"
+        else:
+            try:
+                response.set_data(gzip.decompress(data))
+            except (OSError, EOFError):
+                return None
+        return response
+
+    return True
+
+
+# data of a pool worker process, opened by _init_worker()
+_data = None
+
+
+def _open_data(bundle_path: str, local_data_dir: str, bucket: str):
+    if bundle_path:
+        return data_loader.DataLoader.from_bundle(bundle_path)
+    return data_loader.DataLoader(
+        bucket_name=bucket, local_data_dir=local_data_dir, lazy=True
+    )
+
+
+def _init_worker(bundle_path: str, local_data_dir: str, bucket: str):
+    global _data
+    _data = _open_data(bundle_path, local_data_dir, bucket)
+
+
+def _render(job: tuple) -> tuple[str, str, bytes | None]:
+    """Render one callback response, gzip-compressed (None on failure)."""
+    output, values = job
+    build, _ = CALLBACKS[output]
+    try:
+        value = build(_data, *values)
+    except Exception:
+        log.exception("pre-render of %s %s failed", output, values)
+        return output, file_name(values), None
+    return (
+        output,
+        file_name(values),
+        gzip.compress(response_body(output, value)),
+    )
+
+
+def prerender(
+    out: str,
+    bundle_path: str = None,
+    local_data_dir: str = None,
+    bucket: str = None,
+    processes: int = None,
+) -> int:
+    """
+    Pre-render every dropdown combination of the `CALLBACKS`.
+
+    Args:
+        out (str): Output directory.
+        bundle_path (str, optional): Data bundle to render from (recommended,
+            each worker process opens it in no time).
+        local_data_dir (str, optional): Local data directory, if no bundle.
+        bucket (str, optional): S3 bucket, if neither of the above.
+        processes (int, optional): Worker processes. Defaults to the CPU count.
+
+    Returns:
+        int: Number of files written.
+    """
+    out = Path(out)
+    jobs = [
+        (output, values)
+        for output, (_, inputs) in CALLBACKS.items()
+        for values in inputs()
+    ]
+    for output in CALLBACKS:
+        (out / output).mkdir(parents=True, exist_ok=True)
+    # lazy, nothing is loaded in this process
+    content_id = _open_data(bundle_path, local_data_dir, bucket).content_id()
+
+    written = 0
+    with ProcessPoolExecutor(
+        max_workers=processes,
+        initializer=_init_worker,
+        initargs=(bundle_path, local_data_dir, bucket),
+    ) as pool:
+        for output, name, data in pool.map(_render, jobs, chunksize=16):
+            if data is None:
+                continue
+            # atomic, so a running app never serves a partial file
+            fd, tmp_path = tempfile.mkstemp(dir=out / output, prefix=".tmp-")
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, out / output / name)
+            written += 1
+
+    manifest = {
+        "created": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+        "source": bundle_path or local_data_dir or bucket,
+        "content_id": content_id,
+        "files": written,
+    }
+    (out / "manifest.json").write_text(json.dumps(manifest, indent=1))
+    return written
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Pre-render callback responses for every dropdown value."
+    )
+    parser.add_argument("out", help="output directory")
+    parser.add_argument("--bundle", help="data bundle to render from")
+    parser.add_argument(
+        "--local-data-dir", help="load from a local directory instead of S3"
+    )
+    parser.add_argument(
+        "--bucket",
+        default=os.environ.get("BUCKET_NAME") or "tnc-dangermond",
+        help="S3 bucket to load from",
+    )
+    parser.add_argument(
+        "--processes", type=int, help="worker processes (default: CPU count)"
+    )
+    args = parser.parse_args()
+
+    written = prerender(
+        args.out,
+        bundle_path=args.bundle,
+        local_data_dir=args.local_data_dir,
+        bucket=args.bucket,
+        processes=args.processes,
+    )
+    print(f"wrote {written} files to {args.out}")
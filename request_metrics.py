@@ -0,0 +1,136 @@
+"""
+Count, latency and payload size of the Dash callback requests, per callback
+output.
+
+`install()` times every `_dash-update-component` request of the Flask server
+and serves the totals as JSON, e.g. to see how many server round trips a
+session costs and which callbacks are slow:
+
+    curl localhost:10000/_callback-metrics
+"""
+
+import threading
+import time
+
+import flask
+
+
+class CallbackMetrics:
+    """Thread-safe request counters, per callback output.
+
+    Attributes:
+    ----------
+        started : float
+            Time the counters were created or reset.
+    """
+
+    def __init__(self):
+        self.started = time.time()
+        self._lock = threading.Lock()
+        # output -> [requests, seconds, max seconds, bytes, sent bytes]
+        self._outputs = {}
+
+    def record(
+        self,
+        output: str,
+        seconds: float,
+        payload_bytes: int = 0,
+        sent_bytes: int = 0,
+    ):
+        """
+        Count a request of `output` that took `seconds`, with a response of
+        `payload_bytes` sent as `sent_bytes` (after compression).
+        """
+        with self._lock:
+            entry = self._outputs.setdefault(output, [0, 0.0, 0.0, 0, 0])
+            entry[0] += 1
+            entry[1] += seconds
+            entry[2] = max(entry[2], seconds)
+            entry[3] += payload_bytes
+            entry[4] += sent_bytes
+
+    def reset(self):
+        """Zero every counter."""
+        with self._lock:
+            self._outputs.clear()
+            self.started = time.time()
+
+    def snapshot(self) -> dict:
+        """
+        Totals, and per output the request count, latency in ms and mean
+        response size in bytes, before and after compression.
+        """
+        with self._lock:
+            outputs = {
+                output: {
+                    "requests": requests,
+                    "mean_ms": round(seconds / requests * 1000, 2),
+                    "max_ms": round(max_seconds * 1000, 2),
+                    "mean_bytes": round(payload_bytes / requests),
+                    "mean_sent_bytes": round(sent_bytes / requests),
+                }
+                for output, (
+                    requests,
+                    seconds,
+                    max_seconds,
+                    payload_bytes,
+                    sent_bytes,
+                ) in sorted(self._outputs.items())
+            }
+            return {
+                "since": self.started,
+                "requests": sum(o["requests"] for o in outputs.values()),
+                "sent_bytes": sum(e[4] for e in self._outputs.values()),
+                "outputs": outputs,
+            }
+
+
+def install(
+    server: flask.Flask,
+    path: str = "/_callback-metrics",
+    extra=None,
+) -> CallbackMetrics:
+    """
+    Time the callback requests of `server` and serve the metrics at `path`.
+
+    Args:
+        server (flask.Flask): Server of the Dash app.
+        path (str, optional): URL of the metrics. Defaults to
+            "/_callback-metrics".
+        extra (callable, optional): Returns a dict of further metrics to
+            include, e.g. cache statistics.
+
+    Returns:
+        CallbackMetrics: The counters.
+    """
+    metrics = CallbackMetrics()
+
+    @server.before_request
+    def start_timer():
+        flask.g.callback_start = time.perf_counter()
+
+    @server.after_request
+    def record_callback(response):
+        start = flask.g.pop("callback_start", None)
+        if start is not None and flask.request.path.endswith(
+            "/_dash-update-component"
+        ):
+            body = flask.request.get_json(silent=True) or {}
+            sent_bytes = response.calculate_content_length() or 0
+            metrics.record(
+                body.get("output", "?"),
+                time.perf_counter() - start,
+                # set by `compression`, if the response was compressed
+                flask.g.get("uncompressed_bytes", sent_bytes),
+                sent_bytes,
+            )
+        return response
+
+    @server.route(path)
+    def callback_metrics():
+        result = metrics.snapshot()
+        if extra is not None:
+            result.update(extra())
+        return flask.jsonify(result)
+
+    return metrics
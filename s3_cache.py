@@ -0,0 +1,187 @@
+import hashlib
+import os
+import tempfile
+import threading
+from pathlib import Path
+
+from botocore.exceptions import ClientError
+
+
+class S3DiskCache:
+    """Persistent, content-addressed on-disk cache for S3 objects.
+
+    Objects are stored under a hash of (bucket, key, ETag), so a changed object in the
+    bucket is a new cache entry rather than an overwrite. For each (bucket, key) the
+    last seen ETag is recorded, and cached objects are revalidated with a conditional
+    GET (`If-None-Match`) which returns "304 Not Modified" without a body when the
+    object is unchanged. Least recently used entries are evicted once the cache grows
+    beyond `max_bytes`.
+
+    Writes go to a temporary file followed by an atomic rename, so several worker
+    processes can share one cache directory.
+
+    Attributes:
+    ----------
+        cache_dir : pathlib.Path
+            Root directory of the cache.
+        max_bytes : int
+            Size cap for cached objects, in bytes.
+        hits : int
+            Number of requests served from disk.
+        misses : int
+            Number of requests that downloaded the object.
+    """
+
+    def __init__(self, cache_dir: str, max_bytes: int = 512 * 1024**2):
+        """
+        Parameters:
+        ----------
+        cache_dir : str
+            Directory for cached objects, created if missing.
+        max_bytes : int
+            Evict least recently used objects beyond this total size. Defaults to 512 MB.
+        """
+        self.cache_dir = Path(cache_dir)
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+
+        self._objects_dir = self.cache_dir / "objects"
+        self._etags_dir = self.cache_dir / "etags"
+        self._objects_dir.mkdir(parents=True, exist_ok=True)
+        self._etags_dir.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+
+    def get(self, s3_client, bucket: str, key: str, etag: str = None) -> bytes:
+        """
+        Return the object body, from disk when the cached copy is current.
+
+        Args:
+            s3_client (botocore.client.S3): Client used for requests to the bucket.
+            bucket (str): Bucket name.
+            key (str): Object key.
+            etag (str, optional): Current ETag of the object if already known, e.g.
+                from a bucket listing. A cached copy is then used without any request.
+
+        Returns:
+            bytes: Object body.
+        """
+        if etag is not None:
+            data = self._read(bucket, key, etag)
+            if data is not None:
+                return data
+            return self._download(s3_client, bucket, key)
+
+        last_etag = self._last_etag(bucket, key)
+        if (
+            last_etag is None
+            or not self._object_path(bucket, key, last_etag).exists()
+        ):
+            return self._download(s3_client, bucket, key)
+
+        try:
+            response = s3_client.get_object(
+                Bucket=bucket, Key=key, IfNoneMatch=last_etag
+            )
+        except ClientError as e:
+            status = e.response.get("ResponseMetadata", {}).get(
+                "HTTPStatusCode"
+            )
+            code = e.response.get("Error", {}).get("Code")
+            if status == 304 or code in ("304", "NotModified"):
+                data = self._read(bucket, key, last_etag)
+                if data is not None:
+                    return data
+                # evicted between the check and the read
+                return self._download(s3_client, bucket, key)
+            raise
+
+        # object changed since it was cached
+        return self._store(bucket, key, response)
+
+    def _download(self, s3_client, bucket: str, key: str) -> bytes:
+        """Unconditional GET, stored in the cache."""
+        response = s3_client.get_object(Bucket=bucket, Key=key)
+        return self._store(bucket, key, response)
+
+    def _store(self, bucket: str, key: str, response: dict) -> bytes:
+        """Write a GetObject response body to the cache and return it."""
+        data = response["Body"].read()
+        with self._lock:
+            self.misses += 1
+
+        etag = response.get("ETag")
+        if etag is None:
+            return data
+
+        self._atomic_write(self._object_path(bucket, key, etag), data)
+        self._atomic_write(self._etag_path(bucket, key), etag.encode())
+        self.evict()
+        return data
+
+    def _read(self, bucket: str, key: str, etag: str) -> bytes | None:
+        """Read a cached object and mark it as recently used."""
+        path = self._object_path(bucket, key, etag)
+        try:
+            data = path.read_bytes()
+            os.utime(path)  # mtime doubles as the LRU timestamp
+        except FileNotFoundError:
+            return None
+
+        with self._lock:
+            self.hits += 1
+        return data
+
+    def evict(self):
+        """
+        Delete least recently used objects until the cache is below `max_bytes`.
+        """
+        entries = []
+        for path in self._objects_dir.iterdir():
+            if path.name.startswith(".tmp-"):
+                continue  # write in progress
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue  # removed by another process
+            entries.append((stat.st_mtime, stat.st_size, path))
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            try:
+                path.unlink()
+            except FileNotFoundError:
+                pass
+            total -= size
+
+    def _last_etag(self, bucket: str, key: str) -> str | None:
+        """ETag of the most recently cached version of an object."""
+        try:
+            return self._etag_path(bucket, key).read_text()
+        except FileNotFoundError:
+            return None
+
+    def _object_path(self, bucket: str, key: str, etag: str) -> Path:
+        return self._objects_dir / _digest(bucket, key, etag)
+
+    def _etag_path(self, bucket: str, key: str) -> Path:
+        return self._etags_dir / _digest(bucket, key)
+
+    def _atomic_write(self, path: Path, data: bytes):
+        """Write to a temporary file in the same directory, then rename into place."""
+        fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=".tmp-")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            raise
+
+
+def _digest(*parts: str) -> str:
+    """Stable file name for a cache entry."""
+    return hashlib.sha256("\0".join(parts).encode()).hexdigest()
@@ -0,0 +1,262 @@
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from pathlib import Path
+
+from plotly.io.json import to_json_plotly
+
+log = logging.getLogger(__name__)
+
+
+class SharedCache:
+    """Key/value cache in a SQLite file, shared by every worker process on the host.
+
+    Values are stored JSON-encoded (figures, Dash components and plain results
+    alike) and zlib-compressed, so they come back as plain dicts and lists.
+    Every write is a SQLite transaction, so readers never see a partial entry,
+    and the database runs in WAL mode so readers do not block the writer.
+    Entries expire `ttl` seconds after they were written, and the least recently
+    used entries are evicted once the cache grows beyond `max_bytes`. Because
+    the file outlives the processes, a restarted worker starts warm.
+
+    A hit only writes when the entry's access time is older than
+    `ACCESS_RESOLUTION`, so recency is tracked to the minute and repeated
+    hits are plain reads. The total size is kept in a one-row table by
+    triggers, so a write checks it without summing the entries, and eviction
+    (down to `EVICT_TO` of the cap) only runs once the total passes the cap.
+
+    The cache never fails a request: SQLite errors are logged and treated as a
+    miss.
+
+    Attributes:
+    ----------
+        path : pathlib.Path
+            SQLite database file.
+        max_bytes : int
+            Size cap of the stored (compressed) values, in bytes.
+        ttl : float
+            Entry lifetime in seconds, None for no expiry.
+        hits : int
+            Number of lookups served from the cache by this process.
+        misses : int
+            Number of lookups not found (or expired) by this process.
+    """
+
+    # seconds an entry's access time may lag behind its last hit
+    ACCESS_RESOLUTION = 60.0
+    # eviction frees entries down to this fraction of `max_bytes`
+    EVICT_TO = 0.9
+
+    def __init__(
+        self,
+        path: str,
+        max_bytes: int = 256 * 1024**2,
+        ttl: float = 24 * 3600,
+    ):
+        """
+        Parameters:
+        ----------
+        path : str
+            SQLite database file, created if missing.
+        max_bytes : int
+            Evict least recently used entries beyond this total size. Defaults to 256 MB.
+        ttl : float
+            Seconds until an entry expires. Defaults to one day; None keeps entries
+            until they are evicted.
+        """
+        self.path = Path(path)
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+
+        self._local = threading.local()
+        self._lock = threading.Lock()
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        con = self._connection()
+        con.execute("BEGIN IMMEDIATE")
+        try:
+            con.execute(
+                "CREATE TABLE IF NOT EXISTS entries ("
+                " key TEXT PRIMARY KEY,"
+                " value BLOB NOT NULL,"
+                " size INTEGER NOT NULL,"
+                " created REAL NOT NULL,"
+                " accessed REAL NOT NULL)"
+            )
+            con.execute(
+                "CREATE INDEX IF NOT EXISTS entries_accessed"
+                " ON entries (accessed)"
+            )
+            # total size, counting the entries of a file from before the table
+            con.execute(
+                "CREATE TABLE IF NOT EXISTS total ("
+                " id INTEGER PRIMARY KEY CHECK (id = 0),"
+                " size INTEGER NOT NULL)"
+            )
+            con.execute(
+                "INSERT OR IGNORE INTO total"
+                " SELECT 0, COALESCE(SUM(size), 0) FROM entries"
+            )
+            for name, event, change in (
+                ("insert", "INSERT", "NEW.size"),
+                ("delete", "DELETE", "-OLD.size"),
+                ("update", "UPDATE OF size", "NEW.size - OLD.size"),
+            ):
+                con.execute(
+                    f"CREATE TRIGGER IF NOT EXISTS total_{name}"
+                    f" AFTER {event} ON entries BEGIN"
+                    f" UPDATE total SET size = size + {change};"
+                    " END"
+                )
+            con.execute("COMMIT")
+        except BaseException:
+            con.execute("ROLLBACK")
+            raise
+
+    def get(self, key: str):
+        """
+        Return the value stored under `key`, or None if there is no current entry.
+
+        Args:
+            key (str): Cache key.
+        """
+        return self.get_sized(key)[0]
+
+    def get_sized(self, key: str) -> tuple:
+        """
+        Like `get()`, also returning the length of the value's JSON encoding,
+        which callers sizing the value would otherwise compute again.
+
+        Args:
+            key (str): Cache key.
+
+        Returns:
+            tuple: The value and its JSON length, or (None, 0).
+        """
+        now = time.time()
+        try:
+            con = self._connection()
+            row = con.execute(
+                "SELECT value, created, accessed FROM entries WHERE key = ?",
+                (key,),
+            ).fetchone()
+            if row is not None and not self._expired(row[1], now):
+                if now - row[2] > self.ACCESS_RESOLUTION:
+                    con.execute(
+                        "UPDATE entries SET accessed = ? WHERE key = ?",
+                        (now, key),
+                    )
+                text = zlib.decompress(row[0])
+                value = json.loads(text)
+            else:
+                text, value = b"", None
+        except sqlite3.Error:
+            log.warning("shared cache read failed", exc_info=True)
+            text, value = b"", None
+
+        with self._lock:
+            if value is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return value, len(text)
+
+    def set(self, key: str, value) -> int:
+        """
+        Store a JSON-serializable value (figures and Dash components included).
+
+        Args:
+            key (str): Cache key.
+            value: Value to store.
+
+        Returns:
+            int: Length of the value's JSON encoding.
+        """
+        text = to_json_plotly(value).encode()
+        data = zlib.compress(text)
+        if len(data) > self.max_bytes:
+            return len(text)
+
+        now = time.time()
+        try:
+            con = self._connection()
+            # an upsert, not a REPLACE: that deletes without the delete trigger
+            con.execute(
+                "INSERT INTO entries VALUES (?, ?, ?, ?, ?)"
+                " ON CONFLICT (key) DO UPDATE SET value = excluded.value,"
+                " size = excluded.size, created = excluded.created,"
+                " accessed = excluded.accessed",
+                (key, data, len(data), now, now),
+            )
+            if self.size() > self.max_bytes:
+                self.evict()
+        except sqlite3.Error:
+            log.warning("shared cache write failed", exc_info=True)
+        return len(text)
+
+    def size(self) -> int:
+        """Total size of the stored (compressed) values, in bytes."""
+        return (
+            self._connection().execute("SELECT size FROM total").fetchone()[0]
+        )
+
+    def evict(self):
+        """
+        Delete expired entries, then least recently used entries until the
+        cache is below `EVICT_TO` of `max_bytes`.
+        """
+        con = self._connection()
+        con.execute("BEGIN IMMEDIATE")
+        try:
+            if self.ttl is not None:
+                con.execute(
+                    "DELETE FROM entries WHERE created < ?",
+                    (time.time() - self.ttl,),
+                )
+            total = self.size()
+            limit = self.max_bytes * self.EVICT_TO
+            if total > limit:
+                # oldest first, from the index, only as far as needed
+                evicted = []
+                rows = con.execute(
+                    "SELECT key, size FROM entries ORDER BY accessed"
+                )
+                for key, size in rows:
+                    if total <= limit:
+                        break
+                    evicted.append((key,))
+                    total -= size
+                rows.close()
+                con.executemany("DELETE FROM entries WHERE key = ?", evicted)
+            con.execute("COMMIT")
+        except BaseException:
+            con.execute("ROLLBACK")
+            raise
+
+    def clear(self):
+        """Delete every entry, for all processes."""
+        self._connection().execute("DELETE FROM entries")
+
+    def _expired(self, created: float, now: float) -> bool:
+        return self.ttl is not None and now - created > self.ttl
+
+    def _connection(self) -> sqlite3.Connection:
+        """
+        Connection of the calling thread. sqlite3 connections can't be shared
+        between threads, nor survive a fork, so each thread of each process
+        opens its own.
+        """
+        con = getattr(self._local, "con", None)
+        if con is None or self._local.pid != os.getpid():
+            con = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            con.execute("PRAGMA journal_mode=WAL")
+            con.execute("PRAGMA synchronous=NORMAL")
+            self._local.con = con
+            self._local.pid = os.getpid()
+        return con
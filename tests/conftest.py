@@ -0,0 +1,63 @@
+import os
+import sys
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+# the app's modules are top-level modules of the repository root
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import data_loader  # noqa: E402
+import fixture_data  # noqa: E402
+
+# as `application.create_app()` does
+pd.set_option("mode.copy_on_write", True)
+
+
+@pytest.fixture(scope="session")
+def data_dir(tmp_path_factory) -> str:
+    """Local data directory with the synthetic data of `fixture_data`."""
+    root = tmp_path_factory.mktemp("data")
+    fixture_data.write(str(root))
+    return str(root)
+
+
+@pytest.fixture(scope="session")
+def bundle_path(data_dir, tmp_path_factory) -> str:
+    """Data bundle baked from `data_dir`."""
+    path = tmp_path_factory.mktemp("bundle") / "webapp_bundle.zip"
+    loader = data_loader.DataLoader(local_data_dir=data_dir, lazy=True)
+    loader.to_bundle(str(path))
+    return str(path)
+
+
+@pytest.fixture(scope="session", params=["local", "bundle"])
+def data(request, data_dir) -> data_loader.DataLoader:
+    """The fixture data, loaded from the directory and from the bundle."""
+    if request.param == "local":
+        return data_loader.DataLoader(local_data_dir=data_dir, lazy=True)
+    return data_loader.DataLoader.from_bundle(
+        request.getfixturevalue("bundle_path")
+    )
+
+
+@pytest.fixture(scope="session")
+def app(bundle_path):
+    """The Dash app, serving a bundle of the fixture data."""
+    # metrics are served in production too, should DASH_PROD be set
+    os.environ["DATA_BUNDLE"] = bundle_path
+    os.environ["CALLBACK_METRICS"] = "True"
+    try:
+        import application
+
+        return application.create_app()
+    finally:
+        del os.environ["DATA_BUNDLE"]
+        del os.environ["CALLBACK_METRICS"]
+
+
+@pytest.fixture(scope="session")
+def home(app):
+    """The home page module, imported by the app."""
+    return sys.modules["pages.home"]
@@ -0,0 +1,251 @@
+"""
+Small synthetic copy of the bucket layout, for tests.
+
+`write(root)` writes every object the `DataLoader` reads (six catchments, two
+wells, 1980-2023) to a local data directory, from a seeded random generator:
+the same directory is written on every run, so outputs of the figure builders
+can be compared against reference values.
+"""
+
+import os
+
+import geopandas as gpd
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+import xarray as xr
+from shapely.geometry import LineString, Point, Polygon
+
+CATCHMENT_IDS = [36, 42, 58, 10, 11, 12]
+CATCHMENTS = [f"cat-{i}" for i in CATCHMENT_IDS]
+WELLS = ["stnA", "stnB"]
+
+NGEN_VARIABLES = [
+    "rain_rate",
+    "direct_runoff",
+    "infiltration_excess",
+    "nash_lateral_runoff",
+    "deep_gw_to_channel_flux",
+    "soil_to_gw_flux",
+    "q_out",
+    "soil_storage",
+    "PET",
+    "AET",
+]
+CABCM_VARIABLES = [
+    "aet",
+    "cwd",
+    "pck",
+    "pet",
+    "rch",
+    "run",
+    "str",
+    "tmn",
+    "tmx",
+]
+TERRACLIM_VARIABLES = [
+    "aet",
+    "def",
+    "PDSI",
+    "pet",
+    "ppt",
+    "q",
+    "soil",
+    "srad",
+    "swe",
+    "tmax",
+    "tmin",
+    "vap",
+    "vpd",
+    "ws",
+]
+
+
+def write(root: str):
+    """
+    Write the synthetic data to a local data directory.
+
+    Args:
+        root (str): Directory, used as `DataLoader(local_data_dir=root)`.
+    """
+    for directory in [
+        "location_data",
+        "hydrofabric",
+        "water_balance/tnc",
+        "water_balance/v2/cabcm",
+        "water_balance/v2/terraclim",
+        "webapp_resources",
+    ]:
+        os.makedirs(os.path.join(root, directory), exist_ok=True)
+    rng = np.random.default_rng(0)
+
+    _write_hydrofabric(root)
+    outline = gpd.GeoDataFrame(
+        {"name": ["tnc"]},
+        geometry=[
+            Polygon(
+                [
+                    (-120.5, 34.4),
+                    (-120.3, 34.4),
+                    (-120.3, 34.6),
+                    (-120.5, 34.6),
+                ]
+            )
+        ],
+        crs="EPSG:4326",
+    )
+    outline.to_file(
+        os.path.join(root, "location_data/tnc.geojson"), driver="GeoJSON"
+    )
+
+    days = pd.date_range("1980-01-01", "2023-12-31", freq="D")
+    pd.DataFrame(
+        {
+            "date": np.tile(days, len(CATCHMENT_IDS)),
+            "divide_id": np.repeat([str(i) for i in CATCHMENT_IDS], len(days)),
+            "weighted_tnc_flow": rng.random(len(days) * len(CATCHMENT_IDS)),
+        }
+    ).to_parquet(
+        os.path.join(root, "water_balance/tnc/weighted_natural_flows.parquet")
+    )
+
+    months = pd.date_range("1980-01-01", "2023-12-01", freq="MS")
+    for source, variables in [
+        ("cabcm", CABCM_VARIABLES),
+        ("terraclim", TERRACLIM_VARIABLES),
+    ]:
+        for var in variables:
+            pd.DataFrame(
+                {
+                    "date": np.tile(
+                        months.strftime("%Y-%m-%d"), len(CATCHMENTS)
+                    ),
+                    "divide_id": np.repeat(CATCHMENTS, len(months)),
+                    "value": rng.random(len(months) * len(CATCHMENTS)) * 50,
+                }
+            ).to_parquet(
+                os.path.join(root, f"water_balance/v2/{source}/{var}.parquet")
+            )
+
+    resources = os.path.join(root, "webapp_resources")
+    pd.DataFrame(
+        {
+            "year": months.year,
+            "month": months.month,
+            "value": rng.random(len(months)) * 20,
+        }
+    ).to_csv(
+        os.path.join(resources, "flow_17593507_mean_estimated_1982_2023.csv"),
+        index=False,
+    )
+    pd.DataFrame(
+        {"flow": rng.random(len(months)) * 1e6}, index=months
+    ).to_parquet(os.path.join(resources, "cfe_20241103_troute_cat23.parquet"))
+
+    hours = pd.date_range("2010-01-01", "2023-12-31", freq="h")
+    levels = pd.DataFrame(
+        {well: np.cumsum(rng.normal(size=len(hours))) for well in WELLS},
+        index=hours,
+    )
+    levels.iloc[:100, 0] = np.nan
+    levels.to_parquet(
+        os.path.join(resources, "gw_level_raw_hourly_feet.parquet")
+    )
+
+    for suffix in ["af", "cfs"]:
+        # feature ids as integer column labels, as in the bucket
+        flows = pd.DataFrame(
+            rng.random((len(months), len(CATCHMENT_IDS))) * 100,
+            index=months,
+            columns=CATCHMENT_IDS,
+        )
+        pq.write_table(
+            pa.Table.from_pandas(flows),
+            os.path.join(
+                resources, f"cfe_routed_flow_monthly_{suffix}.parquet"
+            ),
+        )
+
+    ngen = xr.Dataset(
+        {
+            var: (
+                ("catchment", "Time"),
+                rng.random((len(CATCHMENTS), len(months))) * 0.1,
+            )
+            for var in NGEN_VARIABLES
+        },
+        coords={"catchment": CATCHMENTS, "Time": months},
+    )
+    ngen.to_netcdf(
+        os.path.join(resources, "ngen_validation_20250922_monthly.nc"),
+        engine="netcdf4",
+    )
+
+
+def _write_hydrofabric(root: str):
+    """Catchment divides, wells and flowpaths in one GeoPackage."""
+    path = os.path.join(root, "hydrofabric/jldp_ngen_nhdhr_wells.gpkg")
+    polygons = []
+    for k in range(len(CATCHMENT_IDS)):
+        x0, y0 = 660000 + 2000 * k, 3820000
+        # the first catchment has a hole
+        holes = (
+            [
+                [
+                    (x0 + 500, y0 + 500),
+                    (x0 + 600, y0 + 500),
+                    (x0 + 600, y0 + 600),
+                ]
+            ]
+            if k == 0
+            else None
+        )
+        polygons.append(
+            Polygon(
+                [
+                    (x0, y0),
+                    (x0 + 2000, y0),
+                    (x0 + 2000, y0 + 2000),
+                    (x0, y0 + 2000),
+                ],
+                holes=holes,
+            )
+        )
+    gpd.GeoDataFrame(
+        {
+            "divide_id": CATCHMENTS,
+            "areasqkm": [4.0] * len(CATCHMENTS),
+            "toid": ["x"] * len(CATCHMENTS),
+            "extra": range(len(CATCHMENTS)),
+        },
+        geometry=polygons,
+        crs="EPSG:32610",
+    ).to_file(path, layer="divides", driver="GPKG")
+
+    gpd.GeoDataFrame(
+        {
+            "station_id_dendra": WELLS,
+            "name": ["Well A", "Well B"],
+            "divide_id": [CATCHMENTS[0], CATCHMENTS[2]],
+        },
+        geometry=[Point(661000, 3821000), Point(665000, 3821000)],
+        crs="EPSG:32610",
+    ).to_file(path, layer="wells", driver="GPKG")
+
+    gpd.GeoDataFrame(
+        {
+            "divide_id": CATCHMENTS,
+            "id": [f"wb-{i}" for i in CATCHMENT_IDS],
+        },
+        geometry=[
+            LineString(
+                [
+                    (660000 + 2000 * k + 100 * j, 3820000 + 50 * j)
+                    for j in range(5)
+                ]
+            )
+            for k in range(len(CATCHMENT_IDS))
+        ],
+        crs="EPSG:32610",
+    ).to_file(path, layer="flowpaths", driver="GPKG")
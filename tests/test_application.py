@@ -0,0 +1,57 @@
+"""
+The app served from a bundle of the fixture data, through the Flask test
+client: which callbacks need the server, and the request metrics.
+"""
+
+import pytest
+
+
+@pytest.fixture(scope="module")
+def client(app):
+    return app.server.test_client()
+
+
+def _update(client, output: str, inputs: list):
+    component_id, prop = output.rsplit(".", 1)
+    return client.post(
+        "/_dash-update-component",
+        json={
+            "output": output,
+            "outputs": {"id": component_id, "property": prop},
+            "inputs": inputs,
+            "state": [],
+            "changedPropIds": [f"{inputs[0]['id']}.{inputs[0]['property']}"],
+        },
+    )
+
+
+def test_selected_date_is_set_in_the_browser(client):
+    dependencies = client.get("/_dash-dependencies").json
+    date_callbacks = [
+        callback
+        for callback in dependencies
+        if "selected-date-store.data" in callback["output"]
+    ]
+
+    assert date_callbacks
+    for callback in date_callbacks:
+        assert callback["clientside_function"] is not None
+
+
+def test_callback_metrics(client):
+    # the counters are shared with the other tests
+    before = client.get("/_callback-metrics").json["outputs"]
+    count = before.get("summary-text.children", {}).get("requests", 0)
+
+    response = _update(
+        client,
+        "summary-text.children",
+        [{"id": "year-dropdown", "property": "value", "value": 2005}],
+    )
+    assert response.status_code == 200
+
+    metrics = client.get("/_callback-metrics").json
+    summary = metrics["outputs"]["summary-text.children"]
+    assert summary["requests"] == count + 1
+    assert summary["mean_bytes"] > 0
+    assert metrics["initial_map"]["bytes"] > 0
@@ -0,0 +1,98 @@
+import hashlib
+import random
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+import pytest
+from plotly.io.json import to_json_plotly
+
+import data_loader
+from figures import figures_main
+
+THREADS = 16
+
+
+def digest(data) -> str:
+    """Checksum of the loaded values the builders below read."""
+    h = hashlib.sha1()
+    for name in data.ds_ngen.data_vars:
+        h.update(np.ascontiguousarray(data.ds_ngen[name].values).tobytes())
+    h.update(np.ascontiguousarray(data.well_data.to_numpy()).tobytes())
+    h.update(pd.util.hash_pandas_object(data.water_year_summary).to_numpy())
+    return h.hexdigest()
+
+
+def test_ngen_variables_are_read_only(data):
+    # every variable but the indexes, which are immutable anyway
+    for var in data.ds_ngen.data_vars.values():
+        values = var.values
+        with pytest.raises(ValueError):
+            values[(0,) * values.ndim] = values[(0,) * values.ndim]
+
+    with pytest.raises(ValueError):
+        data.ds_ngen["RAIN_RATE"][0, 0] = 3
+
+
+def test_frames_are_read_only(data):
+    with pytest.raises(ValueError):
+        data.well_data.to_numpy()[0, 0] = 5.0
+
+    # with copy-on-write a derived frame is a copy, the data is unchanged
+    first = data.well_data.iloc[200, 0]
+    levels = data.well_data.iloc[:, 0]
+    levels.iloc[200] = first + 1
+    assert data.well_data.iloc[200, 0] == first
+
+    # without, writing through a view raises
+    with pd.option_context("mode.copy_on_write", False):
+        levels = data.well_data.iloc[:, 0]
+        with pytest.raises(ValueError):
+            levels.iloc[200] = first + 1
+
+
+def test_concurrent_reads(data_dir, home):
+    """
+    Many threads load (a fresh lazy loader) and read the same data at once:
+    every call succeeds, calls with the same inputs agree, and the data is
+    the same as loaded by a single thread.
+    """
+    before = digest(data_loader.DataLoader(local_data_dir=data_dir))
+    data = data_loader.DataLoader(local_data_dir=data_dir, lazy=True)
+    rng = random.Random(0)
+    cat_ids = [f"cat-{i}" for i in (36, 42, 58, 10, 11, 12)]
+    jobs = [
+        (
+            rng.choice(cat_ids),
+            rng.choice(list(figures_main.WATER_YEARS)),
+            rng.choice(["stnA", "stnB"]),
+        )
+        for _ in range(4 * THREADS)
+    ]
+
+    def work(job):
+        cat_id, year, stn_id = job
+        return (
+            job,
+            figures_main.water_balance_figures(data, cat_id),
+            figures_main.summary_text(data, year),
+            figures_main.comparison_table(data, f"{year}-03-01"),
+            data.well_pyramid().levels(stn_id, f"{year}-01-01")[1].sum(),
+            to_json_plotly(home.well_comparison_figure(data, stn_id)),
+        )
+
+    with ThreadPoolExecutor(THREADS) as pool:
+        results = list(pool.map(work, jobs))
+    assert digest(data) == before
+
+    with ThreadPoolExecutor(THREADS) as pool:
+        again = list(pool.map(work, jobs))
+    assert digest(data) == before
+
+    for first, second in zip(results, again):
+        assert first[0] == second[0]
+        assert first[1] == second[1]
+        assert first[2] == second[2]
+        assert to_json_plotly(first[3]) == to_json_plotly(second[3])
+        assert first[4] == second[4]
+        assert first[5] == second[5]
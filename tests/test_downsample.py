@@ -0,0 +1,62 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from figures import downsample
+
+
+@pytest.fixture
+def series() -> pd.Series:
+    rng = np.random.default_rng(0)
+    index = pd.date_range("2010-01-01", periods=20_000, freq="h")
+    values = np.cumsum(rng.normal(size=len(index)))
+    values[5000] += 50  # a spike
+    values[9000:9500] = np.nan  # a gap
+    return pd.Series(values, index=index)
+
+
+@pytest.mark.parametrize("method", ["minmax", "lttb"])
+def test_keeps_ends_and_gaps(series, method):
+    points = downsample.series(series, 500, method)
+
+    assert len(points) <= 510
+    assert points.index[0] == series.index[0]
+    assert points.index[-1] == series.index[-1]
+    assert points.index.is_monotonic_increasing
+    # the line breaks at the gap instead of bridging it
+    assert points.isna().any()
+    assert not points.loc[series.index[9000] : series.index[9499]].notna().any()
+
+
+def test_minmax_keeps_extremes(series):
+    points = downsample.series(series, 500)
+
+    assert points.max() == series.max()
+    assert points.min() == series.min()
+
+
+def test_short_series_are_unchanged(series):
+    short = series.iloc[:100]
+
+    assert downsample.series(short, 500) is short
+
+
+def test_window_reaches_its_edges(series):
+    start, end = series.index[[100, 400]]
+    points = downsample.window(series, start, end, 500)
+
+    # full resolution, one point beyond each side
+    assert len(points) == 303
+    assert points.index[0] < start and points.index[-1] > end
+
+
+def test_well_levels_fit_the_chart(home, data):
+    pyramid = data.well_pyramid()
+    levels = home.well_level_change(data, "stnA")
+    daily = pyramid.stat("stnA", "mean", "daily") - pyramid.first_valid("stnA")
+
+    # finer than the monthly level that fits, down to the chart size
+    assert len(pyramid.stat("stnA", "mean", "monthly")) < len(levels)
+    assert len(levels) <= downsample.MAX_POINTS + 2
+    assert levels.max() == daily.max()
+    assert levels.min() == daily.min()
@@ -0,0 +1,171 @@
+"""
+Parity of the figure builders with the outputs of the original plotly
+express and pandas implementations, recorded in `reference/figures_main.json`
+for the fixture data (`fixture_data.py`).
+
+Figures are compared by fingerprint: every trace property but the data
+arrays exactly, the arrays by length, first and last x value and the sum,
+minimum and maximum of y, and the layout without its template.
+
+The benchmark times a builder against its plotly express original and
+records the timings as test properties (e.g. in the `--junitxml` report).
+"""
+
+import base64
+import json
+import timeit
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import plotly.express as px
+import pytest
+from plotly.io.json import to_json_plotly
+
+from figures import figure_dicts, figures_main
+
+REFERENCE = json.loads(
+    (Path(__file__).parent / "reference" / "figures_main.json").read_text()
+)
+
+# float32 payload arrays against the float64 reference
+RTOL = 1e-5
+
+
+def decode(array) -> np.ndarray:
+    """A plotly JSON array (list or typed array spec) as an ndarray."""
+    if isinstance(array, dict):
+        values = np.frombuffer(
+            base64.b64decode(array["bdata"]), dtype=array["dtype"]
+        )
+        return values.reshape(array["shape"]) if "shape" in array else values
+    return np.asarray(array)
+
+
+def fingerprint(fig: dict) -> dict:
+    """Comparable summary of a plotly JSON figure."""
+    traces = []
+    for trace in fig["data"]:
+        x = pd.to_datetime(decode(trace["x"]))
+        y = decode(trace["y"]).astype(float)
+        traces.append(
+            {
+                "properties": {
+                    k: v for k, v in trace.items() if k not in ("x", "y")
+                },
+                "points": len(x),
+                "x": [x[0].isoformat(), x[-1].isoformat()],
+                "y": [np.nansum(y), np.nanmin(y), np.nanmax(y)],
+                "nan": int(np.isnan(y).sum()),
+            }
+        )
+    layout = {k: v for k, v in fig["layout"].items() if k != "template"}
+    return {"data": traces, "layout": layout}
+
+
+def resolve(payload: dict, var: str) -> dict:
+    """A figure of a `water_balance_figures()` payload, arrays resolved."""
+    spec = payload["figures"][var]
+    data = [
+        {
+            k: payload["arrays"][v] if k in ("x", "y") else v
+            for k, v in trace.items()
+        }
+        for trace in spec["data"]
+    ]
+    # to JSON and back, as the browser receives it
+    return json.loads(json.dumps({"data": data, "layout": spec["layout"]}))
+
+
+def assert_same_figure(actual: dict, expected: dict):
+    assert len(actual["data"]) == len(expected["data"])
+    for trace, reference in zip(actual["data"], expected["data"]):
+        assert trace["properties"] == reference["properties"]
+        assert trace["points"] == reference["points"]
+        assert trace["x"] == reference["x"]
+        assert trace["nan"] == reference["nan"]
+        np.testing.assert_allclose(trace["y"], reference["y"], rtol=RTOL)
+    assert actual["layout"] == expected["layout"]
+
+
+@pytest.mark.parametrize("var", list(REFERENCE["water_balance"]["figures"]))
+def test_water_balance_figures(data, var):
+    cat_id = REFERENCE["water_balance"]["cat_id"]
+    payload = figures_main.water_balance_figures(data, cat_id)
+
+    assert payload["cat_id"] == cat_id
+    assert_same_figure(
+        fingerprint(resolve(payload, var)),
+        REFERENCE["water_balance"]["figures"][var],
+    )
+
+
+def test_water_balance_default_figure(data):
+    payload = figures_main.water_balance_figures(data)
+
+    assert_same_figure(
+        fingerprint(resolve(payload, "*")),
+        REFERENCE["water_balance_default"],
+    )
+
+
+@pytest.mark.parametrize("selected_date", list(REFERENCE["comparison_table"]))
+def test_comparison_table(data, selected_date):
+    table = figures_main.comparison_table(data, selected_date)
+
+    assert (
+        json.loads(to_json_plotly(table))
+        == REFERENCE["comparison_table"][selected_date]
+    )
+
+
+@pytest.mark.parametrize("year", list(REFERENCE["summary_text"]))
+def test_summary_text(data, year):
+    assert (
+        figures_main.summary_text(data, int(year))
+        == REFERENCE["summary_text"][year]
+    )
+
+
+def px_plot_q_out(data, cat_id):
+    """`figures_main.plot_q_out()` as it was built with plotly express."""
+    feature_id = int(cat_id.split("-")[1])
+    fig = px.line(
+        data.cfe_routed_flow_af[feature_id], title="Streamflow Comparison"
+    )
+    fig.update_layout(
+        autosize=True,
+        title={"text": f"Catchment - {cat_id}: Streamflow"},
+        title_x=0.5,
+        yaxis_title="Monthly Volume (acre-feet)",
+        uirevision="Don't change",
+        plot_bgcolor="white",
+        xaxis_title="",
+        showlegend=False,
+    )
+    return fig
+
+
+def test_figure_dicts_benchmark(data, monkeypatch, record_property):
+    # as in production, where the dicts are not validated
+    monkeypatch.setattr(figure_dicts, "VALIDATE", False)
+    cat_id = REFERENCE["water_balance"]["cat_id"]
+    # the same figure
+    assert_same_figure(
+        fingerprint(json.loads(to_json_plotly(px_plot_q_out(data, cat_id)))),
+        REFERENCE["water_balance"]["figures"]["Streamflow"],
+    )
+
+    def timed(build) -> float:
+        # built and serialized, as the callback response
+        runs = timeit.repeat(
+            lambda: to_json_plotly(build(data, cat_id)), number=10, repeat=5
+        )
+        return min(runs) / 10
+
+    express = timed(px_plot_q_out)
+    dicts = timed(figures_main.plot_q_out)
+    record_property("express_ms", express * 1000)
+    record_property("dicts_ms", dicts * 1000)
+
+    assert dicts < express / 3
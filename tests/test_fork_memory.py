@@ -0,0 +1,84 @@
+"""
+Memory of workers forked the way `prefork.serve()` forks them: after
+`DataLoader.prepare_fork()` and `gc.freeze()`, workers reading every loaded
+array keep sharing it with the parent copy-on-write, so the private memory
+of each worker stays a small fraction of the data, whatever the number of
+workers. Copying the arrays to shared memory could not save more.
+"""
+
+import gc
+import os
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import data_loader
+
+pytestmark = pytest.mark.skipif(
+    not hasattr(os, "fork") or not Path("/proc/self/smaps_rollup").exists(),
+    reason="needs os.fork and /proc/<pid>/smaps_rollup",
+)
+
+WORKERS = 3
+# copies of the fixture wells, for data well above the interpreter's noise
+WELL_COPIES = 20
+
+
+def private_dirty() -> int:
+    """Private dirty memory of this process, in bytes."""
+    with open("/proc/self/smaps_rollup") as f:
+        for line in f:
+            if line.startswith("Private_Dirty:"):
+                return int(line.split()[1]) * 1024
+    raise AssertionError("no Private_Dirty in smaps_rollup")
+
+
+def read_everything(data):
+    """Read every value of the arrays a callback may read."""
+    for _, levels in data.well_data.items():
+        (levels - levels.mean()).abs().max()
+    for var in data.ds_ngen.data_vars.values():
+        np.nansum(var.values)
+    data.map_cube.sum()
+
+
+def test_workers_share_the_loaded_arrays(data_dir):
+    data = data_loader.DataLoader(local_data_dir=data_dir)
+    wells = data.well_data
+    data.well_data = pd.concat(
+        [wells.add_suffix(f"-{i}") for i in range(WELL_COPIES)], axis=1
+    )
+    shared_bytes = data.well_data.memory_usage().sum()
+    del wells
+    # as prefork.serve() does
+    data.prepare_fork()
+    gc.collect()
+    gc.freeze()
+
+    grown = []
+    try:
+        for _ in range(WORKERS):
+            read_fd, write_fd = os.pipe()
+            pid = os.fork()
+            if pid == 0:
+                os.close(read_fd)
+                try:
+                    before = private_dirty()
+                    read_everything(data)
+                    os.write(write_fd, str(private_dirty() - before).encode())
+                finally:
+                    os._exit(0)
+            os.close(write_fd)
+            with os.fdopen(read_fd) as f:
+                grown.append(int(f.read()))
+            os.waitpid(pid, 0)
+    finally:
+        gc.unfreeze()
+
+    # a worker with its own copy of the data would grow by shared_bytes;
+    # sharing, it grows by a few MB of interpreter state whatever the size
+    assert shared_bytes > 30 * 1024**2
+    for worker_bytes in grown:
+        assert worker_bytes < shared_bytes / 4
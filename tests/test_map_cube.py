@@ -0,0 +1,114 @@
+"""
+The map colors come from `DataLoader.map_cube`; each slice must match the
+selection from the NGen dataset and the routed flows it replaces.
+
+The benchmarks compare the map callback with the selection and merge it ran
+before the cube, and record the timings as test properties (e.g. in the
+`--junitxml` report).
+"""
+
+import timeit
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import data_loader
+from figures import figures_main
+
+
+def expected_values(data, display_var, time) -> np.ndarray:
+    """Values of a map variable for one month, selected from the sources."""
+    var = figures_main.MAP_VARIABLES[display_var][0]
+    if var == "Streamflow Vol. (af)":
+        flows = data.cfe_routed_flow_af
+        row = flows.loc[time].reindex(data.gdf["feature_id"])
+        return row.to_numpy(dtype=np.float32)
+    values = data.ds_ngen[var].sel(Time=time).to_series()
+    return values.reindex(data.gdf["divide_id"]).to_numpy(dtype=np.float32)
+
+
+@pytest.mark.parametrize("display_var", list(figures_main.MAP_VARIABLES))
+@pytest.mark.parametrize("time", ["1985-01-01", "2003-07-01", "2023-09-01"])
+def test_map_values(data, display_var, time):
+    np.testing.assert_array_equal(
+        figures_main.map_values(data, display_var, time),
+        expected_values(data, display_var, time),
+    )
+
+
+def test_map_values_month_without_data(data):
+    values = figures_main.map_values(data, "Actual ET", "1900-01-01")
+
+    assert values.shape == (len(data.gdf),)
+    assert np.isnan(values).all()
+
+
+def merged_values(data, display_var, time) -> np.ndarray:
+    """
+    Values of a map variable for one month, the way the map callback got
+    them before `map_cube`: a selection of the month merged onto the rows
+    of `gdf`.
+    """
+    var = figures_main.MAP_VARIABLES[display_var][0]
+    year_month = time[:7]
+    if var == "Streamflow Vol. (af)":
+        colors = data.cfe_routed_flow_af.loc[year_month].melt(
+            var_name="feature_id", value_name=var
+        )
+        merged = pd.merge(
+            data.gdf[["feature_id"]], colors, on="feature_id", how="left"
+        )
+    else:
+        colors = data.ds_ngen[var].sel(Time=year_month).to_dataframe()
+        merged = pd.merge(
+            data.gdf[["divide_id"]],
+            colors[[var]],
+            left_on="divide_id",
+            right_on="catchment",
+            how="left",
+        )
+    return merged[var].to_numpy(dtype=np.float32)
+
+
+def best_seconds(func, number: int = 20) -> float:
+    """Best time of one call of `func`, over a few repeats."""
+    return min(timeit.repeat(func, number=number, repeat=5)) / number
+
+
+@pytest.mark.parametrize("display_var", ["Streamflow", "Actual ET"])
+def test_map_callback_benchmark(data, display_var, record_property):
+    time = "2003-07-01"
+    np.testing.assert_array_equal(
+        merged_values(data, display_var, time),
+        figures_main.map_values(data, display_var, time),
+    )
+
+    before = best_seconds(lambda: merged_values(data, display_var, time))
+    # the whole callback response, not just the values
+    after = best_seconds(
+        lambda: figures_main.mapbox_lines_patch(data, display_var, time)
+    )
+    record_property("merge_ms", before * 1000)
+    record_property("patch_ms", after * 1000)
+
+    assert after < before / 5
+
+
+def test_map_cube_build_benchmark(data_dir, record_property):
+    data = data_loader.DataLoader(local_data_dir=data_dir, lazy=True)
+    # the sources, so only the build itself is timed
+    for name in ("ds_ngen", "cfe_routed_flow_af", "gdf"):
+        getattr(data, name)
+
+    start = timeit.default_timer()
+    data.map_cube
+    build = timeit.default_timer() - start
+    per_map = best_seconds(
+        lambda: merged_values(data, "Actual ET", "2003-07-01")
+    )
+    record_property("build_ms", build * 1000)
+    record_property("merge_ms", per_map * 1000)
+
+    # cheaper than coloring each variable and month once the old way
+    assert build < per_map * data.map_cube.shape[0] * data.map_cube.shape[1]
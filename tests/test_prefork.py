@@ -0,0 +1,171 @@
+import contextlib
+import os
+import signal
+import socket
+import subprocess
+import sys
+import time
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import pytest
+
+pytestmark = pytest.mark.skipif(
+    not hasattr(os, "fork"), reason="prefork needs os.fork"
+)
+
+# WSGI app answering with the pid of the worker serving the request, after
+# sleeping for the seconds given in the path, or after as many iterations of
+# busy work with a "/cpu/" prefix
+SERVER = """
+import os, sys, time
+sys.path.insert(0, {root!r})
+import prefork, waitress
+
+def app(environ, start_response):
+    path = environ["PATH_INFO"].strip("/")
+    if path.startswith("cpu/"):
+        sum(i * i for i in range(int(path[4:])))
+    else:
+        time.sleep(float(path or 0))
+    start_response("200 OK", [("Content-Type", "text/plain")])
+    return [str(os.getpid()).encode()]
+
+{serve}
+"""
+
+PREFORK = (
+    'prefork.serve(app, host="127.0.0.1", port={port}, workers={workers}, '
+    "threads={threads}, timeout={timeout})"
+)
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _get(port: int, seconds: float = 0, timeout: float = 30) -> int:
+    """Pid of the worker that served a request."""
+    url = f"http://127.0.0.1:{port}/{seconds}"
+    with urllib.request.urlopen(url, timeout=timeout) as response:
+        assert response.status == 200
+        return int(response.read())
+
+
+@contextlib.contextmanager
+def _serving(serve: str, **options):
+    """
+    A server started by the `serve` line (formatted with the port and
+    `options`) in a subprocess, once it answers: the process and port.
+    """
+    port = _free_port()
+    root = str(Path(__file__).resolve().parents[1])
+    script = SERVER.format(root=root, serve=serve.format(port=port, **options))
+    process = subprocess.Popen([sys.executable, "-c", script])
+    try:
+        deadline = time.monotonic() + 30
+        while True:
+            try:
+                _get(port)
+                break
+            except OSError:
+                if time.monotonic() > deadline or process.poll() is not None:
+                    raise
+                time.sleep(0.1)
+        yield process, port
+    finally:
+        if process.poll() is None:
+            process.kill()
+            process.wait()
+
+
+@pytest.fixture
+def server():
+    with _serving(PREFORK, workers=2, threads=2, timeout=30) as server:
+        yield server
+
+
+def test_concurrent_requests(server):
+    process, port = server
+    with ThreadPoolExecutor(16) as pool:
+        pids = list(pool.map(lambda _: _get(port, 0.01), range(200)))
+
+    assert len(pids) == 200
+    assert process.pid not in pids
+    assert 1 <= len(set(pids)) <= 2
+
+
+def test_dead_worker_is_replaced(server):
+    process, port = server
+    worker = _get(port)
+    os.kill(worker, signal.SIGKILL)
+
+    # served by the other worker meanwhile, then by a new one as well
+    seen = set()
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline and len(seen - {worker}) < 2:
+        seen.add(_get(port, 0.05))
+    assert worker not in seen
+    assert len(seen) == 2
+
+
+def test_stop_finishes_requests(server):
+    process, port = server
+    with ThreadPoolExecutor(1) as pool:
+        slow = pool.submit(_get, port, 1.0)
+        time.sleep(0.3)
+        process.send_signal(signal.SIGTERM)
+        assert slow.result() > 0
+
+    assert process.wait(timeout=30) == 0
+
+
+def test_hung_worker_is_replaced():
+    with _serving(PREFORK, workers=1, threads=2, timeout=3) as (_, port):
+        worker = _get(port)
+        # both request threads hang, its I/O loop is still running
+        with ThreadPoolExecutor(2) as pool:
+            for _ in range(2):
+                pool.submit(_get, port, 600)
+            time.sleep(0.5)
+
+            replacement = worker
+            deadline = time.monotonic() + 30
+            while time.monotonic() < deadline:
+                try:
+                    replacement = _get(port, timeout=2)
+                except OSError:
+                    continue
+                if replacement != worker:
+                    break
+            assert replacement != worker
+
+
+def _throughput(port: int, requests: int, clients: int) -> float:
+    """Requests per second of CPU-bound requests from concurrent clients."""
+    start = time.perf_counter()
+    with ThreadPoolExecutor(clients) as pool:
+        list(pool.map(lambda _: _get(port, "cpu/300000"), range(requests)))
+    return requests / (time.perf_counter() - start)
+
+
+@pytest.mark.skipif(
+    (os.cpu_count() or 1) < 2, reason="a speedup needs several cores"
+)
+def test_workers_scale_cpu_bound_requests():
+    """
+    The same CPU-bound app under single-process waitress and forked workers,
+    with as many threads in total: the workers serve it faster.
+    """
+    n = min(os.cpu_count(), 4)
+    single = 'waitress.serve(app, host="127.0.0.1", port={port}, threads={n})'
+    with _serving(single, n=n) as (_, port):
+        waitress_rate = _throughput(port, 20 * n, 2 * n)
+    with _serving(PREFORK, workers=n, threads=1, timeout=30) as (_, port):
+        prefork_rate = _throughput(port, 20 * n, 2 * n)
+
+    # linear would be n; leave room for a busy machine
+    assert prefork_rate > waitress_rate * (1 + (n - 1) / 2)
@@ -0,0 +1,75 @@
+"""
+`prerender.install()` on a hand-made output directory: the stored responses
+are served only to an app that loaded the data they were rendered from.
+"""
+
+import gzip
+import json
+
+import flask
+import pytest
+
+import prerender
+
+OUTPUT = "summary-text.children"
+
+
+@pytest.fixture
+def directory(tmp_path):
+    (tmp_path / OUTPUT).mkdir()
+    body = prerender.response_body(OUTPUT, "pre-rendered")
+    (tmp_path / OUTPUT / prerender.file_name([2005])).write_bytes(
+        gzip.compress(body)
+    )
+    manifest = {"content_id": "bundle-1", "files": 1}
+    (tmp_path / "manifest.json").write_text(json.dumps(manifest))
+    return tmp_path
+
+
+def _client(directory, content_id):
+    server = flask.Flask(__name__)
+
+    @server.route("/_dash-update-component", methods=["POST"])
+    def callback():
+        return flask.jsonify({"rendered": True})
+
+    installed = prerender.install(server, directory, content_id)
+    return installed, server.test_client()
+
+
+def _post(client, value):
+    return client.post(
+        "/_dash-update-component",
+        json={
+            "output": OUTPUT,
+            "inputs": [{"id": "year-dropdown", "value": value}],
+        },
+    )
+
+
+def test_serves_files_of_the_same_data(directory):
+    installed, client = _client(directory, "bundle-1")
+
+    assert installed
+    response = _post(client, 2005)
+    assert response.json["response"]["summary-text"] == {
+        "children": "pre-rendered"
+    }
+    # no file for the value, the callback runs
+    assert _post(client, 2006).json == {"rendered": True}
+    assert _post(client, "../../manifest").json == {"rendered": True}
+
+
+def test_ignores_files_of_other_data(directory):
+    installed, client = _client(directory, "bundle-2")
+
+    assert not installed
+    assert _post(client, 2005).json == {"rendered": True}
+
+
+def test_ignores_files_without_manifest(directory):
+    (directory / "manifest.json").unlink()
+    installed, client = _client(directory, "bundle-1")
+
+    assert not installed
+    assert _post(client, 2005).json == {"rendered": True}
@@ -0,0 +1,89 @@
+import sqlite3
+import time
+
+import numpy as np
+import pytest
+
+from shared_cache import SharedCache
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return SharedCache(tmp_path / "shared.sqlite", max_bytes=100_000)
+
+
+def value(i: int) -> list:
+    # about 8 KB compressed
+    return np.random.default_rng(i).random(1000).round(6).tolist()
+
+
+def stored_size(cache) -> int:
+    with sqlite3.connect(cache.path) as con:
+        return con.execute("SELECT SUM(size) FROM entries").fetchone()[0]
+
+
+def test_round_trip(cache):
+    cache.set("a", {"x": [1, 2.5], "name": "a"})
+
+    assert cache.get("a") == {"x": [1, 2.5], "name": "a"}
+    assert cache.get("b") is None
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_size_is_counted_and_capped(cache):
+    for i in range(30):
+        cache.set(f"v{i}", value(i))
+        # replacing an entry counts its new size only
+        cache.set(f"v{i}", value(i + 1))
+        assert cache.size() == stored_size(cache)
+        assert cache.size() <= cache.max_bytes
+
+    # the oldest entries went first
+    assert cache.get("v0") is None
+    assert cache.get("v29") == value(30)
+
+
+def test_least_recently_used_entries_are_evicted(cache):
+    cache.ACCESS_RESOLUTION = 0
+    for i in range(8):
+        cache.set(f"v{i}", value(i))
+    time.sleep(0.01)
+    cache.get("v0")
+    for i in range(8, 30):
+        cache.set(f"v{i}", value(i))
+
+    assert cache.get("v0") == value(0)
+    assert cache.get("v1") is None
+
+
+def test_hits_only_write_once_per_resolution(cache):
+    cache.set("a", [1])
+    with sqlite3.connect(cache.path) as con:
+        (accessed,) = con.execute("SELECT accessed FROM entries").fetchone()
+        cache.get("a")
+        assert con.execute("SELECT accessed FROM entries").fetchone() == (
+            accessed,
+        )
+
+        cache.ACCESS_RESOLUTION = 0
+        cache.get("a")
+        assert con.execute("SELECT accessed FROM entries").fetchone()[0] > (
+            accessed
+        )
+
+
+def test_counts_the_entries_of_an_older_file(tmp_path):
+    path = tmp_path / "shared.sqlite"
+    with sqlite3.connect(path) as con:
+        con.execute(
+            "CREATE TABLE entries (key TEXT PRIMARY KEY, value BLOB NOT NULL,"
+            " size INTEGER NOT NULL, created REAL NOT NULL,"
+            " accessed REAL NOT NULL)"
+        )
+        con.execute(
+            "INSERT INTO entries VALUES ('a', x'00', 123, ?, ?)",
+            (time.time(), time.time()),
+        )
+    con.close()
+
+    assert SharedCache(path).size() == 123
@@ -0,0 +1,144 @@
+"""
+Multi-resolution aggregates of the hourly well levels.
+
+`build()` aggregates the hourly levels of every station to daily, monthly and
+water-year buckets once (e.g. when the data bundle is baked); `WellPyramid`
+serves a station's levels for a time window from the coarsest level that
+still resolves it, so the hourly values are only read for a window short
+enough to show them in full.
+"""
+
+import numpy as np
+import pandas as pd
+
+# aggregation levels, finest first, and their pandas bucket frequency
+LEVELS = {"daily": "D", "monthly": "MS", "water_year": "YS-OCT"}
+
+# the raw values, below the aggregation levels
+HOURLY = "hourly"
+
+# per bucket: mean, min and max level, first valid level, number of valid
+# values, and hours from the bucket start to the first valid value
+STATISTICS = ["mean", "min", "max", "first", "count", "first_offset_h"]
+
+# points of a chart a few hundred to a thousand pixels wide
+MAX_POINTS = 2000
+
+
+def build(hourly: pd.DataFrame) -> dict:
+    """
+    Aggregate hourly levels to every level of `LEVELS`.
+
+    Args:
+        hourly (DataFrame): Hourly levels, one column per station.
+
+    Returns:
+        dict: "<level>.<stat>" (e.g. "monthly.mean") to a DataFrame indexed by
+        bucket start, one column per station. Values are float32 and counts
+        int32; empty buckets are NaN (count 0).
+    """
+    hourly = hourly.sort_index()
+    # hours since the first row where the level is valid, else NaN
+    hours = (hourly.index - hourly.index[0]) / pd.Timedelta(hours=1)
+    valid_hours = pd.DataFrame(
+        np.where(hourly.notna(), hours.to_numpy()[:, None], np.nan),
+        index=hourly.index,
+        columns=hourly.columns,
+    )
+
+    frames = {}
+    for level, freq in LEVELS.items():
+        buckets = hourly.resample(freq)
+        starts = (buckets.mean().index - hourly.index[0]) / pd.Timedelta(
+            hours=1
+        )
+        stats = {
+            "mean": buckets.mean(),
+            "min": buckets.min(),
+            "max": buckets.max(),
+            "first": buckets.first(),
+            "first_offset_h": valid_hours.resample(freq)
+            .min()
+            .sub(starts.to_numpy(), axis=0),
+        }
+        for stat, frame in stats.items():
+            frames[f"{level}.{stat}"] = frame.astype("float32")
+        frames[f"{level}.count"] = buckets.count().astype("int32")
+    return frames
+
+
+class WellPyramid:
+    """
+    Station levels at the resolution a time window needs.
+
+    Parameters:
+    ----------
+    frames : dict
+        Output of `build()`.
+    hourly : callable, optional
+        Returns the hourly levels (one column per station), called only when
+        a window is short enough for them.
+    """
+
+    def __init__(self, frames: dict, hourly=None):
+        self.frames = frames
+        self._hourly = hourly
+
+    def stat(
+        self, stn_id: str, stat: str = "mean", level: str = "monthly"
+    ) -> pd.Series:
+        """The values of one statistic of a station at one level."""
+        return self.frames[f"{level}.{stat}"][stn_id]
+
+    def first_valid(self, stn_id: str) -> float:
+        """First valid level of a station."""
+        counts = self.stat(stn_id, "count", "daily")
+        first_day = counts.index[counts.to_numpy().nonzero()[0][0]]
+        return float(self.stat(stn_id, "first", "daily")[first_day])
+
+    def level_for(
+        self, start=None, end=None, max_points: int = MAX_POINTS
+    ) -> str:
+        """
+        The finest level with at most `max_points` buckets between `start`
+        and `end` (None for the whole record), the coarsest level otherwise.
+        """
+        for level in [HOURLY, *LEVELS]:
+            if self._points(level, start, end) <= max_points:
+                return level
+        return list(LEVELS)[-1]
+
+    def levels(
+        self, stn_id: str, start=None, end=None, max_points: int = MAX_POINTS
+    ) -> tuple[str, pd.Series]:
+        """
+        Mean levels of a station between `start` and `end` (one bucket
+        beyond each side, so a line reaches the window edges), at the level
+        chosen by `level_for()`.
+
+        Returns:
+            tuple: The level name, and the levels indexed by hour or bucket
+            start.
+        """
+        level = self.level_for(start, end, max_points)
+        if level == HOURLY:
+            values = self._hourly()[stn_id]
+        else:
+            values = self.stat(stn_id, "mean", level)
+
+        index = values.index
+        first = 0 if start is None else index.searchsorted(start) - 1
+        last = len(index) if end is None else index.searchsorted(end, "right")
+        return level, values.iloc[max(first, 0) : last + 1]
+
+    def _points(self, level: str, start, end) -> int:
+        """Number of buckets of a level in a window."""
+        if level == HOURLY:
+            # estimated from the daily buckets, the hourly values stay unread
+            index = self.frames["daily.count"].index
+            span = pd.Timedelta(days=1) * len(
+                index[index.slice_indexer(start, end)]
+            )
+            return int(span / pd.Timedelta(hours=1))
+        index = self.frames[f"{level}.count"].index
+        return len(index[index.slice_indexer(start, end)])